@@ -1,7 +1,7 @@
 # app/core/config.py
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -30,9 +30,105 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str
     SMTP_PASSWORD: str
+    SMTP_START_TLS: bool = True
+    SMTP_TIMEOUT: float = 60.0
     FROM_EMAIL: str = "noreply@vbit.edu"
     FROM_NAME: str = "VBIT Newsletter"
     
+    # Newsletter rendering
+    NEWSLETTER_INLINE_CSS: bool = True  # move <style> rules into style="" attributes
+    NEWSLETTER_MINIFY_HTML: bool = True  # drop comments and collapse whitespace
+    
+    # Rendered artifact cache (merged HTML, MIME payloads) on local disk
+    ARTIFACT_CACHE_ENABLED: bool = True
+    ARTIFACT_CACHE_DIR: str = ".cache/artifacts"
+    ARTIFACT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    
+    # Values derived from article bodies (summary, excerpt, stats), by body hash
+    DERIVED_CACHE_SIZE: int = 10000  # entries kept in memory in front of the derived_fields table
+    
+    # Near-duplicate articles (MinHash LSH over body shingles)
+    DUPLICATE_THRESHOLD: float = 0.5  # estimated Jaccard similarity at which stories count as the same
+    
+    # Automatic article tags (keyword extraction, IDF over every article)
+    KEYWORD_TAGS: int = 5  # keywords set as tags on articles created without any
+    
+    # Topic clustering for analytics (TF-IDF + mini-batch k-means)
+    TOPIC_CLUSTERS: int = 12
+    TOPIC_MAX_TERMS: int = 20000  # vocabulary size, most frequent terms first
+    TOPIC_REBUILD_RATIO: float = 0.25  # refit from scratch once this share of articles is new
+    
+    # RSS/Atom ingestion
+    FEED_SOURCES: List[str] = []  # feed URLs, e.g. FEED_SOURCES='["https://example.com/rss"]'
+    FEED_POLL_INTERVAL: float = 900.0  # seconds between polls of python -m app.workers.feeds --loop
+    FEED_CONCURRENCY: int = 8  # feeds fetched at once, and the HTTP connection pool size
+    FEED_TIMEOUT: float = 20.0
+    FEED_MAX_BYTES: int = 10 * 1024 * 1024  # larger feeds are abandoned
+    FEED_BATCH_SIZE: int = 200  # items upserted per transaction
+    FEED_AUTHOR_EMAIL: str = ""  # owner of ingested articles (default: the first admin)
+    
+    # Bulk article import (NDJSON)
+    IMPORT_BATCH_SIZE: int = 500  # lines per INSERT batch and transaction
+    IMPORT_MAX_LINE_BYTES: int = 1024 * 1024  # longer lines are rejected without being buffered
+    IMPORT_MAX_ERRORS: int = 100  # failed lines listed in the report (all are counted)
+    
+    # Public web archive of sent newsletters
+    ARCHIVE_CACHE_SIZE: int = 256  # precompressed pages kept in memory
+    ARCHIVE_MAX_AGE: int = 300  # Cache-Control max-age, seconds
+    
+    # Article view counts (engagement in newsletter generation)
+    VIEW_COUNT_FLUSH_INTERVAL: float = 10.0  # seconds views are buffered before one batched write
+    
+    # Newsletter generation from published articles
+    GENERATION_WINDOW_DAYS: int = 14  # only articles published this recently are candidates
+    GENERATION_CANDIDATE_LIMIT: int = 5000  # newest candidates kept in memory
+    GENERATION_MAX_ARTICLES: int = 8
+    GENERATION_RECENCY_HALF_LIFE_HOURS: float = 72.0
+    GENERATION_WEIGHTS: Dict[str, float] = {"recency": 0.5, "tags": 0.3, "engagement": 0.2}
+    GENERATION_WORKERS: int = 2  # generation jobs run at once in each API process
+    GENERATION_QUEUE_SIZE: int = 100  # further requests are refused while this many wait
+    GENERATION_JOB_TIMEOUT: float = 300.0  # seconds before a running job is failed
+    
+    # SMTP connection pool
+    SMTP_POOL_SIZE: int = 5
+    SMTP_POOL_MAX_MESSAGES: int = 100  # recycle a session after this many messages
+    SMTP_POOL_IDLE_TIMEOUT: float = 30.0  # seconds before an idle session is reopened
+    
+    # Newsletter delivery
+    DELIVERY_CONCURRENCY: int = 10  # concurrent senders per newsletter send
+    DELIVERY_BATCH_SIZE: int = 500  # subscribers read per keyset page
+    DELIVERY_PROGRESS_EVERY: int = 1000  # log progress every N messages
+    DELIVERY_RECORD_INTERVAL: float = 0.5  # seconds between result commits; bounds re-sends after a crash
+    DELIVERY_CLAIM_TIMEOUT: float = 900.0  # seconds a claimed page stays reserved for its sender
+    # RCPT TOs per transaction for identical messages (1 = off). Batched copies
+    # share one List-Unsubscribe without the per-recipient token, so opt in
+    # only where a generic unsubscribe link is acceptable.
+    DELIVERY_RCPT_BATCH_SIZE: int = 1
+    DELIVERY_SEGMENT_CACHE_SIZE: int = 1024  # rendered variants kept per send
+    
+    # Outbound rate limits, messages per second (0 = unlimited). Off unless
+    # set: the right values depend on the relay and the providers' quotas.
+    DELIVERY_GLOBAL_RATE: float = 0.0
+    DELIVERY_DOMAIN_RATE: float = 0.0
+    DELIVERY_DOMAIN_RATES: Dict[str, float] = {}  # per-domain overrides, e.g. {"gmail.com": 10}
+    DELIVERY_MAX_THROTTLE_WAIT: float = 5.0  # defer a message rather than wait longer than this
+    
+    # Delivery retries for transient (4xx / connection) failures
+    DELIVERY_MAX_ATTEMPTS: int = 5
+    DELIVERY_RETRY_BASE_DELAY: float = 30.0  # seconds, doubled per attempt
+    DELIVERY_RETRY_MAX_DELAY: float = 3600.0
+    DELIVERY_MAX_LINGER: float = 60.0  # keep draining for deferred jobs due within this many seconds
+    
+    # Standalone delivery workers (python -m app.workers.delivery)
+    DELIVERY_WORKER_PROCESSES: int = 0  # 0 = one per CPU core
+    DELIVERY_WORKER_POLL_INTERVAL: float = 5.0
+    
+    # Transactional email outbox (verification, password reset, team invites)
+    MAIL_OUTBOX_WORKERS: int = 2  # background senders in each API process
+    MAIL_OUTBOX_MAX_SIZE: int = 10000  # enqueue waits once this many emails are queued
+    MAIL_OUTBOX_PERSIST: bool = False  # also store queued emails so they survive a restart
+    MAIL_OUTBOX_CLAIM_TIMEOUT: float = 300.0  # seconds before another process takes over a stored email
+    
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
     
@@ -1,18 +1,21 @@
 # app/database.py
 
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
 
+# SQLite (local runs, benchmarks) does not take queue pool sizing
+pool_options = {} if settings.DATABASE_URL.startswith("sqlite") else {"pool_size": 10, "max_overflow": 20}
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    **pool_options
 )
 
 
@@ -45,13 +48,52 @@ async def get_db():
 
 
 
+# Columns added to tables that existing databases already have, with the
+# DEFAULT that fills existing rows. create_all only creates missing tables,
+# so these are added by upgrade_schema.
+ADDED_COLUMNS = [
+    ("articles", "view_count", "0"),
+    ("delivery_jobs", "claimed_until", None),
+    ("articles", "content_updated_at", None),
+    ("email_outbox", "claimed_by", None),
+    ("email_outbox", "claimed_until", None),
+    # Existing plain-text parts count as hand-written, so none is overwritten
+    ("newsletters", "content_text_generated", "false"),
+]
+
+
+def upgrade_schema(conn):
+    """Add missing columns and indexes to tables created by older versions"""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table, name, default in ADDED_COLUMNS:
+        if table not in tables or name in {c["name"] for c in inspector.get_columns(table)}:
+            continue
+        column = Base.metadata.tables[table].c[name]
+        statement = f"ALTER TABLE {table} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+        if default is not None:
+            statement += f" DEFAULT {default}"
+        if not column.nullable:
+            statement += " NOT NULL"
+        conn.execute(text(statement))
+        print(f"🔧 Added column {table}.{name}")
+    
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                print(f"🔧 Created index {index.name}")
+
+
 # Initialize database
 async def init_db():
     # Import all models here to ensure they're registered
-    from app.models import user, newsletter, article, template, schedule, subscriber, team, analytics
+    from app.models import user, newsletter, article, template, schedule, subscriber, team, analytics, delivery
     
     async with engine.begin() as conn:
         # ONLY create tables, DO NOT DROP (preserve data!)
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
     
     print("✅ Database initialized successfully")
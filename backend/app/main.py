@@ -5,10 +5,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.database import init_db
+from app.services.smtp_pool import smtp_pool
+from app.services.mail_outbox import mail_outbox
+from app.services.generation_jobs import generation_jobs
+from app.services.duplicate_index import duplicate_index
+from app.services.view_counter import view_counter
 from app.routes import (
     auth, newsletters, articles, templates,
     schedule, analytics, subscription, team,
-    summaries, feed, generate, admin
+    summaries, feed, generate, admin, deliveries, archive
 )
 
 
@@ -19,9 +24,18 @@ async def lifespan(app: FastAPI):
     print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     await init_db()
     print("✅ Database initialized")
+    await mail_outbox.start()
+    await generation_jobs.start()
+    duplicate_index.start()
+    view_counter.start()
     yield
     # Shutdown
     print("👋 Shutting down...")
+    await generation_jobs.close()
+    await duplicate_index.close()
+    await view_counter.close()
+    await mail_outbox.close()
+    await smtp_pool.close()
 
 
 # Create FastAPI app
@@ -72,6 +86,8 @@ app.include_router(summaries.router)
 app.include_router(feed.router)
 app.include_router(generate.router)
 app.include_router(admin.router)
+app.include_router(deliveries.router)
+app.include_router(archive.router)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,12 @@ from app.models.subscriber import Subscriber
 from app.models.team import Team
 from app.models.schedule import Schedule
 from app.models.analytics import Analytics
+from app.models.delivery import DeliveryJob, OutboxEmail
+from app.models.generation import GenerationJob
+from app.models.derived import DerivedField, ArticleSignature
+from app.models.topic import TopicModel, TopicCluster, ArticleTopic
+from app.models.keyword import KeywordTerm, ArticleKeywords
+from app.models.feed import FeedSource
 
 __all__ = [
     "User",
@@ -17,5 +23,16 @@ __all__ = [
     "Subscriber",
     "Team",
     "Schedule",
-    "Analytics"
+    "Analytics",
+    "DeliveryJob",
+    "OutboxEmail",
+    "GenerationJob",
+    "DerivedField",
+    "ArticleSignature",
+    "TopicModel",
+    "TopicCluster",
+    "ArticleTopic",
+    "KeywordTerm",
+    "ArticleKeywords",
+    "FeedSource"
 ]
@@ -1,6 +1,6 @@
 # app/models/article.py
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -15,12 +15,19 @@ class Article(Base):
     summary = Column(Text, nullable=True)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     tags = Column(JSON, default=list)  # ["AI", "ML", "GenAI"]
-    source_url = Column(String(1000), nullable=True)
+    source_url = Column(String(1000), nullable=True, index=True)  # ingested articles are deduplicated by it
     image_url = Column(String(1000), nullable=True)
     published_at = Column(DateTime(timezone=True), nullable=True)
     is_published = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    view_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
+    content_updated_at = Column(DateTime(timezone=True), nullable=True)  # last title/body edit; view counts leave it alone
     
     # Relationships
     author = relationship("User", back_populates="articles")
+    
+    __table_args__ = (
+        # Recent published articles, newest first (feed, generation candidates)
+        Index("ix_articles_published", "is_published", "published_at"),
+    )
@@ -0,0 +1,60 @@
+# app/models/delivery.py
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class DeliveryStatus(str, enum.Enum):
+    PENDING = "pending"  # not sent yet, deferred, or waiting for a retry
+    SENT = "sent"
+    FAILED = "failed"  # dead letter: permanent error or retries exhausted
+    SKIPPED = "skipped"  # subscriber opted out before their turn came
+
+
+class DeliveryJob(Base):
+    """One row per (newsletter, subscriber): the durable send outbox"""
+    __tablename__ = "delivery_jobs"
+    __table_args__ = (
+        UniqueConstraint("newsletter_id", "subscriber_id", name="uq_delivery_jobs_newsletter_subscriber"),
+        Index("ix_delivery_jobs_newsletter_status", "newsletter_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    newsletter_id = Column(Integer, ForeignKey("newsletters.id"), nullable=False)
+    subscriber_id = Column(Integer, ForeignKey("subscribers.id"), nullable=False)
+    status = Column(SQLEnum(DeliveryStatus), default=DeliveryStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String(1000), nullable=True)
+    smtp_code = Column(Integer, nullable=True)  # reply code of the last failure
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # set when deferred or retrying
+    claimed_until = Column(DateTime(timezone=True), nullable=True)  # lease of the process sending it
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class OutboxEmail(Base):
+    """
+    A queued transactional email, stored when MAIL_OUTBOX_PERSIST is on.
+    Deleted once sent; a dead letter keeps its envelope and error but not
+    its body (which may hold a reset token).
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(500), nullable=False)
+    html_content = Column(Text, nullable=False)
+    text_content = Column(Text, nullable=True)
+    status = Column(SQLEnum(DeliveryStatus), default=DeliveryStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String(1000), nullable=True)
+    smtp_code = Column(Integer, nullable=True)
+    claimed_by = Column(String(32), nullable=True)  # API process sending it
+    claimed_until = Column(DateTime(timezone=True), nullable=True)  # others may take it over after this
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
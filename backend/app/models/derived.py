@@ -0,0 +1,25 @@
+# app/models/derived.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DerivedField(Base):
+    """A value computed from an article body (summary, excerpt, stats), keyed by the body's hash"""
+    __tablename__ = "derived_fields"
+
+    body_hash = Column(String(64), primary_key=True)  # sha256 of Article.body
+    field = Column(String(50), primary_key=True)
+    version = Column(Integer, primary_key=True)  # bumped when the field's algorithm changes
+    value = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArticleSignature(Base):
+    """MinHash signature of an article body, for the near-duplicate index"""
+    __tablename__ = "article_signatures"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)  # uint32 per permutation
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # index syncs read new rows by it
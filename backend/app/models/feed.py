@@ -0,0 +1,20 @@
+# app/models/feed.py
+
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class FeedSource(Base):
+    """Polling state of one RSS/Atom feed, for conditional GETs"""
+    __tablename__ = "feed_sources"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(1000), unique=True, nullable=False)
+    etag = Column(String(500), nullable=True)
+    last_modified = Column(String(100), nullable=True)  # Last-Modified header, sent back verbatim
+    last_polled_at = Column(DateTime(timezone=True), nullable=True)
+    last_status = Column(Integer, nullable=True)  # HTTP status of the last poll
+    error = Column(Text, nullable=True)
+    items_seen = Column(Integer, default=0)  # items in the last full fetch
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,33 @@
+# app/models/generation.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class GenerationStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class GenerationJob(Base):
+    """One newsletter generation request and its outcome"""
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        Index("ix_generation_jobs_status", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(SQLEnum(GenerationStatus), default=GenerationStatus.QUEUED, nullable=False)
+    topics = Column(JSON, default=list)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=True)
+    max_articles = Column(Integer, nullable=True)
+    newsletter_id = Column(Integer, ForeignKey("newsletters.id"), nullable=True)  # set when completed
+    error = Column(String(1000), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,22 @@
+# app/models/keyword.py
+
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class KeywordTerm(Base):
+    """How many articles contain a term, for keyword IDF; term_hash 0 counts the articles themselves"""
+    __tablename__ = "keyword_terms"
+
+    term_hash = Column(BigInteger, primary_key=True, autoincrement=False)  # 63-bit hash of the lowercased term
+    documents = Column(Integer, nullable=False, default=0)
+
+
+class ArticleKeywords(Base):
+    """Keywords extracted from an article; its terms are counted in keyword_terms once"""
+    __tablename__ = "article_keywords"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    keywords = Column(JSON, default=list)  # best first
+    extracted_at = Column(DateTime(timezone=True), server_default=func.now())
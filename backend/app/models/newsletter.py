@@ -22,6 +22,7 @@ class Newsletter(Base):
     subject = Column(String(500), nullable=False)
     content_html = Column(Text, nullable=False)
     content_text = Column(Text, nullable=True)
+    content_text_generated = Column(Boolean, default=False, nullable=False)  # converted from the HTML, so regenerated when it changes
     status = Column(SQLEnum(NewsletterStatus), default=NewsletterStatus.DRAFT)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     template_id = Column(Integer, ForeignKey("templates.id"), nullable=True)
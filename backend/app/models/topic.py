@@ -0,0 +1,40 @@
+# app/models/topic.py
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class TopicModel(Base):
+    """The fitted vocabulary of the current topic clustering"""
+    __tablename__ = "topic_models"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vocabulary = Column(JSON, nullable=False)  # terms, in centroid column order
+    idf = Column(LargeBinary, nullable=False)  # float32 per term
+    fitted_articles = Column(Integer, default=0)  # articles clustered by the full run
+    added_articles = Column(Integer, default=0)  # articles assigned incrementally since
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class TopicCluster(Base):
+    """One topic: its centroid, top terms and how many published articles it holds"""
+    __tablename__ = "topic_clusters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    model_id = Column(Integer, ForeignKey("topic_models.id", ondelete="CASCADE"), nullable=False, index=True)
+    label = Column(String(200), nullable=False)
+    terms = Column(JSON, default=list)
+    size = Column(Integer, default=0, index=True)
+    centroid = Column(LargeBinary, nullable=False)  # float32 per vocabulary term
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ArticleTopic(Base):
+    """The cluster an article was assigned to (none when it has no vocabulary terms)"""
+    __tablename__ = "article_topics"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    cluster_id = Column(Integer, ForeignKey("topic_clusters.id", ondelete="CASCADE"), nullable=True, index=True)
+    assigned_at = Column(DateTime(timezone=True), server_default=func.now())
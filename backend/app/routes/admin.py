@@ -1,11 +1,16 @@
 # app/routes/admin.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+import time
 from app.database import get_db
+from app.models.article import Article
 from app.models.user import User, UserRole
 from app.core.security import get_current_user_email
+from app.services.summarizer import backfill_summaries
+from app.services.topic_clustering import recluster
+from app.services.keyword_tagger import keyword_tagger
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -76,3 +81,60 @@ async def get_all_users(
         }
         for user in users
     ]
+
+
+@router.post("/summaries/backfill")
+async def backfill_article_summaries(
+    admin: User = Depends(verify_admin),
+    limit: int = Query(1000, ge=1, le=20000),
+    overwrite: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Summarize up to `limit` articles that have no summary (admin only)"""
+    
+    started = time.perf_counter()
+    summarized = await backfill_summaries(db, limit=limit, overwrite=overwrite)
+    elapsed = time.perf_counter() - started
+    
+    # Articles still without one
+    result = await db.execute(
+        select(func.count(Article.id)).where(Article.summary.is_(None))
+    )
+    remaining = result.scalar() or 0
+    
+    return {
+        "summarized": summarized,
+        "remaining": remaining,
+        "seconds": round(elapsed, 2)
+    }
+
+
+@router.post("/tags/backfill")
+async def backfill_article_tags(
+    admin: User = Depends(verify_admin),
+    limit: int = Query(1000, ge=1, le=20000),
+    overwrite: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Extract keywords for up to `limit` articles, tagging those without tags (admin only)"""
+    
+    started = time.perf_counter()
+    tagged = await keyword_tagger.backfill(db, limit=limit, overwrite=overwrite)
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "tagged": tagged,
+        "remaining": await keyword_tagger.untagged_count(db),
+        "seconds": round(elapsed, 2)
+    }
+
+
+@router.post("/topics/recluster")
+async def recluster_topics(
+    admin: User = Depends(verify_admin),
+    full: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update topic clusters for analytics; only new or edited articles unless `full` (admin only)"""
+    
+    return await recluster(db, full=full)
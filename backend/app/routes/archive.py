@@ -0,0 +1,61 @@
+# app/routes/archive.py
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from typing import Optional
+from app.database import get_db
+from app.core.config import settings
+from app.models.newsletter import Newsletter, NewsletterStatus
+from app.services.archive_service import negotiate_encoding
+from app.services.newsletter_service import archive_newsletter, get_newsletter_template
+
+router = APIRouter(prefix="/api/archive", tags=["Archive"])
+
+
+@router.get("/{newsletter_id}")
+async def view_newsletter(
+    newsletter_id: int,
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Public web copy of a sent newsletter ("view in browser")"""
+    
+    result = await db.execute(
+        select(Newsletter).where(
+            and_(
+                Newsletter.id == newsletter_id,
+                Newsletter.status.in_([NewsletterStatus.SENT, NewsletterStatus.ARCHIVED])
+            )
+        )
+    )
+    newsletter = result.scalar_one_or_none()
+    
+    if not newsletter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Newsletter not found"
+        )
+    
+    template = await get_newsletter_template(newsletter, db)
+    page = await archive_newsletter(newsletter, template)
+    
+    encoding = negotiate_encoding(accept_encoding, page.bodies)
+    headers = {
+        "ETag": page.etag_for(encoding),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={settings.ARCHIVE_MAX_AGE}",
+    }
+    
+    if page.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=page.bodies[encoding],
+        media_type="text/html",
+        headers=headers
+    )
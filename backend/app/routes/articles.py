@@ -1,14 +1,21 @@
 # app/routes/articles.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, func, and_, or_
 from typing import List, Optional
+from datetime import datetime
 from app.database import get_db
 from app.models.article import Article
 from app.models.user import User
 from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleResponse
 from app.core.security import get_current_user_email
+from app.services.derived_cache import derived_fields
+from app.services.duplicate_index import duplicate_index
+from app.services.keyword_tagger import keyword_tagger
+from app.services.article_import import import_ndjson
+from app.services.view_counter import view_counter
+from app.core.config import settings
 
 router = APIRouter(prefix="/api/articles", tags=["Articles"])
 
@@ -32,24 +39,68 @@ async def create_article(
             detail="Only editors and admins can create articles"
         )
     
+    # Keywords become the tags when the author gave none
+    analysis, keywords = await keyword_tagger.extract(db, article_data.title, article_data.body)
+    
     # Create article
     new_article = Article(
         title=article_data.title,
         body=article_data.body,
-        summary=article_data.summary,
+        # Extractive summary unless the author wrote one
+        summary=article_data.summary or await derived_fields.get(db, article_data.body, "summary") or None,
         author_id=user.id,
-        tags=article_data.tags,
+        tags=article_data.tags or keywords,
         source_url=str(article_data.source_url) if article_data.source_url else None,
         image_url=str(article_data.image_url) if article_data.image_url else None
     )
     
     db.add(new_article)
+    await db.flush()
+    
+    await keyword_tagger.record(db, new_article.id, analysis, keywords)
+    await duplicate_index.index_article(db, new_article.id, new_article.body)
     await db.commit()
     await db.refresh(new_article)
     
     return new_article
 
 
+@router.post("/import")
+async def import_articles(
+    request: Request,
+    email: str = Depends(get_current_user_email),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk-create articles from an NDJSON body, one ArticleCreate object per
+    line (plus optional is_published / published_at), streamed and written
+    in batches. Articles whose source_url already exists are updated
+    instead. Returns counts and the failed line numbers (editor/admin only)
+    """
+    
+    # Get user
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    
+    # Check role
+    if user.role not in ["editor", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only editors and admins can import articles"
+        )
+    
+    # Release the read transaction; each batch commits on its own
+    await db.commit()
+    
+    return await import_ndjson(
+        db,
+        request.stream(),
+        user.id,
+        batch_size=settings.IMPORT_BATCH_SIZE,
+        max_errors=settings.IMPORT_MAX_ERRORS
+    )
+
+
 @router.get("/", response_model=List[ArticleResponse])
 async def get_articles(
     skip: int = 0,
@@ -99,6 +150,73 @@ async def get_article(article_id: int, db: AsyncSession = Depends(get_db)):
             detail="Article not found"
         )
     
+    # Count the read (newsletter generation ranks articles by engagement);
+    # buffered and written in batches, so the read stays a read
+    if article.is_published:
+        view_counter.record(article.id)
+    
+    return article
+
+
+@router.put("/{article_id}", response_model=ArticleResponse)
+async def update_article(
+    article_id: int,
+    article_data: ArticleUpdate,
+    email: str = Depends(get_current_user_email),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update article (author/admin only)"""
+    
+    # Get user
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    
+    # Get article
+    result = await db.execute(select(Article).where(Article.id == article_id))
+    article = result.scalar_one_or_none()
+    
+    if not article:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Article not found"
+        )
+    
+    # Check permissions
+    if article.author_id != user.id and user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this article"
+        )
+    
+    update_data = article_data.model_dump(exclude_unset=True)
+    for field in ("source_url", "image_url"):
+        if update_data.get(field) is not None:
+            update_data[field] = str(update_data[field])
+    
+    # Re-derive the summary only when the body really changes, and only if
+    # it was generated (i.e. matches what the old body summarizes to)
+    body = update_data.get("body")
+    if body and body != article.body and not update_data.get("summary"):
+        generated = not article.summary or article.summary == await derived_fields.get(db, article.body, "summary")
+        if generated:
+            update_data["summary"] = await derived_fields.get(db, body, "summary") or None
+    
+    if update_data.get("is_published") and not article.published_at:
+        update_data["published_at"] = datetime.utcnow()
+    
+    if body and body != article.body:
+        await duplicate_index.index_article(db, article.id, body)
+    
+    # Topic clustering re-places articles whose text changed since
+    if (body and body != article.body) or update_data.get("title", article.title) != article.title:
+        update_data["content_updated_at"] = func.now()
+    
+    for field, value in update_data.items():
+        setattr(article, field, value)
+    
+    await db.commit()
+    await db.refresh(article)
+    
     return article
 
 
@@ -131,6 +249,7 @@ async def delete_article(
             detail="Not authorized to delete this article"
         )
     
+    await duplicate_index.forget_article(db, article.id)
     await db.delete(article)
     await db.commit()
     
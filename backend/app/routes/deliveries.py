@@ -0,0 +1,59 @@
+# app/routes/deliveries.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from app.database import get_db
+from app.models.delivery import DeliveryJob, DeliveryStatus
+from app.models.subscriber import Subscriber
+from app.models.user import User
+from app.schemas.delivery import DeadLetterResponse
+from app.services.mail_outbox import mail_outbox
+from app.routes.admin import verify_admin
+
+router = APIRouter(prefix="/api/deliveries", tags=["Deliveries"])
+
+
+@router.get("/dead-letters", response_model=List[DeadLetterResponse])
+async def get_dead_letters(
+    newsletter_id: Optional[int] = Query(None),
+    skip: int = 0,
+    limit: int = 50,
+    admin: User = Depends(verify_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get deliveries that failed permanently or ran out of retries (admin only)"""
+    
+    query = (
+        select(
+            DeliveryJob.id,
+            DeliveryJob.newsletter_id,
+            DeliveryJob.subscriber_id,
+            Subscriber.email,
+            DeliveryJob.status,
+            DeliveryJob.attempts,
+            DeliveryJob.smtp_code,
+            DeliveryJob.last_error,
+            DeliveryJob.created_at,
+            DeliveryJob.updated_at
+        )
+        .join(Subscriber, Subscriber.id == DeliveryJob.subscriber_id)
+        .where(DeliveryJob.status == DeliveryStatus.FAILED)
+    )
+    
+    if newsletter_id is not None:
+        query = query.where(DeliveryJob.newsletter_id == newsletter_id)
+    
+    query = query.order_by(DeliveryJob.id.desc()).offset(skip).limit(limit)
+    
+    result = await db.execute(query)
+    
+    return result.mappings().all()
+
+
+@router.get("/outbox")
+async def get_outbox_metrics(admin: User = Depends(verify_admin)):
+    """Depth and age of the transactional email outbox (admin only)"""
+    
+    return mail_outbox.metrics()
@@ -6,6 +6,8 @@ from sqlalchemy import select, or_
 from typing import Optional
 from app.database import get_db
 from app.models.article import Article
+from app.services.derived_cache import derived_fields
+from app.services.duplicate_index import duplicate_index
 
 router = APIRouter(prefix="/api/feed", tags=["Feed"])
 
@@ -30,17 +32,30 @@ async def get_feed(
     result = await db.execute(query)
     articles = result.scalars().all()
     
+    # The same story from several sources is shown once, newest copy first
+    # (once the index has loaded in the background; until then all are shown)
+    if await duplicate_index.ready(db):
+        shown = set(duplicate_index.collapse([article.id for article in articles]))
+        articles = [article for article in articles if article.id in shown]
+    
+    # Excerpts and reading times are derived once per distinct body
+    bodies = [article.body for article in articles]
+    excerpts = await derived_fields.get_many(db, bodies, "excerpt")
+    stats = await derived_fields.get_many(db, bodies, "stats")
+    await db.commit()
+    
     feed = [
         {
             "id": article.id,
             "title": article.title,
-            "summary": article.summary or article.body[:200] + "...",
+            "summary": article.summary or excerpt,
             "image_url": article.image_url,
             "source_url": article.source_url,
             "tags": article.tags,
+            "reading_minutes": article_stats["reading_minutes"],
             "published_at": article.published_at
         }
-        for article in articles
+        for article, excerpt, article_stats in zip(articles, excerpts, stats)
     ]
     
     return feed
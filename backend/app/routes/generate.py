@@ -1,26 +1,86 @@
 # app/routes/generate.py
 
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from typing import Optional
 from app.database import get_db
+from app.models.generation import GenerationJob
+from app.models.user import User
+from app.schemas.generate import GenerateNewsletterRequest, GenerationJobResponse
 from app.core.security import get_current_user_email
-from app.services.newsletter_service import generate_newsletter_content
+from app.services.generation_jobs import QueueFull, generation_jobs
 
 router = APIRouter(prefix="/api/generate", tags=["Generate"])
 
 
-@router.post("/newsletter")
+@router.post("/newsletter", status_code=status.HTTP_202_ACCEPTED)
 async def generate_newsletter(
-    background_tasks: BackgroundTasks,
+    request: Optional[GenerateNewsletterRequest] = None,
     email: str = Depends(get_current_user_email),
     db: AsyncSession = Depends(get_db)
 ):
-    """Generate AI-powered newsletter content"""
+    """Queue a newsletter generation job; poll /api/generate/jobs/{id} for the result"""
     
-    # Add to background tasks
-    background_tasks.add_task(generate_newsletter_content, email, db)
+    request = request or GenerateNewsletterRequest()
+    
+    # Get user
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    
+    # Record the job; the runner opens its own session to work on it
+    job = GenerationJob(
+        user_id=user.id,
+        topics=request.topics,
+        template_id=request.template_id,
+        max_articles=request.max_articles
+    )
+    db.add(job)
+    await db.commit()
+    
+    try:
+        await generation_jobs.submit(job.id)
+    except QueueFull as e:
+        await db.delete(job)
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     
     return {
-        "message": "Newsletter generation started",
-        "status": "processing"
+        "message": "Newsletter generation queued",
+        "job_id": job.id,
+        "status": job.status
     }
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(
+    job_id: int,
+    email: str = Depends(get_current_user_email),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status (and, once completed, the newsletter id) of a generation job"""
+    
+    # Get user
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    
+    result = await db.execute(
+        select(GenerationJob).where(
+            and_(
+                GenerationJob.id == job_id,
+                GenerationJob.user_id == user.id
+            )
+        )
+    )
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Generation job not found"
+        )
+    
+    return job
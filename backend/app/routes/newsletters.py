@@ -1,6 +1,7 @@
 # app/routes/newsletters.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from typing import List
@@ -12,6 +13,9 @@ from app.schemas.newsletter import (
     NewsletterResponse, NewsletterListResponse
 )
 from app.core.security import get_current_user_email
+from app.services.html_to_text import text_conversions
+from app.services.newsletter_service import get_newsletter_template, render_newsletter_page
+from app.routes.templates import validate_template
 
 router = APIRouter(prefix="/api/newsletters", tags=["Newsletters"])
 
@@ -24,16 +28,26 @@ async def create_newsletter(
 ):
     """Create a new newsletter"""
     
+    # Reject bodies the renderer cannot compile
+    validate_template(newsletter_data.content_html)
+    
     # Get user
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
     
+    # Generate the plain-text part now so sends never have to
+    content_text = newsletter_data.content_text
+    generated = not content_text
+    if generated:
+        content_text = await text_conversions.convert(newsletter_data.content_html)
+    
     # Create newsletter
     new_newsletter = Newsletter(
         title=newsletter_data.title,
         subject=newsletter_data.subject,
         content_html=newsletter_data.content_html,
-        content_text=newsletter_data.content_text,
+        content_text=content_text,
+        content_text_generated=generated,
         author_id=user.id,
         template_id=newsletter_data.template_id
     )
@@ -103,6 +117,40 @@ async def get_newsletter(
     return newsletter
 
 
+@router.get("/{newsletter_id}/preview", response_class=HTMLResponse)
+async def preview_newsletter(
+    newsletter_id: int,
+    email: str = Depends(get_current_user_email),
+    db: AsyncSession = Depends(get_db)
+):
+    """Preview a newsletter rendered into its template"""
+    
+    # Get user
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    
+    # Get newsletter
+    result = await db.execute(
+        select(Newsletter).where(
+            and_(
+                Newsletter.id == newsletter_id,
+                Newsletter.author_id == user.id
+            )
+        )
+    )
+    newsletter = result.scalar_one_or_none()
+    
+    if not newsletter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Newsletter not found"
+        )
+    
+    template = await get_newsletter_template(newsletter, db)
+    
+    return HTMLResponse(await render_newsletter_page(newsletter, template))
+
+
 @router.put("/{newsletter_id}", response_model=NewsletterResponse)
 async def update_newsletter(
     newsletter_id: int,
@@ -133,8 +181,23 @@ async def update_newsletter(
             detail="Newsletter not found"
         )
     
+    # Reject bodies the renderer cannot compile
+    validate_template(newsletter_data.content_html)
+    
     # Update fields
     update_data = newsletter_data.model_dump(exclude_unset=True)
+    
+    # Regenerate the plain-text part when the HTML changes, unless it was
+    # written by hand; clearing it asks for a generated one again
+    if update_data.get("content_text"):
+        update_data["content_text_generated"] = False
+    elif "content_text" in update_data or (
+        update_data.get("content_html") and (newsletter.content_text_generated or not newsletter.content_text)
+    ):
+        html = update_data.get("content_html") or newsletter.content_html
+        update_data["content_text"] = await text_conversions.convert(html)
+        update_data["content_text_generated"] = True
+    
     for field, value in update_data.items():
         setattr(newsletter, field, value)
     
@@ -3,15 +3,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.models.template import Template
 from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateResponse
 from app.core.security import get_current_user_email
+from app.services.template_engine import TemplateError, compile_template
 
 router = APIRouter(prefix="/api/templates", tags=["Templates"])
 
 
+def validate_template(source: Optional[str]):
+    """Reject a template source the renderer cannot compile with a 400"""
+    if source is None:
+        return
+    try:
+        compile_template(source)
+    except TemplateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid template: {e}"
+        )
+
+
 @router.post("/", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
 async def create_template(
     template_data: TemplateCreate,
@@ -20,6 +34,9 @@ async def create_template(
 ):
     """Create a new email template"""
     
+    # Reject layouts the renderer cannot compile
+    validate_template(template_data.html_content)
+    
     new_template = Template(
         name=template_data.name,
         description=template_data.description,
@@ -87,6 +104,9 @@ async def update_template(
             detail="Template not found"
         )
     
+    # Reject layouts the renderer cannot compile
+    validate_template(template_data.html_content)
+    
     # Update fields
     update_data = template_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
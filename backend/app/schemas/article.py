@@ -18,6 +18,12 @@ class ArticleCreate(ArticleBase):
     pass
 
 
+class ArticleImport(ArticleCreate):
+    """One line of a bulk NDJSON import"""
+    is_published: bool = False
+    published_at: Optional[datetime] = None
+
+
 class ArticleUpdate(BaseModel):
     title: Optional[str] = None
     body: Optional[str] = None
@@ -33,6 +39,7 @@ class ArticleResponse(ArticleBase):
     author_id: int
     published_at: Optional[datetime]
     is_published: bool
+    view_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime]
     
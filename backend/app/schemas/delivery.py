@@ -0,0 +1,22 @@
+# app/schemas/delivery.py
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from app.models.delivery import DeliveryStatus
+
+
+class DeadLetterResponse(BaseModel):
+    id: int
+    newsletter_id: int
+    subscriber_id: int
+    email: str
+    status: DeliveryStatus
+    attempts: int
+    smtp_code: Optional[int]
+    last_error: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,28 @@
+# app/schemas/generate.py
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+from app.models.generation import GenerationStatus
+
+
+class GenerateNewsletterRequest(BaseModel):
+    topics: List[str] = []  # article tags to favour, most important first
+    template_id: Optional[int] = None  # layout; the default template when omitted
+    max_articles: Optional[int] = Field(None, ge=1, le=50)
+
+
+class GenerationJobResponse(BaseModel):
+    id: int
+    status: GenerationStatus
+    topics: List[str]
+    template_id: Optional[int]
+    max_articles: Optional[int]
+    newsletter_id: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
@@ -28,6 +28,7 @@ class NewsletterUpdate(BaseModel):
 
 class NewsletterResponse(NewsletterBase):
     id: int
+    content_text_generated: bool = False
     status: NewsletterStatus
     author_id: int
     template_id: Optional[int]
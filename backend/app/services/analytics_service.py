@@ -3,9 +3,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.analytics import Analytics
+from app.models.topic import TopicCluster
 from datetime import datetime
 import math
 
+TOP_TOPICS = 8
+TOP_CATEGORIES = 3  # the rest are summed as "Other"
+
 class AnalyticsService:
     """
     Centralized service to manage all analytics data
@@ -64,26 +68,39 @@ class AnalyticsService:
     @staticmethod
     async def get_categories(db: AsyncSession):
         """
-        Return category breakdown - dummy data (constant)
+        Return category breakdown - share of published articles (percent)
+        in the largest topic clusters, precomputed by topic clustering
         """
-        return [
-            {"name": "Technology", "value": 35},
-            {"name": "Business", "value": 25},
-            {"name": "Science", "value": 20},
-            {"name": "Other", "value": 20},
+        result = await db.execute(
+            select(TopicCluster.label, TopicCluster.size)
+            .where(TopicCluster.size > 0)
+            .order_by(TopicCluster.size.desc())
+        )
+        clusters = result.all()
+        total = sum(size for _, size in clusters)
+        if not total:
+            return []
+        
+        categories = [
+            {"name": label, "value": round(size / total * 100)}
+            for label, size in clusters[:TOP_CATEGORIES]
         ]
+        if len(clusters) > TOP_CATEGORIES:
+            categories.append({"name": "Other", "value": 100 - sum(c["value"] for c in categories)})
+        return categories
 
     @staticmethod
     async def get_topics(db: AsyncSession):
         """
-        Return top topics - dummy data (constant)
+        Return top topics - article counts of the largest topic clusters
         """
-        return [
-            {"name": "AI", "value": 24},
-            {"name": "ML", "value": 18},
-            {"name": "NLP", "value": 12},
-            {"name": "Vision", "value": 10},
-        ]
+        result = await db.execute(
+            select(TopicCluster.label, TopicCluster.size)
+            .where(TopicCluster.size > 0)
+            .order_by(TopicCluster.size.desc())
+            .limit(TOP_TOPICS)
+        )
+        return [{"name": label, "value": size} for label, size in result.all()]
 
     @staticmethod
     async def get_performance(db: AsyncSession):
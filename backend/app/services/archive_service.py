@@ -0,0 +1,127 @@
+# app/services/archive_service.py
+#
+# Public "view in browser" copies of sent newsletters. Each newsletter
+# version is rendered once and compressed ahead of time (gzip, plus brotli
+# when the brotli package is installed), so serving the archive is a lookup,
+# an ETag comparison and a write of bytes that already exist.
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+from app.core.config import settings
+from app.services.artifact_store import artifact_key, artifact_store
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+
+# Content codings in order of preference when a client accepts several
+ENCODINGS = ("br", "gzip", "identity") if brotli is not None else ("gzip", "identity")
+
+
+class ArchivedPage(NamedTuple):
+    """A rendered archive page and its precompressed bodies"""
+    etag: str  # strong validator of the uncompressed page, quoted
+    bodies: Dict[str, bytes]  # content coding -> body
+
+    def etag_for(self, encoding: str) -> str:
+        """Each representation gets its own strong ETag"""
+        if encoding == "identity":
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Weak comparison against an If-None-Match header, as RFC 9110 asks for"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        known = {self.etag_for(encoding) for encoding in self.bodies}
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in known:
+                return True
+        return False
+
+
+def build_archived_page(html: str) -> ArchivedPage:
+    """Hash and compress a rendered page once, at the highest levels each coding offers"""
+    body = html.encode("utf-8")
+    bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body, quality=11)
+    return ArchivedPage(f'"{hashlib.sha256(body).hexdigest()[:32]}"', bodies)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available) -> str:
+    """Pick the preferred coding the client accepts (q > 0); identity otherwise"""
+    if not accept_encoding:
+        return "identity"
+
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ENCODINGS:
+        if encoding == "identity" or encoding not in available:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+class ArchiveCache:
+    """
+    LRU of archived pages by newsletter version, in front of the artifact
+    store so other processes (delivery workers precompute at send time) and
+    restarts share the compressed bodies.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, ArchivedPage]" = OrderedDict()
+
+    async def get(self, version: Hashable) -> Optional[ArchivedPage]:
+        page = self._entries.get(version)
+        if page is not None:
+            self._entries.move_to_end(version)
+            return page
+
+        bodies = {}
+        for encoding in ENCODINGS:
+            body = await artifact_store.get(artifact_key("archive", version, encoding), compressed=False)
+            if body is None:
+                return None
+            bodies[encoding] = body
+        page = ArchivedPage(f'"{hashlib.sha256(bodies["identity"]).hexdigest()[:32]}"', bodies)
+        self._remember(version, page)
+        return page
+
+    async def put(self, version: Hashable, page: ArchivedPage):
+        for encoding, body in page.bodies.items():
+            # Stored as-is: the gzip and brotli bodies are compressed already
+            await artifact_store.put(artifact_key("archive", version, encoding), body, compress=False)
+        self._remember(version, page)
+
+    def _remember(self, version: Hashable, page: ArchivedPage):
+        self._entries[version] = page
+        self._entries.move_to_end(version)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Shared by the archive route and the send path
+archived_pages = ArchiveCache(settings.ARCHIVE_CACHE_SIZE)
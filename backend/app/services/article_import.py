@@ -0,0 +1,227 @@
+# app/services/article_import.py
+#
+# Batch upsert of articles from outside sources (feeds, bulk imports),
+# deduplicated by source_url. One batch costs one lookup of the URLs it
+# contains, one batched summary and keyword pass for the new articles and
+# one multi-row INSERT; new articles go through the same summary, tag and
+# duplicate-index steps as POST /api/articles/.
+#
+# import_ndjson feeds the upsert from a stream of NDJSON bytes: lines are
+# validated one at a time as they arrive and written batch by batch, each
+# batch in its own transaction, so memory does not grow with the upload.
+
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.article import Article
+from app.schemas.article import ArticleImport
+from app.services.derived_cache import derived_fields
+from app.services.duplicate_index import duplicate_index
+from app.services.keyword_tagger import keyword_tagger
+
+
+MAX_URL_LENGTH = 1000  # Article.source_url
+REPORTED_FIELD_ERRORS = 3  # validation problems listed per failed line
+
+
+class IncomingArticle(NamedTuple):
+    source_url: Optional[str]  # without one an article is always inserted
+    title: str
+    body: str
+    summary: Optional[str] = None
+    tags: List[str] = []
+    published_at: Optional[datetime] = None  # naive UTC; defaults to now
+    image_url: Optional[str] = None
+    is_published: bool = True
+
+
+async def upsert_articles(db: AsyncSession, items: Sequence[IncomingArticle], author_id: int) -> Dict[str, int]:
+    """
+    Insert articles whose source_url is new (or who have none), update the
+    title and body of known ones that changed, and leave the rest alone
+    (the last copy of a URL in `items` wins). The caller commits. Returns
+    the three counts.
+    """
+    by_url: Dict[str, IncomingArticle] = {}
+    unkeyed: List[IncomingArticle] = []
+    for item in items:
+        if item.source_url:
+            by_url[item.source_url] = item
+        else:
+            unkeyed.append(item)
+
+    existing: Dict[str, Article] = {}
+    if by_url:
+        result = await db.execute(select(Article).where(Article.source_url.in_(list(by_url))))
+        existing = {article.source_url: article for article in result.scalars().all()}
+
+    fresh = unkeyed + [item for url, item in by_url.items() if url not in existing]
+    changed = [
+        (existing[url], item) for url, item in by_url.items()
+        if url in existing and (existing[url].title != item.title[:500] or existing[url].body != item.body)
+    ]
+
+    # One batched summary pass for everything without a summary of its own
+    needs_summary = [item.body for item in fresh if not item.summary]
+    needs_summary += [item.body for _, item in changed if not item.summary]
+    summaries = iter(await derived_fields.get_many(db, needs_summary, "summary"))
+
+    extracted = await keyword_tagger.extract_many(db, [(item.title, item.body) for item in fresh])
+    now = datetime.utcnow()
+    articles = []
+    for item, (_, keywords) in zip(fresh, extracted):
+        articles.append(Article(
+            title=item.title[:500],
+            body=item.body,
+            summary=item.summary or next(summaries) or None,
+            author_id=author_id,
+            tags=item.tags or keywords,
+            source_url=item.source_url,
+            image_url=item.image_url,
+            is_published=item.is_published,
+            published_at=(item.published_at or now) if item.is_published else None
+        ))
+    db.add_all(articles)
+
+    for article, item in changed:
+        summary = item.summary or next(summaries) or None
+        if article.body != item.body:
+            await duplicate_index.index_article(db, article.id, item.body)
+        article.title = item.title[:500]
+        article.body = item.body
+        article.summary = summary
+        article.content_updated_at = func.now()
+    await db.flush()
+
+    await keyword_tagger.record_many(db, [article.id for article in articles], extracted)
+    await duplicate_index.index_new_articles(db, [(article.id, article.body) for article in articles])
+
+    return {
+        "inserted": len(fresh),
+        "updated": len(changed),
+        "unchanged": len(by_url) - (len(fresh) - len(unkeyed)) - len(changed)
+    }
+
+
+async def ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes], Optional[str]]]:
+    """
+    (line number, line, error) for each line of a byte stream. At most one
+    line is buffered; a line longer than `max_line_bytes` is dropped as it
+    arrives and reported with an error instead.
+    """
+    number = 0
+    buffer = bytearray()
+    oversized = False
+    async for chunk in chunks:
+        pieces = chunk.split(b"\n")
+        tail = pieces.pop()
+        for piece in pieces:
+            number += 1
+            # The first piece completes the line carried over in `buffer`
+            if oversized or len(buffer) + len(piece) > max_line_bytes:
+                yield number, None, f"Line is longer than {max_line_bytes} bytes"
+            else:
+                yield number, bytes(buffer + piece), None
+            buffer.clear()
+            oversized = False
+        if oversized or len(buffer) + len(tail) > max_line_bytes:
+            oversized = True
+            buffer.clear()
+        else:
+            buffer += tail
+    if oversized:
+        yield number + 1, None, f"Line is longer than {max_line_bytes} bytes"
+    elif buffer.strip():
+        yield number + 1, bytes(buffer), None
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        problems = []
+        for detail in error.errors()[:REPORTED_FIELD_ERRORS]:
+            location = ".".join(str(part) for part in detail["loc"])
+            problems.append(f"{location}: {detail['msg']}" if location else detail["msg"])
+        return "; ".join(problems)
+    return str(error) or type(error).__name__
+
+
+def parse_import_line(line: bytes) -> IncomingArticle:
+    """Validate one NDJSON line; raises ValueError (incl. ValidationError) when invalid"""
+    data = ArticleImport.model_validate_json(line)
+    published_at = data.published_at
+    if published_at is not None and published_at.tzinfo is not None:
+        published_at = published_at.astimezone(timezone.utc).replace(tzinfo=None)
+    source_url = str(data.source_url) if data.source_url else None
+    if source_url and len(source_url) > MAX_URL_LENGTH:
+        raise ValueError(f"source_url is longer than {MAX_URL_LENGTH} characters")
+    return IncomingArticle(
+        source_url=source_url,
+        title=data.title,
+        body=data.body,
+        summary=data.summary,
+        tags=data.tags,
+        published_at=published_at,
+        image_url=str(data.image_url) if data.image_url else None,
+        is_published=data.is_published
+    )
+
+
+async def import_ndjson(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    author_id: int,
+    batch_size: int = 500,
+    max_errors: int = 100
+) -> Dict[str, Any]:
+    """
+    Import one article per NDJSON line, committing every `batch_size`
+    valid lines. Invalid lines are skipped and reported (the first
+    `max_errors` of them, with line numbers); a batch the database rejects
+    is rolled back and its lines reported, and the import goes on.
+    """
+    totals = {"lines": 0, "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    errors: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, IncomingArticle]] = []
+
+    def fail(number: int, message: str):
+        totals["failed"] += 1
+        if len(errors) < max_errors:
+            errors.append({"line": number, "error": message})
+
+    async def write():
+        try:
+            counts = await upsert_articles(db, [item for _, item in batch], author_id)
+            await db.commit()
+            for key, value in counts.items():
+                totals[key] += value
+        except Exception as e:
+            await db.rollback()
+            for number, _ in batch:
+                fail(number, f"Batch rejected by the database: {_describe(e)}"[:500])
+        batch.clear()
+
+    async for number, line, error in ndjson_lines(chunks, settings.IMPORT_MAX_LINE_BYTES):
+        if error is None and not line.strip():
+            continue
+        totals["lines"] += 1
+        if error is not None:
+            fail(number, error)
+            continue
+        try:
+            batch.append((number, parse_import_line(line)))
+        except (ValueError, json.JSONDecodeError) as e:
+            fail(number, _describe(e))
+            continue
+        if len(batch) >= batch_size:
+            await write()
+    if batch:
+        await write()
+
+    return {**totals, "errors": errors}
@@ -0,0 +1,178 @@
+# app/services/artifact_store.py
+
+import asyncio
+import gzip
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.core.config import settings
+
+
+# Bump when the layout of stored artifacts changes
+ARTIFACT_FORMAT = 2
+
+
+def artifact_key(*parts) -> str:
+    """Content address for a rendered artifact: a hash of everything it depends on"""
+    return hashlib.sha256(repr((ARTIFACT_FORMAT,) + parts).encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """
+    Rendered newsletter artifacts (merged HTML, MIME payloads) on local disk.
+
+    Each artifact is one file named by its key, gzipped unless the caller
+    stores bytes that are already compressed. An in-memory index of file names,
+    rebuilt from file mtimes on first use, tracks sizes in LRU order; once
+    the total passes `max_bytes` the least recently used files are deleted.
+    Several processes may share a directory: a file another process evicted
+    is simply a miss, and one it stored joins the index when first read. Errors are logged and treated as misses, so the cache
+    can never fail a send. Disk access and (de)compression run in worker
+    threads; the index is only touched on the event loop.
+    """
+
+    def __init__(self, root: str, max_bytes: int, enabled: bool = True):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._index: Optional["OrderedDict[str, int]"] = None
+
+    @staticmethod
+    def _name(key: str, compressed: bool) -> str:
+        return f"{key}.gz" if compressed else f"{key}.raw"
+
+    def _path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        entries = []
+        if self.root.is_dir():
+            for path in self.root.glob("*/*"):
+                if path.suffix not in (".gz", ".raw"):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        entries.sort()
+        return OrderedDict((name, size) for _, name, size in entries)
+
+    async def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            index = await asyncio.to_thread(self._scan)
+            if self._index is None:
+                self._index = index
+                self.total_bytes = sum(index.values())
+        return self._index
+
+    def _forget(self, name: str):
+        size = self._index.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _read(self, path: Path, compressed: bool) -> Tuple[bytes, int]:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            data = f.read()
+        if compressed:
+            data = gzip.decompress(data)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data, size
+
+    def _write(self, path: Path, data: bytes, compress: bool) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6) if compress else data)
+        os.replace(temporary, path)
+        return path.stat().st_size
+
+    def _unlink(self, paths: List[Path]):
+        for path in paths:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    async def get(self, key: str, compressed: bool = True) -> Optional[bytes]:
+        """The stored bytes for `key`, or None; `compressed` must match the `put`"""
+        if not self.enabled:
+            return None
+        index = await self._load_index()
+        name = self._name(key, compressed)
+        try:
+            # Read even when the index has no entry: another process may
+            # have stored the artifact since the index was built
+            data, size = await asyncio.to_thread(self._read, self._path(name), compressed)
+        except (OSError, EOFError, zlib.error):
+            # Never stored, evicted by another process, or a torn file
+            self._forget(name)
+            self.misses += 1
+            return None
+
+        if name in index:
+            index.move_to_end(name)
+        else:
+            index[name] = size
+            self.total_bytes += size
+            await self._evict()
+        self.hits += 1
+        return data
+
+    async def put(self, key: str, data: bytes, compress: bool = True):
+        """
+        Store `data` under `key`, evicting old artifacts past the size limit.
+        Pass compress=False for bytes that are already compressed.
+        """
+        if not self.enabled:
+            return
+        index = await self._load_index()
+        name = self._name(key, compress)
+        try:
+            size = await asyncio.to_thread(self._write, self._path(name), data, compress)
+        except OSError as e:
+            print(f"⚠️ Could not store artifact {key[:12]}: {e}")
+            return
+
+        self._forget(name)
+        index[name] = size
+        self.total_bytes += size
+        await self._evict()
+
+    async def _evict(self):
+        index = self._index
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(index) > 1:
+            name, size = index.popitem(last=False)
+            self.total_bytes -= size
+            evicted.append(self._path(name))
+        if evicted:
+            await asyncio.to_thread(self._unlink, evicted)
+
+    async def stats(self) -> dict:
+        index = await self._load_index()
+        return {
+            "entries": len(index),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Shared store for the renderer and the send path
+artifact_store = ArtifactStore(
+    settings.ARTIFACT_CACHE_DIR,
+    settings.ARTIFACT_CACHE_MAX_BYTES,
+    enabled=settings.ARTIFACT_CACHE_ENABLED
+)
@@ -0,0 +1,522 @@
+# app/services/delivery_service.py
+
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, insert, update, literal, exists, or_
+from app.core.config import settings
+from app.models.delivery import DeliveryJob, DeliveryStatus
+from app.models.subscriber import Subscriber
+from app.services.email_service import DeliveryFailure, classify_exception
+from app.services.rate_limiter import DeliveryRateLimiter, delivery_rate_limiter, email_domain
+
+
+class Recipient(NamedTuple):
+    """A pending delivery job plus the subscriber columns it needs"""
+    job_id: int
+    attempts: int
+    id: int
+    email: str
+    full_name: Optional[str]
+    unsubscribe_token: Optional[str]
+    is_subscribed: bool
+    preferences: Optional[dict]
+
+
+class Shard(NamedTuple):
+    """A worker's slice of the outbox: jobs whose subscriber_id % count == index"""
+    index: int
+    count: int
+
+
+# Sends one message to a group of recipients and returns the refused ones,
+# keyed by job id, with the classified reply. Raising fails the whole group.
+SendFunction = Callable[[List[Recipient]], Awaitable[Dict[int, DeliveryFailure]]]
+
+
+class DeliveryResult(NamedTuple):
+    """
+    Outcome of one job. PENDING with `defer_until` means it goes out later:
+    throttled by the rate limiter, or (with `failure` set) a transient
+    error waiting for its retry.
+    """
+    recipient: Recipient
+    status: DeliveryStatus
+    failure: Optional[DeliveryFailure] = None
+    defer_until: Optional[datetime] = None
+
+    @property
+    def attempted(self) -> bool:
+        return self.status in (DeliveryStatus.SENT, DeliveryStatus.FAILED) or self.failure is not None
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with full jitter, in seconds, after `attempts` tries"""
+    ceiling = min(
+        settings.DELIVERY_RETRY_MAX_DELAY,
+        settings.DELIVERY_RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0))
+    )
+    return random.uniform(0, ceiling)
+
+
+def failure_result(recipient: Recipient, failure: DeliveryFailure) -> DeliveryResult:
+    """Schedule a retry for transient failures; dead-letter permanent or exhausted ones"""
+    attempts = recipient.attempts + 1
+    if failure.transient and attempts < settings.DELIVERY_MAX_ATTEMPTS:
+        defer_until = datetime.utcnow() + timedelta(seconds=retry_delay(attempts))
+        return DeliveryResult(recipient, DeliveryStatus.PENDING, failure, defer_until)
+    return DeliveryResult(recipient, DeliveryStatus.FAILED, failure)
+
+
+class DeliveryProgress:
+    """Running counters for one newsletter send"""
+
+    def __init__(self, newsletter_id: int, total: int, report_every: int):
+        self.newsletter_id = newsletter_id
+        self.total = total
+        self.report_every = report_every
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.retrying = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed + self.skipped
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def record(self, result: DeliveryResult):
+        status = result.status
+        if status == DeliveryStatus.SENT:
+            self.sent += 1
+        elif status == DeliveryStatus.SKIPPED:
+            self.skipped += 1
+        elif status == DeliveryStatus.PENDING:
+            # Throttled or awaiting a retry; counted once it settles
+            if result.failure is not None:
+                self.retrying += 1
+            else:
+                self.deferred += 1
+            return
+        else:
+            self.failed += 1
+        if self.report_every and self.processed % self.report_every == 0:
+            self.report()
+
+    def report(self):
+        print(
+            f"📬 Newsletter {self.newsletter_id}: {self.processed}/{self.total} processed "
+            f"({self.sent} sent, {self.failed} failed, {self.skipped} skipped, "
+            f"{self.deferred} deferrals, {self.retrying} retries, {self.rate:.0f} msg/s)"
+        )
+
+
+async def enqueue_newsletter(db: AsyncSession, newsletter_id: int) -> int:
+    """
+    Create a pending job for every active subscriber in one INSERT ... SELECT.
+    Subscribers that already have a job for this newsletter are left alone,
+    so calling this again when resuming a send never duplicates work.
+    """
+    already_queued = exists().where(
+        DeliveryJob.newsletter_id == newsletter_id,
+        DeliveryJob.subscriber_id == Subscriber.id
+    )
+    source = select(
+        literal(newsletter_id),
+        Subscriber.id,
+        literal(DeliveryStatus.PENDING, DeliveryJob.status.type),
+        literal(0)
+    ).where(Subscriber.is_subscribed == True, ~already_queued)
+
+    result = await db.execute(
+        insert(DeliveryJob).from_select(
+            ["newsletter_id", "subscriber_id", "status", "attempts"],
+            source
+        )
+    )
+    await db.commit()
+    return max(result.rowcount or 0, 0)
+
+
+def _pending(newsletter_id: Optional[int], shard: Optional[Shard]) -> list:
+    """WHERE clauses for pending jobs of a newsletter (any newsletter if None), within a shard"""
+    conditions = [DeliveryJob.status == DeliveryStatus.PENDING]
+    if newsletter_id is not None:
+        conditions.append(DeliveryJob.newsletter_id == newsletter_id)
+    if shard is not None and shard.count > 1:
+        conditions.append(DeliveryJob.subscriber_id % shard.count == shard.index)
+    return conditions
+
+
+def _is_due(now: datetime):
+    return or_(DeliveryJob.next_attempt_at.is_(None), DeliveryJob.next_attempt_at <= now)
+
+
+def _is_unclaimed(now: datetime):
+    return or_(DeliveryJob.claimed_until.is_(None), DeliveryJob.claimed_until <= now)
+
+
+async def count_pending_jobs(db: AsyncSession, newsletter_id: int, shard: Optional[Shard] = None) -> int:
+    result = await db.execute(
+        select(func.count(DeliveryJob.id)).where(*_pending(newsletter_id, shard))
+    )
+    return result.scalar() or 0
+
+
+async def newsletters_with_due_jobs(db: AsyncSession, shard: Optional[Shard] = None) -> List[int]:
+    """Newsletters that have pending jobs ready to send in this shard"""
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(DeliveryJob.newsletter_id)
+        .where(*_pending(None, shard), _is_due(now), _is_unclaimed(now))
+        .distinct()
+        .order_by(DeliveryJob.newsletter_id)
+    )
+    return list(result.scalars().all())
+
+
+async def claim_pending_batch(
+    db: AsyncSession,
+    newsletter_id: int,
+    after_job_id: int,
+    batch_size: int,
+    shard: Optional[Shard] = None
+) -> Tuple[List[Recipient], int]:
+    """
+    Claim one keyset page of due pending jobs and return them, joined to the
+    subscriber columns we need, with the last job id the page covered.
+
+    A claim is a lease of DELIVERY_CLAIM_TIMEOUT seconds, taken with one
+    conditional UPDATE and committed at once: jobs another process claimed
+    first are skipped, so concurrent drainers (API scheduler, workers)
+    never send the same job. Recording a result ends the lease; the jobs
+    of a crashed process become claimable again when it runs out.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(DeliveryJob.id)
+        .where(
+            *_pending(newsletter_id, shard),
+            DeliveryJob.id > after_job_id,
+            _is_due(now),
+            _is_unclaimed(now)
+        )
+        .order_by(DeliveryJob.id)
+        .limit(batch_size)
+    )
+    candidates = list(result.scalars().all())
+    if not candidates:
+        return [], after_job_id
+
+    result = await db.execute(
+        update(DeliveryJob)
+        .where(
+            DeliveryJob.id.in_(candidates),
+            DeliveryJob.status == DeliveryStatus.PENDING,
+            _is_unclaimed(now)
+        )
+        .values(claimed_until=now + timedelta(seconds=settings.DELIVERY_CLAIM_TIMEOUT))
+        .returning(DeliveryJob.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = list(result.scalars().all())
+    await db.commit()
+    if not claimed:
+        return [], candidates[-1]
+
+    result = await db.execute(
+        select(
+            DeliveryJob.id,
+            DeliveryJob.attempts,
+            Subscriber.id,
+            Subscriber.email,
+            Subscriber.full_name,
+            Subscriber.unsubscribe_token,
+            Subscriber.is_subscribed,
+            Subscriber.preferences
+        )
+        .join(Subscriber, Subscriber.id == DeliveryJob.subscriber_id)
+        .where(DeliveryJob.id.in_(claimed))
+        .order_by(DeliveryJob.id)
+    )
+    return [Recipient(*row) for row in result.all()], candidates[-1]
+
+
+async def next_deferred_at(
+    db: AsyncSession,
+    newsletter_id: int,
+    shard: Optional[Shard] = None
+) -> Optional[datetime]:
+    """When the earliest deferred job becomes due, or None if nothing is deferred"""
+    result = await db.execute(
+        select(func.min(DeliveryJob.next_attempt_at)).where(
+            *_pending(newsletter_id, shard),
+            DeliveryJob.next_attempt_at.isnot(None)
+        )
+    )
+    return result.scalar()
+
+
+def chunked(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def interleave_by_domain(batch: List[Recipient]) -> List[Recipient]:
+    """
+    Reorder a page round-robin across destination domains, so a run of
+    addresses at one throttled domain does not tie up every sender
+    """
+    by_domain: "OrderedDict[str, deque]" = OrderedDict()
+    for recipient in batch:
+        by_domain.setdefault(email_domain(recipient.email), deque()).append(recipient)
+
+    ordered = []
+    queues = list(by_domain.values())
+    while queues:
+        for queue in queues:
+            ordered.append(queue.popleft())
+        queues = [q for q in queues if q]
+    return ordered
+
+
+async def record_results(db: AsyncSession, results: List[DeliveryResult]):
+    """Persist a batch of outcomes with one bulk UPDATE and commit, ending their claims"""
+    if not results:
+        return
+    await db.execute(
+        update(DeliveryJob),
+        [
+            {
+                "id": result.recipient.job_id,
+                "status": result.status,
+                "attempts": result.recipient.attempts + result.attempted,
+                "last_error": str(result.failure)[:1000] if result.failure else None,
+                "smtp_code": result.failure.code if result.failure else None,
+                "next_attempt_at": result.defer_until,
+                "claimed_until": None,
+            }
+            for result in results
+        ]
+    )
+    await db.commit()
+
+
+async def release_claims(db: AsyncSession, job_ids: Iterable[int]):
+    """Hand claimed jobs that were never attempted back to the outbox"""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    await db.execute(
+        update(DeliveryJob)
+        .where(DeliveryJob.id.in_(job_ids), DeliveryJob.status == DeliveryStatus.PENDING)
+        .values(claimed_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def deliver(
+    db: AsyncSession,
+    newsletter_id: int,
+    send: SendFunction,
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    limiter: Optional[DeliveryRateLimiter] = None,
+    recipients_per_message: int = 1,
+    shard: Optional[Shard] = None,
+    stop: Optional[asyncio.Event] = None,
+    linger: Optional[float] = None,
+) -> DeliveryProgress:
+    """
+    Drain a newsletter's pending delivery jobs through a bounded pool of senders.
+
+    The reader claims keyset pages from the outbox (claim_pending_batch)
+    into a capped queue, so it only reads ahead once the senders have
+    caught up and memory stays flat however long the list is. A recorder
+    task commits outcomes as they come in, at most every
+    DELIVERY_RECORD_INTERVAL seconds, so a crash can only send twice what
+    finished within that interval: anything not yet recorded is still
+    PENDING and is sent again once its claim expires.
+
+    Every send first takes a token from the rate limiter. Messages that
+    would wait longer than DELIVERY_MAX_THROTTLE_WAIT are deferred, not
+    failed: they stay PENDING with a `next_attempt_at`. Transient SMTP
+    failures (4xx, dropped connections) are rescheduled the same way with
+    exponential backoff and jitter, up to DELIVERY_MAX_ATTEMPTS; permanent
+    (5xx) or exhausted ones are marked FAILED, which is the dead-letter
+    store. Further passes run while the next deferred job is due within
+    `linger` seconds; later ones are left for the next drain.
+
+    With `recipients_per_message` > 1, each send call gets up to that many
+    recipients to deliver as one SMTP transaction (one DATA payload, many
+    RCPT TO); per-recipient outcomes still come from the RCPT replies.
+
+    `shard` restricts the drain to one worker's slice of the outbox, and
+    setting `stop` makes it finish and record the sends in flight, leave
+    everything still queued PENDING, and return.
+    """
+    concurrency = concurrency or settings.DELIVERY_CONCURRENCY
+    batch_size = batch_size or settings.DELIVERY_BATCH_SIZE
+    limiter = limiter or delivery_rate_limiter
+    linger = settings.DELIVERY_MAX_LINGER if linger is None else linger
+
+    progress = DeliveryProgress(
+        newsletter_id,
+        total=await count_pending_jobs(db, newsletter_id, shard),
+        report_every=settings.DELIVERY_PROGRESS_EVERY
+    )
+    stop = stop or asyncio.Event()
+
+    while not stop.is_set():
+        await _drain_pass(
+            db, newsletter_id, send, concurrency, batch_size,
+            limiter, progress, max(recipients_per_message, 1), shard, stop
+        )
+
+        next_due = await next_deferred_at(db, newsletter_id, shard)
+        if next_due is None:
+            break
+        delay = (next_due.replace(tzinfo=None) - datetime.utcnow()).total_seconds()
+        if delay > linger:
+            break
+        if delay > 0:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    if not progress.report_every or progress.processed % progress.report_every:
+        progress.report()
+    return progress
+
+
+async def _drain_pass(
+    db: AsyncSession,
+    newsletter_id: int,
+    send: SendFunction,
+    concurrency: int,
+    batch_size: int,
+    limiter: DeliveryRateLimiter,
+    progress: DeliveryProgress,
+    recipients_per_message: int,
+    shard: Optional[Shard],
+    stop: asyncio.Event,
+):
+    """One pass over the jobs that are due right now"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: List[DeliveryResult] = []
+    claimed: Set[int] = set()
+    has_results = asyncio.Event()
+    finished = asyncio.Event()
+    # The reader and the recorder share one session
+    session_lock = asyncio.Lock()
+
+    async def flush():
+        async with session_lock:
+            # Dropped from `results` only once committed, so a cancelled
+            # flush never loses outcomes
+            pending = results[:]
+            await record_results(db, pending)
+            del results[:len(pending)]
+            claimed.difference_update(result.recipient.job_id for result in pending)
+
+    async def reader():
+        last_id = 0
+        while not stop.is_set():
+            async with session_lock:
+                batch, scanned_to = await claim_pending_batch(db, newsletter_id, last_id, batch_size, shard)
+            if scanned_to == last_id:
+                break
+            last_id = scanned_to
+            claimed.update(recipient.job_id for recipient in batch)
+            for group in chunked(interleave_by_domain(batch), recipients_per_message):
+                if stop.is_set():
+                    break
+                await queue.put(group)
+
+    async def recorder():
+        while not finished.is_set():
+            await has_results.wait()
+            has_results.clear()
+            await flush()
+            try:
+                await asyncio.wait_for(finished.wait(), timeout=settings.DELIVERY_RECORD_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process(group: List[Recipient]) -> List[DeliveryResult]:
+        outcomes = []
+        ready = []
+        for recipient in group:
+            if not recipient.is_subscribed:
+                outcomes.append(DeliveryResult(recipient, DeliveryStatus.SKIPPED))
+                continue
+
+            wait = await limiter.acquire(
+                email_domain(recipient.email),
+                max_wait=settings.DELIVERY_MAX_THROTTLE_WAIT
+            )
+            if wait is not None:
+                defer_until = datetime.utcnow() + timedelta(seconds=wait)
+                outcomes.append(DeliveryResult(recipient, DeliveryStatus.PENDING, defer_until=defer_until))
+            else:
+                ready.append(recipient)
+
+        if not ready:
+            return outcomes
+
+        try:
+            refused = await send(ready)
+        except Exception as e:
+            failure = classify_exception(e)
+            print(f"❌ Delivery to {len(ready)} recipient(s) failed: {failure}")
+            refused = {recipient.job_id: failure for recipient in ready}
+
+        for recipient in ready:
+            failure = refused.get(recipient.job_id)
+            if failure is None:
+                outcomes.append(DeliveryResult(recipient, DeliveryStatus.SENT))
+            else:
+                outcomes.append(failure_result(recipient, failure))
+        return outcomes
+
+    async def worker():
+        while True:
+            group = await queue.get()
+            if stop.is_set():
+                # Left PENDING; whoever drains this shard next picks it up
+                queue.task_done()
+                continue
+            for result in await process(group):
+                results.append(result)
+                progress.record(result)
+            has_results.set()
+            queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    recording = asyncio.create_task(recorder())
+    try:
+        await reader()
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        finished.set()
+        has_results.set()
+        await asyncio.gather(recording, return_exceptions=True)
+        # Record whatever finished, even when we are being torn down, and
+        # give back the jobs that were claimed but never attempted
+        await flush()
+        async with session_lock:
+            await release_claims(db, claimed)
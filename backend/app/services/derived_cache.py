@@ -0,0 +1,157 @@
+# app/services/derived_cache.py
+#
+# Values derived from an article body, computed once per distinct body:
+#
+#     summary   extractive TextRank summary
+#     excerpt   the opening of the body as plain text
+#     stats     word count and reading time
+#
+# Keys are a SHA-256 of the body, so editing an article's title, tags or
+# image never recomputes anything, and identical bodies share the work.
+# Values live in the derived_fields table behind an in-memory LRU; each
+# field has a version that is bumped when its algorithm changes.
+
+import asyncio
+import hashlib
+import math
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.derived import DerivedField
+from app.services.html_to_text import html_to_text
+
+
+EXCERPT_CHARS = 200
+WORDS_PER_MINUTE = 200
+
+
+def _summaries(bodies: Sequence[str]) -> List[str]:
+    # Imported here: the summarizer itself reads through this cache
+    from app.services.summarizer import summarize_batch
+    return summarize_batch(bodies)
+
+
+def excerpt(text: str, length: int = EXCERPT_CHARS) -> str:
+    """The first `length` characters of plain text, cut at a word boundary"""
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "..."
+
+
+def _excerpts(bodies: Sequence[str]) -> List[str]:
+    return [excerpt(html_to_text(body, footnotes=False)) for body in bodies]
+
+
+def _stats(bodies: Sequence[str]) -> List[Dict[str, int]]:
+    stats = []
+    for body in bodies:
+        words = len(html_to_text(body, footnotes=False).split())
+        stats.append({"words": words, "reading_minutes": max(math.ceil(words / WORDS_PER_MINUTE), 1)})
+    return stats
+
+
+# field -> (version, batch function from bodies to values)
+DERIVERS: Dict[str, Tuple[int, Callable[[Sequence[str]], List[Any]]]] = {
+    "summary": (2, _summaries),
+    "excerpt": (1, _excerpts),
+    "stats": (1, _stats),
+}
+
+
+def _insert_ignoring_duplicates(db: AsyncSession):
+    """INSERT that skips rows another worker stored meanwhile, where the dialect supports it"""
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(DerivedField)
+    return dialect_insert(DerivedField).on_conflict_do_nothing()
+
+
+def body_hash(body: str) -> str:
+    return hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+
+
+class DerivedFieldCache:
+    """In-memory LRU over the derived_fields table; misses are computed in one batch"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.loaded = 0
+        self.computed = 0
+
+    async def get(self, db: AsyncSession, body: str, field: str) -> Any:
+        """The derived `field` of one body"""
+        return (await self.get_many(db, [body], field))[0]
+
+    async def get_many(self, db: AsyncSession, bodies: Sequence[str], field: str) -> List[Any]:
+        """
+        The derived `field` of each body: from memory, else the side table,
+        else computed (one batch call for all misses) and stored. New rows
+        are added to `db`; the caller's commit persists them.
+        """
+        version, derive = DERIVERS[field]
+        hashes = [body_hash(body) for body in bodies]
+        values: Dict[str, Any] = {}
+
+        missing = []
+        for digest in dict.fromkeys(hashes):
+            key = (field, version, digest)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                values[digest] = self._entries[key]
+                self.hits += 1
+            else:
+                missing.append(digest)
+
+        if missing:
+            result = await db.execute(
+                select(DerivedField.body_hash, DerivedField.value).where(
+                    DerivedField.field == field,
+                    DerivedField.version == version,
+                    DerivedField.body_hash.in_(missing)
+                )
+            )
+            for digest, value in result.all():
+                values[digest] = value
+                self._remember((field, version, digest), value)
+                self.loaded += 1
+            missing = [digest for digest in missing if digest not in values]
+
+        if missing:
+            first_body = {}
+            for digest, body in zip(hashes, bodies):
+                first_body.setdefault(digest, body)
+            # CPU-bound; keep the event loop free meanwhile
+            computed = await asyncio.to_thread(derive, [first_body[digest] for digest in missing])
+            for digest, value in zip(missing, computed):
+                values[digest] = value
+                self._remember((field, version, digest), value)
+            self.computed += len(missing)
+            await self._store(db, field, version, dict(zip(missing, computed)))
+
+        return [values[digest] for digest in hashes]
+
+    async def _store(self, db: AsyncSession, field: str, version: int, values: Dict[str, Any]):
+        rows = [
+            {"body_hash": digest, "field": field, "version": version, "value": value}
+            for digest, value in values.items()
+        ]
+        await db.execute(_insert_ignoring_duplicates(db), rows)
+
+    def _remember(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Shared by article routes, the feed, the summarizer and generation
+derived_fields = DerivedFieldCache(settings.DERIVED_CACHE_SIZE)
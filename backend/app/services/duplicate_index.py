@@ -0,0 +1,316 @@
+# app/services/duplicate_index.py
+#
+# Near-duplicate articles (the same story published from several sources)
+# with MinHash and locality-sensitive hashing:
+#
+#   - a body becomes a set of word 3-gram shingles, hashed with CRC32
+#   - its signature holds, for each of PERMUTATIONS random hash functions,
+#     the minimum over those shingles; the share of positions two
+#     signatures agree on estimates the Jaccard similarity of the bodies
+#   - the signature is cut into BANDS bands of ROWS values; articles equal
+#     on a whole band share a bucket and become candidates, which are then
+#     checked against DUPLICATE_THRESHOLD
+#
+# Each band's buckets are a sorted NumPy array searched by bisection, plus
+# a dict of recent additions merged in every MERGE_EVERY articles, so a
+# lookup only ever compares an article with its bucket-mates.
+#
+# Signatures written by other processes (feed and import workers, other API
+# workers) are picked up by an incremental sync of article_signatures rows
+# newer than the last one seen, at most every SYNC_INTERVAL seconds.
+
+import asyncio
+import re
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.article import Article
+from app.models.derived import ArticleSignature
+from app.services.html_to_text import html_to_text
+
+
+PERMUTATIONS = 64
+BANDS = 16
+ROWS = PERMUTATIONS // BANDS  # with 16 x 4, pairs above ~0.5 similarity almost always collide
+SHINGLE_SIZE = 3
+PRIME = (1 << 31) - 1
+MERGE_EVERY = 1024
+LOAD_BATCH = 1000
+SYNC_INTERVAL = 5.0  # seconds between syncs with signatures stored elsewhere
+SYNC_OVERLAP = timedelta(seconds=60)  # rows from transactions still open at the last sync
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Fixed seed: signatures are stored, so every process must hash the same way
+_random = np.random.RandomState(1337)
+_MULTIPLIERS = _random.randint(1, PRIME, size=PERMUTATIONS).astype(np.uint64)
+_OFFSETS = _random.randint(0, PRIME, size=PERMUTATIONS).astype(np.uint64)
+_BAND_MIX = _random.randint(1, 1 << 62, size=ROWS, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+
+
+def minhash(body: str) -> Optional[np.ndarray]:
+    """MinHash signature (uint32 per permutation) of a body; None when it has no words"""
+    words = WORD_PATTERN.findall(html_to_text(body or "", footnotes=False).lower())
+    if not words:
+        return None
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    ) % np.uint64(PRIME)
+    # (a * h + b) mod p for every permutation and shingle; fits in 64 bits
+    permuted = (_MULTIPLIERS[:, None] * hashes[None, :] + _OFFSETS[:, None]) % np.uint64(PRIME)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """One 64-bit bucket key per band, for a signature or an (n, PERMUTATIONS) stack"""
+    bands = signatures.reshape(signatures.shape[:-1] + (BANDS, ROWS)).astype(np.uint64)
+    return (bands * _BAND_MIX).sum(axis=-1)
+
+
+class DuplicateIndex:
+    """In-memory LSH index over the stored signatures of every article"""
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self.signatures: Dict[int, np.ndarray] = {}
+        self.loaded = False
+        self._keys = [np.empty(0, dtype=np.uint64) for _ in range(BANDS)]
+        self._owners = [np.empty(0, dtype=np.int64) for _ in range(BANDS)]
+        self._recent: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._recent_count = 0
+        self._lock = asyncio.Lock()
+        self._warm_up: Optional[asyncio.Task] = None
+        self._synced_to: Optional[datetime] = None  # newest stored signature seen
+        self._synced_at = 0.0
+
+    # In-memory index
+
+    def add(self, article_id: int, signature: np.ndarray):
+        # A replaced signature leaves stale bucket entries behind; lookups
+        # verify against the current signature and the next merge drops them
+        self.signatures[article_id] = signature
+        for band, key in enumerate(band_keys(signature).tolist()):
+            self._recent[band].setdefault(key, []).append(article_id)
+        self._recent_count += 1
+        if self._recent_count >= MERGE_EVERY:
+            self._rebuild()
+
+    def remove(self, article_id: int):
+        self.signatures.pop(article_id, None)
+
+    def _rebuild(self):
+        """Merge recent additions into the sorted per-band arrays"""
+        self._recent = [{} for _ in range(BANDS)]
+        self._recent_count = 0
+        if not self.signatures:
+            self._keys = [np.empty(0, dtype=np.uint64) for _ in range(BANDS)]
+            self._owners = [np.empty(0, dtype=np.int64) for _ in range(BANDS)]
+            return
+
+        ids = np.fromiter(self.signatures.keys(), dtype=np.int64, count=len(self.signatures))
+        keys = band_keys(np.stack(list(self.signatures.values())))
+        for band in range(BANDS):
+            order = np.argsort(keys[:, band], kind="stable")
+            self._keys[band] = keys[order, band]
+            self._owners[band] = ids[order]
+
+    def candidates(self, signature: np.ndarray) -> Set[int]:
+        """Articles sharing at least one band bucket with `signature`"""
+        found: Set[int] = set()
+        for band, key in enumerate(band_keys(signature).tolist()):
+            keys = self._keys[band]
+            start = np.searchsorted(keys, key, side="left")
+            end = np.searchsorted(keys, key, side="right")
+            if end > start:
+                found.update(self._owners[band][start:end].tolist())
+            found.update(self._recent[band].get(key, ()))
+        return found
+
+    def duplicates(self, article_id: int) -> List[Tuple[int, float]]:
+        """Other articles at or above the threshold, most similar first"""
+        signature = self.signatures.get(article_id)
+        if signature is None:
+            return []
+        matches = []
+        for other in self.candidates(signature):
+            other_signature = self.signatures.get(other)
+            if other == article_id or other_signature is None:
+                continue
+            similarity = int(np.count_nonzero(signature == other_signature)) / PERMUTATIONS
+            if similarity >= self.threshold:
+                matches.append((other, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def collapse(self, article_ids: Sequence[int]) -> List[int]:
+        """`article_ids` in order, minus any article that duplicates one kept before it"""
+        kept: List[int] = []
+        shown: Set[int] = set()
+        for article_id in article_ids:
+            if any(other in shown for other, _ in self.duplicates(article_id)):
+                continue
+            kept.append(article_id)
+            shown.add(article_id)
+        return kept
+
+    # Persistence
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """
+        Wait for the index to load (in its own session), then pick up
+        signatures other processes stored since; for background jobs
+        """
+        if not self.loaded:
+            self.start()
+            await asyncio.shield(self._warm_up)
+            if not self.loaded:
+                raise RuntimeError("The duplicate index could not be loaded")
+        await self._sync_if_due(db)
+
+    async def ready(self, db: AsyncSession) -> bool:
+        """
+        For the request path: whether the index is loaded (syncing it when
+        due). Never waits for the initial load; it starts one if needed.
+        """
+        if not self.loaded:
+            self.start()
+            return False
+        await self._sync_if_due(db)
+        return True
+
+    async def _sync_if_due(self, db: AsyncSession):
+        if time.monotonic() - self._synced_at < SYNC_INTERVAL:
+            return
+        async with self._lock:
+            # Concurrent requests queue on the lock; only the first syncs
+            if time.monotonic() - self._synced_at >= SYNC_INTERVAL:
+                await self._sync(db)
+
+    async def sync(self, db: AsyncSession) -> int:
+        """Index signatures stored since the last load or sync; returns how many were new"""
+        async with self._lock:
+            return await self._sync(db)
+
+    async def _sync(self, db: AsyncSession) -> int:
+        self._synced_at = time.monotonic()
+        query = select(ArticleSignature.article_id, ArticleSignature.signature, ArticleSignature.created_at)
+        if self._synced_to is not None:
+            query = query.where(ArticleSignature.created_at >= self._synced_to - SYNC_OVERLAP)
+        result = await db.execute(query.order_by(ArticleSignature.created_at))
+
+        added = 0
+        for article_id, blob, created_at in result.all():
+            self._synced_to = created_at
+            signature = np.frombuffer(blob, dtype=np.uint32)
+            known = self.signatures.get(article_id)
+            if known is None or not np.array_equal(known, signature):
+                self.add(article_id, signature)
+                added += 1
+        return added
+
+    async def _load_all(self, db: AsyncSession):
+        """Load every stored signature, computing any that are missing"""
+        # Signatures from a different PERMUTATIONS setting are recomputed
+        await db.execute(
+            delete(ArticleSignature).where(func.length(ArticleSignature.signature) != PERMUTATIONS * 4)
+        )
+        await db.commit()
+
+        result = await db.execute(select(ArticleSignature.article_id, ArticleSignature.signature))
+        for article_id, blob in result.all():
+            self.signatures[article_id] = np.frombuffer(blob, dtype=np.uint32)
+        computed = await self._index_unsigned(db)
+
+        result = await db.execute(select(func.max(ArticleSignature.created_at)))
+        self._synced_to = result.scalar()
+        self._synced_at = time.monotonic()
+        self._rebuild()
+        self.loaded = True
+        print(f"🧬 Duplicate index ready: {len(self.signatures)} articles ({computed} signatures computed)")
+
+    async def _index_unsigned(self, db: AsyncSession) -> int:
+        """Sign articles stored before signatures existed, in id-ordered batches"""
+        computed = 0
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(Article.id, Article.body)
+                .outerjoin(ArticleSignature, ArticleSignature.article_id == Article.id)
+                .where(ArticleSignature.article_id.is_(None), Article.id > last_id)
+                .order_by(Article.id)
+                .limit(LOAD_BATCH)
+            )
+            rows = result.all()
+            if not rows:
+                return computed
+
+            signatures = await asyncio.to_thread(lambda: [minhash(row.body) for row in rows])
+            for row, signature in zip(rows, signatures):
+                if signature is not None:
+                    db.add(ArticleSignature(article_id=row.id, signature=signature.tobytes()))
+                    self.signatures[row.id] = signature
+                    computed += 1
+            await db.commit()
+            last_id = rows[-1].id
+
+    async def index_article(self, db: AsyncSession, article_id: int, body: str):
+        """Store (replacing) an article's signature and index it; the caller commits"""
+        signature = minhash(body)
+        await db.execute(delete(ArticleSignature).where(ArticleSignature.article_id == article_id))
+        if signature is None:
+            self.remove(article_id)
+            return
+        db.add(ArticleSignature(article_id=article_id, signature=signature.tobytes()))
+        if self.loaded:
+            self.add(article_id, signature)
+
+    async def index_new_articles(self, db: AsyncSession, articles: Sequence[Tuple[int, str]]):
+        """index_article() for many just-inserted (id, body) pairs; the caller commits"""
+        signatures = await asyncio.to_thread(lambda: [minhash(body) for _, body in articles])
+        for (article_id, _), signature in zip(articles, signatures):
+            if signature is None:
+                continue
+            db.add(ArticleSignature(article_id=article_id, signature=signature.tobytes()))
+            if self.loaded:
+                self.add(article_id, signature)
+
+    async def forget_article(self, db: AsyncSession, article_id: int):
+        """Drop an article's signature; the caller commits"""
+        await db.execute(delete(ArticleSignature).where(ArticleSignature.article_id == article_id))
+        self.remove(article_id)
+
+    def start(self):
+        """Load in the background so the first feed request does not wait for it"""
+        if self._warm_up is None or (self._warm_up.done() and not self.loaded):
+            self._warm_up = asyncio.create_task(self._load())
+
+    async def close(self):
+        if self._warm_up is not None:
+            self._warm_up.cancel()
+            await asyncio.gather(self._warm_up, return_exceptions=True)
+            self._warm_up = None
+
+    async def _load(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                async with self._lock:
+                    if not self.loaded:
+                        await self._load_all(db)
+        except Exception as e:
+            print(f"⚠️ Could not load the duplicate index: {e}")
+
+
+# Shared index, loaded by the API lifespan
+duplicate_index = DuplicateIndex(settings.DUPLICATE_THRESHOLD)
@@ -1,41 +1,123 @@
 # app/services/email_service.py
 
-import aiosmtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlencode
+from aiosmtplib.errors import SMTPAuthenticationError, SMTPRecipientsRefused, SMTPResponseException
 from app.core.config import settings
+from app.services.mime_cache import PreparedMessage
+from app.services.smtp_pool import smtp_pool
+
+
+# To header for messages whose envelope carries many recipients
+UNDISCLOSED_RECIPIENTS = "undisclosed-recipients:;"
+
+
+class DeliveryFailure(NamedTuple):
+    """Why a recipient did not get a message, and whether trying again may help"""
+    code: Optional[int]
+    message: str
+    transient: bool
+    
+    def __str__(self) -> str:
+        return f"{self.code} {self.message}" if self.code else self.message
+
+
+def classify_smtp_reply(code: int, message: str) -> DeliveryFailure:
+    """4xx replies are temporary (greylisting, throttling, full mailbox); 5xx are final"""
+    return DeliveryFailure(code, message, transient=code < 500)
+
+
+def classify_exception(exc: Exception) -> DeliveryFailure:
+    """Turn an exception raised during a send into a DeliveryFailure"""
+    if isinstance(exc, SMTPAuthenticationError):
+        # Our credentials, not the recipient: retry once the config is fixed
+        return DeliveryFailure(exc.code, exc.message, transient=True)
+    if isinstance(exc, SMTPResponseException):
+        return classify_smtp_reply(exc.code, exc.message)
+    # Timeouts, refused connections, dropped sessions
+    return DeliveryFailure(None, str(exc) or type(exc).__name__, transient=True)
 
 
 async def send_email(to_email: str, subject: str, html_content: str, text_content: str = None):
-    """Send email via SMTP"""
-    
-    message = MIMEMultipart("alternative")
-    message["Subject"] = subject
-    message["From"] = f"{settings.FROM_NAME} <{settings.FROM_EMAIL}>"
-    message["To"] = to_email
+    """Send email via a pooled SMTP session"""
     
-    # Add text and HTML parts
-    if text_content:
-        part1 = MIMEText(text_content, "plain")
-        message.attach(part1)
-    
-    part2 = MIMEText(html_content, "html")
-    message.attach(part2)
+    return await send_prepared_email(PreparedMessage(subject, html_content, text_content), to_email)
+
+
+async def send_prepared_email(
+    prepared: PreparedMessage,
+    to_email: str,
+    unsubscribe_url: str = None,
+    message_id: str = None
+):
+    """Send a pre-rendered message, splicing in only the per-recipient headers"""
     
     try:
-        await aiosmtplib.send(
-            message,
-            hostname=settings.SMTP_HOST,
-            port=settings.SMTP_PORT,
-            username=settings.SMTP_USER,
-            password=settings.SMTP_PASSWORD,
-            start_tls=True
+        refused = await deliver_prepared(
+            prepared, [to_email],
+            unsubscribe_url=unsubscribe_url,
+            message_id=message_id
         )
-        print(f"✅ Email sent to {to_email}")
-        return True
     except Exception as e:
-        print(f"❌ Failed to send email to {to_email}: {e}")
+        refused = {to_email: classify_exception(e)}
+    
+    if refused:
+        print(f"❌ Failed to send email to {to_email}: {refused[to_email]}")
         return False
+    
+    print(f"✅ Email sent to {to_email}")
+    return True
+
+
+async def deliver_prepared(
+    prepared: PreparedMessage,
+    recipients: List[str],
+    to_header: str = None,
+    unsubscribe_url: str = None,
+    message_id: str = None
+) -> Dict[str, DeliveryFailure]:
+    """
+    Send one pre-rendered message to one or more envelope recipients in a
+    single SMTP transaction. Returns the recipients the server refused,
+    mapped to the classified reply; raises if the transaction itself fails.
+    """
+    
+    if to_header is None:
+        to_header = recipients[0] if len(recipients) == 1 else UNDISCLOSED_RECIPIENTS
+    message = prepared.render(to_header, unsubscribe_url=unsubscribe_url, message_id=message_id)
+    
+    try:
+        refused, _ = await smtp_pool.sendmail(settings.FROM_EMAIL, recipients, message)
+    except SMTPRecipientsRefused as e:
+        # Every RCPT TO was rejected
+        refused = {error.recipient: error for error in e.recipients}
+    
+    return {
+        recipient: classify_smtp_reply(error.code, error.message)
+        for recipient, error in refused.items()
+    }
+
+
+async def queue_email(to_email: str, subject: str, html_content: str, text_content: str = None):
+    """Hand an email to the background outbox so the caller does not wait on SMTP"""
+    
+    # Imported here: the outbox sends through this module
+    from app.services.mail_outbox import mail_outbox
+    
+    await mail_outbox.enqueue(to_email, subject, html_content, text_content)
+
+
+def build_unsubscribe_url(email: str = None, token: str = None) -> str:
+    """Link to the frontend unsubscribe page, personalized when an email is given"""
+    
+    params = {}
+    if email:
+        params["email"] = email
+    if token:
+        params["token"] = token
+    if not params:
+        return f"{settings.FRONTEND_URL}/unsubscribe"
+    return f"{settings.FRONTEND_URL}/unsubscribe?{urlencode(params)}"
 
 
 async def send_verification_email(email: str, token: str):
@@ -63,7 +145,7 @@ async def send_verification_email(email: str, token: str):
     This link will expire in 24 hours.
     """
     
-    await send_email(email, "Verify Your Email - VBIT Newsletter", html_content, text_content)
+    await queue_email(email, "Verify Your Email - VBIT Newsletter", html_content, text_content)
 
 
 async def send_reset_password_email(email: str, token: str):
@@ -94,7 +176,7 @@ async def send_reset_password_email(email: str, token: str):
     If you didn't request this, please ignore this email.
     """
     
-    await send_email(email, "Reset Your Password - VBIT Newsletter", html_content, text_content)
+    await queue_email(email, "Reset Your Password - VBIT Newsletter", html_content, text_content)
 
 
 async def send_team_invite_email(email: str, team_name: str, role: str):
@@ -112,4 +194,4 @@ async def send_team_invite_email(email: str, team_name: str, role: str):
     </html>
     """
     
-    await send_email(email, f"Invitation to join {team_name}", html_content)
+    await queue_email(email, f"Invitation to join {team_name}", html_content)
@@ -0,0 +1,145 @@
+# app/services/feed_parser.py
+#
+# Incremental RSS 2.0 / RSS 1.0 / Atom parsing. Bytes are pushed in as they
+# arrive (XMLPullParser, the push-driven form of iterparse); every finished
+# item or entry becomes a FeedItem and is dropped from the tree at once, so
+# memory stays flat however long the feed is.
+
+import email.utils
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+
+ATOM = "http://www.w3.org/2005/Atom"
+MEDIA = "http://search.yahoo.com/mrss/"
+ITEM_TAGS = frozenset({"item", "entry"})
+DATE_TAGS = ("pubDate", "published", "date", "issued")
+
+
+class FeedItem(NamedTuple):
+    title: str
+    link: Optional[str]
+    body: str  # full content when the feed has it, else the description
+    summary: Optional[str]  # the description, when there is separate content
+    tags: List[str]
+    published_at: Optional[datetime]  # naive UTC
+    image_url: Optional[str]
+
+
+def _split(tag: str) -> Tuple[str, str]:
+    """(namespace, local name) of an ElementTree tag"""
+    if tag[:1] == "{":
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """RFC 822 (RSS) or RFC 3339 (Atom) date as naive UTC; None if unreadable"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _inner_xml(element: ET.Element) -> str:
+    """Markup inside an element (Atom type="xhtml" content), without namespace prefixes"""
+    for descendant in element.iter():
+        descendant.tag = _split(descendant.tag)[1]
+    parts = [element.text or ""]
+    for child in element:
+        parts.append(ET.tostring(child, encoding="unicode"))
+    return "".join(parts).strip()
+
+
+def _item(element: ET.Element) -> FeedItem:
+    title = link = permalink = content = description = image = None
+    published = updated = None
+    tags: List[str] = []
+
+    for child in element:
+        namespace, name = _split(child.tag)
+        text = (child.text or "").strip()
+        if name == "title" and namespace != MEDIA:
+            title = text
+        elif name == "link":
+            href = child.get("href")
+            rel = child.get("rel", "alternate")
+            if href is None:
+                link = link or text
+            elif rel == "alternate":
+                link = link or href
+            elif rel == "enclosure" and child.get("type", "").startswith("image/"):
+                image = image or href
+        elif name in ("guid", "id") and text.startswith(("http://", "https://")):
+            if child.get("isPermaLink", "true") != "false":
+                permalink = text
+        elif name == "encoded" or name == "content" and namespace == ATOM:
+            content = _inner_xml(child) if child.get("type") == "xhtml" else text
+        elif name in ("description", "summary"):
+            description = text
+        elif name in DATE_TAGS:
+            published = published or parse_date(text)
+        elif name == "updated":
+            updated = parse_date(text)
+        elif name == "category":
+            term = child.get("term") or text
+            if term and term not in tags:
+                tags.append(term)
+        elif name == "enclosure" and child.get("type", "").startswith("image/"):
+            image = image or child.get("url")
+        elif namespace == MEDIA and name in ("content", "thumbnail") and child.get("url"):
+            if name == "thumbnail" or child.get("medium") == "image" or child.get("type", "").startswith("image/"):
+                image = image or child.get("url")
+
+    link = link or permalink
+    return FeedItem(
+        title=title or link or "",
+        link=link,
+        body=content or description or "",
+        summary=description if content and description else None,
+        tags=tags,
+        published_at=published or updated,
+        image_url=image
+    )
+
+
+class FeedParser:
+    """Push bytes with feed(); each call returns the items completed so far"""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._open: List[ET.Element] = []
+
+    def feed(self, data: bytes) -> List[FeedItem]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[FeedItem]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[FeedItem]:
+        items = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._open.append(element)
+                continue
+            self._open.pop()
+            if _split(element.tag)[1] in ITEM_TAGS:
+                items.append(_item(element))
+                # Detach the finished item so the tree never grows
+                if self._open:
+                    self._open[-1].remove(element)
+                element.clear()
+        return items
@@ -0,0 +1,195 @@
+# app/services/generation_jobs.py
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.generation import GenerationJob, GenerationStatus
+from app.models.user import User
+from app.services.newsletter_service import generate_newsletter_content
+
+
+class QueueFull(Exception):
+    """Raised by `submit` when GENERATION_QUEUE_SIZE jobs are already waiting"""
+
+
+class GenerationJobRunner:
+    """
+    Runs newsletter generation jobs from the generation_jobs table on a
+    fixed number of worker tasks, each job with its own database session.
+    Requests beyond the worker count wait in the queue instead of running
+    concurrently on the event loop. A job is claimed with a conditional
+    UPDATE, so when several API processes re-queue the same leftovers on
+    startup each job still runs once.
+
+    Until `start()` is called (scripts, one-off CLIs) `submit` runs the job inline.
+    """
+
+    def __init__(self, workers: int = 2, max_size: int = 100, timeout: float = 300.0):
+        self.workers = workers
+        self.max_size = max_size
+        self.timeout = timeout
+        self.completed = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._requeue: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Start the workers and pick up jobs left queued by the last run"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(self.workers, 1))]
+
+        leftovers = await self._recover()
+        if leftovers:
+            # There may be more than the queue holds; feed them in as it drains
+            self._requeue = asyncio.create_task(self._requeue_leftovers(leftovers))
+
+    async def close(self, timeout: float = 10.0):
+        """Give running jobs `timeout` seconds to finish, then stop the workers"""
+        if not self._tasks:
+            return
+        if self._requeue is not None:
+            # Jobs not fed in yet stay QUEUED for the next start
+            self._requeue.cancel()
+            await asyncio.gather(self._requeue, return_exceptions=True)
+            self._requeue = None
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job_id: int):
+        """Queue a stored job; raises QueueFull when the queue is at capacity"""
+        if not self._tasks:
+            await self._run(job_id)
+            return
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise QueueFull(f"{self.max_size} generation jobs are already queued")
+
+    async def _requeue_leftovers(self, job_ids: List[int]):
+        queued = 0
+        try:
+            for job_id in job_ids:
+                await self._queue.put(job_id)
+                queued += 1
+        finally:
+            print(f"📥 Re-queued {queued} of {len(job_ids)} generation jobs left by the last run")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"❌ Generation job {job_id} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int):
+        async with AsyncSessionLocal() as db:
+            # Claim the job; another process may have taken it already
+            claimed = await db.execute(
+                update(GenerationJob)
+                .where(
+                    GenerationJob.id == job_id,
+                    GenerationJob.status == GenerationStatus.QUEUED
+                )
+                .values(status=GenerationStatus.RUNNING, started_at=datetime.utcnow())
+            )
+            await db.commit()
+            if not claimed.rowcount:
+                return
+
+            result = await db.execute(
+                select(GenerationJob, User.email)
+                .join(User, User.id == GenerationJob.user_id)
+                .where(GenerationJob.id == job_id)
+            )
+            job, email = result.one()
+
+            newsletter_id = None
+            error = None
+            try:
+                newsletter_id = await asyncio.wait_for(
+                    generate_newsletter_content(
+                        email, db,
+                        topics=job.topics,
+                        template_id=job.template_id,
+                        max_articles=job.max_articles
+                    ),
+                    timeout=self.timeout
+                )
+                if newsletter_id is None:
+                    error = "No recently published articles to generate from"
+            except asyncio.TimeoutError:
+                error = f"Timed out after {self.timeout:.0f}s"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            if error:
+                await db.rollback()
+
+            await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .values(
+                    status=GenerationStatus.FAILED if error else GenerationStatus.COMPLETED,
+                    newsletter_id=newsletter_id,
+                    error=error[:1000] if error else None,
+                    finished_at=datetime.utcnow()
+                )
+            )
+            await db.commit()
+
+        if error:
+            self.failed += 1
+            print(f"❌ Generation job {job_id} failed: {error}")
+        else:
+            self.completed += 1
+
+    async def _recover(self) -> List[int]:
+        """Fail jobs stuck RUNNING past the timeout and return the ids still QUEUED"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(GenerationJob)
+                .where(
+                    GenerationJob.status == GenerationStatus.RUNNING,
+                    GenerationJob.started_at < datetime.utcnow() - timedelta(seconds=self.timeout)
+                )
+                .values(
+                    status=GenerationStatus.FAILED,
+                    error="Interrupted by a restart",
+                    finished_at=datetime.utcnow()
+                )
+            )
+            await db.commit()
+
+            result = await db.execute(
+                select(GenerationJob.id)
+                .where(GenerationJob.status == GenerationStatus.QUEUED)
+                .order_by(GenerationJob.id)
+            )
+            return list(result.scalars())
+
+
+# Shared runner started and stopped by the API lifespan
+generation_jobs = GenerationJobRunner(
+    workers=settings.GENERATION_WORKERS,
+    max_size=settings.GENERATION_QUEUE_SIZE,
+    timeout=settings.GENERATION_JOB_TIMEOUT
+)
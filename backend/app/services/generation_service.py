@@ -0,0 +1,272 @@
+# app/services/generation_service.py
+#
+# Newsletter generation from published articles:
+#
+#   1. candidates  an in-memory pool of recently published articles, loaded
+#                  by one indexed window query and then kept current with
+#                  small "changed since" queries instead of rescans
+#   2. ranking     recency (exponential decay), overlap with the requested
+#                  topics and engagement (views, log-scaled)
+#   3. dedupe      greedy: a story the duplicate index (MinHash LSH over
+#                  bodies) pairs with one already picked is skipped
+#   4. assembly    winners are grouped into topic sections and rendered
+#                  through compiled snippet templates; the newsletter's
+#                  layout wraps the result at send time
+
+import asyncio
+import heapq
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.article import Article
+from app.services.derived_cache import derived_fields
+from app.services.duplicate_index import DuplicateIndex, duplicate_index
+from app.services.template_engine import compile_template
+
+
+TEMPLATE_BRACE_PATTERN = re.compile(r"([{}])(?=[{}])")
+
+# Re-read rows changed this long before the last sync, for clock skew
+# between the app and the database
+SYNC_OVERLAP = timedelta(seconds=5)
+OTHER_SECTION = "More stories"
+
+ARTICLE_SNIPPET = compile_template(
+    '<div class="article">'
+    '<h3>{{#url}}<a href="{{ url }}">{{/url}}{{ title }}{{#url}}</a>{{/url}}</h3>'
+    '{{#image_url}}<img src="{{ image_url }}" alt="{{ title }}" width="560">{{/image_url}}'
+    '<p>{{ summary }}</p>'
+    '</div>\n'
+)
+SECTION_SNIPPET = compile_template('<div class="section"><h2>{{ title }}</h2>\n{{{ articles }}}</div>\n')
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, whichever way the driver returned it"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _inert(text: Optional[str]) -> str:
+    """Break up "{{" / "}}" so article text is never read as template syntax at send time"""
+    return TEMPLATE_BRACE_PATTERN.sub(r"\1 ", text or "")
+
+
+class Candidate:
+    """What ranking and dedupe need to know about an article, without its body"""
+    __slots__ = ("id", "title", "tags", "topics", "published_at", "views")
+
+    def __init__(self, id: int, title: str, tags: Sequence[str], published_at: datetime, views: int):
+        self.id = id
+        self.title = title
+        self.tags = tuple(tags or ())
+        self.topics = frozenset(tag.lower() for tag in self.tags)
+        self.published_at = published_at
+        self.views = views or 0
+
+    @classmethod
+    def from_row(cls, row) -> "Candidate":
+        return cls(row.id, row.title, row.tags, _utc(row.published_at), row.view_count)
+
+
+CANDIDATE_COLUMNS = (
+    Article.id, Article.title, Article.tags, Article.published_at, Article.view_count,
+)
+
+
+class CandidatePool:
+    """
+    Published articles inside the generation window, newest `limit` of
+    them. The first refresh is one range scan of ix_articles_published;
+    later ones only read rows created or updated since the previous sync
+    (created_at / updated_at are indexed), so a generation costs a few
+    small queries however many articles exist.
+    """
+
+    def __init__(self, window: timedelta, limit: int):
+        self.window = window
+        self.limit = limit
+        self.entries: Dict[int, Candidate] = {}
+        self.synced_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db: AsyncSession) -> List[Candidate]:
+        async with self._lock:
+            now = datetime.utcnow()
+            since = now - self.window
+
+            if self.synced_at is None:
+                result = await db.execute(
+                    select(*CANDIDATE_COLUMNS)
+                    .where(Article.is_published == True, Article.published_at >= since)
+                    .order_by(Article.published_at.desc())
+                    .limit(self.limit)
+                )
+                self.entries = {row.id: Candidate.from_row(row) for row in result}
+            else:
+                changed_since = self.synced_at - SYNC_OVERLAP
+                for column in (Article.created_at, Article.updated_at):
+                    result = await db.execute(
+                        select(Article.is_published, *CANDIDATE_COLUMNS).where(column >= changed_since)
+                    )
+                    for row in result:
+                        published_at = _utc(row.published_at)
+                        if row.is_published and published_at is not None and published_at >= since:
+                            self.entries[row.id] = Candidate.from_row(row)
+                        else:
+                            self.entries.pop(row.id, None)
+
+            # Age out of the window, and keep only the newest `limit`
+            stale = [key for key, candidate in self.entries.items() if candidate.published_at < since]
+            for key in stale:
+                del self.entries[key]
+            if len(self.entries) > self.limit:
+                newest = heapq.nlargest(self.limit, self.entries.values(), key=lambda c: c.published_at)
+                self.entries = {candidate.id: candidate for candidate in newest}
+
+            self.synced_at = now
+            return list(self.entries.values())
+
+    def discard(self, article_ids):
+        """Forget articles that turned out to be deleted"""
+        for article_id in article_ids:
+            self.entries.pop(article_id, None)
+
+
+def rank_candidates(
+    candidates: Sequence[Candidate],
+    topics: Sequence[str],
+    count: int,
+    now: Optional[datetime] = None
+) -> List[Tuple[float, Candidate]]:
+    """The `count` best candidates by weighted recency, topic match and engagement"""
+    now = now or datetime.utcnow()
+    weights = settings.GENERATION_WEIGHTS
+    recency_weight = weights.get("recency", 0.0)
+    tags_weight = weights.get("tags", 0.0)
+    engagement_weight = weights.get("engagement", 0.0)
+
+    wanted = frozenset(topic.lower() for topic in topics)
+    decay = math.log(2) / (settings.GENERATION_RECENCY_HALF_LIFE_HOURS * 3600)
+    view_scale = math.log1p(max((c.views for c in candidates), default=0)) or 1.0
+
+    def score(candidate: Candidate) -> float:
+        age = max((now - candidate.published_at).total_seconds(), 0.0)
+        total = recency_weight * math.exp(-decay * age)
+        if wanted:
+            total += tags_weight * len(candidate.topics & wanted) / len(wanted)
+        if candidate.views:
+            total += engagement_weight * math.log1p(candidate.views) / view_scale
+        return total
+
+    return heapq.nlargest(count, ((score(c), c) for c in candidates), key=lambda pair: pair[0])
+
+
+def drop_near_duplicates(
+    ranked: Sequence[Tuple[float, Candidate]],
+    count: int,
+    index: DuplicateIndex
+) -> List[Tuple[float, Candidate]]:
+    """Walk the ranking best-first, skipping stories the index pairs with one already picked"""
+    picked: List[Tuple[float, Candidate]] = []
+    picked_ids = set()
+    for score, candidate in ranked:
+        if any(other in picked_ids for other, _ in index.duplicates(candidate.id)):
+            continue
+        picked.append((score, candidate))
+        picked_ids.add(candidate.id)
+        if len(picked) == count:
+            break
+    return picked
+
+
+def section_title(article: Article, topics: Sequence[str]) -> str:
+    """The first requested topic the article is tagged with, else its own first tag"""
+    tags = {tag.lower(): tag for tag in article.tags or ()}
+    for topic in topics:
+        if topic.lower() in tags:
+            return topic
+    return article.tags[0] if article.tags else OTHER_SECTION
+
+
+def assemble_sections(articles: Sequence[Article], topics: Sequence[str], excerpts: Dict[int, str]) -> str:
+    """
+    Render articles (best first) into topic sections; single-story sections
+    fold into one. Articles without a summary show their excerpt.
+    """
+    sections: Dict[str, List[Article]] = {}
+    for article in articles:
+        sections.setdefault(section_title(article, topics), []).append(article)
+
+    wanted = {topic.lower() for topic in topics}
+    other: List[Article] = sections.pop(OTHER_SECTION, [])
+    for title in list(sections):
+        if len(sections[title]) == 1 and title.lower() not in wanted and len(sections) > 1:
+            other.extend(sections.pop(title))
+    if other:
+        sections[OTHER_SECTION] = other
+
+    html = []
+    for title, members in sections.items():
+        rendered = "".join(
+            ARTICLE_SNIPPET.render({
+                "title": _inert(article.title),
+                "summary": _inert(article.summary or excerpts.get(article.id)),
+                "url": _inert(article.source_url),
+                "image_url": _inert(article.image_url),
+            })
+            for article in members
+        )
+        html.append(SECTION_SNIPPET.render({"title": _inert(title), "articles": rendered}))
+    return "".join(html)
+
+
+def standalone_page(content: str) -> str:
+    """Wrap sections for a newsletter without a layout; its title is filled in at send time"""
+    return (
+        '<html><body style="font-family: Arial, sans-serif;">'
+        '<h1>{{ newsletter.title }}</h1>\n' + content + '</body></html>'
+    )
+
+
+async def select_articles(
+    db: AsyncSession,
+    topics: Sequence[str],
+    count: int
+) -> Tuple[List[Article], int]:
+    """The winning articles, best first, and how many candidates were considered"""
+    candidates = await candidate_pool.refresh(db)
+    await duplicate_index.ensure_loaded(db)
+    ranked = rank_candidates(candidates, topics, count * 4)
+    picked = drop_near_duplicates(ranked, count, duplicate_index)
+    if not picked:
+        return [], len(candidates)
+
+    ids = [candidate.id for _, candidate in picked]
+    result = await db.execute(
+        select(Article).where(Article.id.in_(ids), Article.is_published == True)
+    )
+    by_id = {article.id: article for article in result.scalars().all()}
+    candidate_pool.discard(article_id for article_id in ids if article_id not in by_id)
+    return [by_id[article_id] for article_id in ids if article_id in by_id], len(candidates)
+
+
+async def article_excerpts(db: AsyncSession, articles: Sequence[Article]) -> Dict[int, str]:
+    """Excerpts for the articles that have no summary, through the derived-field cache"""
+    unsummarized = [article for article in articles if not article.summary]
+    if not unsummarized:
+        return {}
+    values = await derived_fields.get_many(db, [article.body for article in unsummarized], "excerpt")
+    return {article.id: value for article, value in zip(unsummarized, values)}
+
+
+# Shared candidate set; one per process
+candidate_pool = CandidatePool(
+    timedelta(days=settings.GENERATION_WINDOW_DAYS),
+    settings.GENERATION_CANDIDATE_LIMIT
+)
@@ -0,0 +1,368 @@
+# app/services/html_optimizer.py
+#
+# Pre-send optimization for newsletter HTML: inline <style> rules into
+# style="" attributes (most email clients ignore or strip <style>), then
+# drop comments and collapse whitespace. Runs once per newsletter version;
+# every byte saved here is saved once per recipient.
+#
+# Only simple selectors are inlined: type, .class, #id, compounds of those
+# (p.note, td#cell) and descendant/child chains of them (table td, ul > li).
+# Rules using anything else (pseudo-classes, attribute selectors) and
+# at-rules such as @media stay in a <style> block for clients that honour it.
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+COMPOUND_PATTERN = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:[.#][\w-]+)*)$")
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+})
+# Whitespace is significant inside these
+PRESERVE_TAGS = frozenset({"pre", "textarea", "script", "style"})
+# Whitespace next to these never renders, so it can be dropped
+BLOCK_TAGS = frozenset({
+    "html", "head", "body", "title", "meta", "link", "style", "div", "p",
+    "table", "thead", "tbody", "tfoot", "tr", "td", "th", "ul", "ol", "li",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "br", "center", "blockquote",
+    "section", "header", "footer", "article", "nav",
+})
+
+
+class Compound(NamedTuple):
+    tag: Optional[str]
+    ids: Tuple[str, ...]
+    classes: Tuple[str, ...]
+
+
+class Rule(NamedTuple):
+    """One selector (as a chain of compounds) with its declarations"""
+    chain: Tuple[Tuple[str, Compound], ...]  # (combinator, compound), rightmost last
+    specificity: Tuple[int, int, int]
+    order: int
+    declarations: Tuple[Tuple[str, str], ...]
+
+
+class OptimizedHTML(NamedTuple):
+    html: str
+    original_bytes: int
+    optimized_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+
+def _parse_compound(text: str) -> Optional[Compound]:
+    match = COMPOUND_PATTERN.match(text)
+    if not match or not text:
+        return None
+    tag = match.group("tag")
+    parts = re.findall(r"[.#][\w-]+", match.group("rest"))
+    return Compound(
+        tag.lower() if tag and tag != "*" else None,
+        tuple(part[1:] for part in parts if part[0] == "#"),
+        tuple(part[1:] for part in parts if part[0] == "."),
+    )
+
+
+def _parse_selector(selector: str) -> Optional[Tuple[Tuple[str, Compound], ...]]:
+    """Split a selector into (combinator, compound) pairs, or None if it cannot be inlined"""
+    tokens = selector.replace(">", " > ").split()
+    chain: List[Tuple[str, Compound]] = []
+    combinator = " "
+    for token in tokens:
+        if token == ">":
+            if not chain or combinator == ">":
+                return None
+            combinator = ">"
+            continue
+        compound = _parse_compound(token)
+        if compound is None:
+            return None
+        chain.append((combinator, compound))
+        combinator = " "
+    return tuple(chain) if chain and combinator == " " else None
+
+
+def _parse_declarations(block: str) -> Tuple[Tuple[str, str], ...]:
+    declarations = []
+    for item in block.split(";"):
+        name, sep, value = item.partition(":")
+        if sep and name.strip() and value.strip():
+            declarations.append((name.strip().lower(), " ".join(value.split())))
+    return tuple(declarations)
+
+
+def _split_blocks(css: str) -> List[Tuple[str, str]]:
+    """Top-level (prelude, body) pairs, keeping nested braces of at-rules intact"""
+    blocks = []
+    depth = 0
+    start = 0
+    prelude = ""
+    for index, char in enumerate(css):
+        if char == "{":
+            if depth == 0:
+                prelude = css[start:index].strip()
+                start = index + 1
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:index]))
+                start = index + 1
+    return blocks
+
+
+def parse_stylesheet(css: str, first_order: int = 0) -> Tuple[List[Rule], str]:
+    """Split CSS into inlineable rules and the leftover CSS that has to stay in <style>"""
+    rules: List[Rule] = []
+    leftover: List[str] = []
+    order = first_order
+
+    for prelude, body in _split_blocks(CSS_COMMENT_PATTERN.sub("", css)):
+        if prelude.startswith("@"):
+            leftover.append(f"{prelude}{{{WHITESPACE_PATTERN.sub(' ', body).strip()}}}")
+            continue
+
+        declarations = _parse_declarations(body)
+        kept = []
+        for selector in prelude.split(","):
+            selector = selector.strip()
+            chain = _parse_selector(selector)
+            if chain is None:
+                kept.append(selector)
+                continue
+            compounds = [compound for _, compound in chain]
+            specificity = (
+                sum(len(c.ids) for c in compounds),
+                sum(len(c.classes) for c in compounds),
+                sum(1 for c in compounds if c.tag),
+            )
+            rules.append(Rule(chain, specificity, order, declarations))
+            order += 1
+        if kept and declarations:
+            body_css = ";".join(f"{name}:{value}" for name, value in declarations)
+            leftover.append(f"{','.join(kept)}{{{body_css}}}")
+
+    return rules, "".join(leftover)
+
+
+class _Element(NamedTuple):
+    tag: str
+    ids: frozenset
+    classes: frozenset
+
+
+def _matches(compound: Compound, element: _Element) -> bool:
+    if compound.tag and compound.tag != element.tag:
+        return False
+    return all(i in element.ids for i in compound.ids) and all(c in element.classes for c in compound.classes)
+
+
+def _rule_matches(rule: Rule, stack: List[_Element]) -> bool:
+    """Match a selector chain right to left against the open-element stack"""
+    chain = rule.chain
+    if not _matches(chain[-1][1], stack[-1]):
+        return False
+    position = len(stack) - 1
+    for index in range(len(chain) - 2, -1, -1):
+        combinator = chain[index + 1][0]
+        compound = chain[index][1]
+        if combinator == ">":
+            position -= 1
+            if position < 0 or not _matches(compound, stack[position]):
+                return False
+        else:
+            position -= 1
+            while position >= 0 and not _matches(compound, stack[position]):
+                position -= 1
+            if position < 0:
+                return False
+    return True
+
+
+class _Rewriter(HTMLParser):
+    """Streams HTML back out with styles inlined, comments dropped and whitespace collapsed"""
+
+    def __init__(self, rules: List[Rule], leftover_css: str, minify: bool):
+        super().__init__(convert_charrefs=False)
+        self.rules = rules
+        self.leftover_css = leftover_css
+        self.minify = minify
+        self.out: List[str] = []
+        self.stack: List[_Element] = []
+        self.preserve = 0
+        self.in_style = False
+        self.style_emitted = False
+        self.pending_space = False
+        self.last_tag: Optional[str] = None
+
+    def _flush_space(self, tag: Optional[str]):
+        if self.pending_space:
+            if not (tag in BLOCK_TAGS or self.last_tag in BLOCK_TAGS):
+                self.out.append(" ")
+            self.pending_space = False
+        self.last_tag = tag
+
+    def _inline_style(self, element: _Element, attrs: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, Optional[str]]]:
+        matched = [rule for rule in self.rules if _rule_matches(rule, self.stack)]
+        if not matched:
+            return attrs
+        matched.sort(key=lambda rule: (rule.specificity, rule.order))
+
+        declarations: Dict[str, str] = {}
+        for rule in matched:
+            for name, value in rule.declarations:
+                declarations.pop(name, None)
+                declarations[name] = value
+        existing = next((value for name, value in attrs if name == "style"), None)
+        for name, value in _parse_declarations(existing or ""):
+            declarations.pop(name, None)
+            declarations[name] = value
+
+        style = ";".join(f"{name}:{value}" for name, value in declarations.items())
+        return [(name, value) for name, value in attrs if name != "style"] + [("style", style)]
+
+    def _start(self, tag: str, attrs, closed: bool):
+        self._flush_space(tag)
+        if tag == "style":
+            # Replaced by the leftover rules (if any) at the first <style>
+            self.in_style = True
+            if self.leftover_css and not self.style_emitted:
+                self.out.append(f"<style>{self.leftover_css}</style>")
+                self.style_emitted = True
+            return
+
+        attr_map = dict(attrs)
+        element = _Element(
+            tag,
+            frozenset((attr_map.get("id") or "").split()),
+            frozenset((attr_map.get("class") or "").split()),
+        )
+        self.stack.append(element)
+        if self.rules:
+            attrs = self._inline_style(element, attrs)
+        if closed or tag in VOID_TAGS:
+            self.stack.pop()
+
+        parts = [f"<{tag}"]
+        for name, value in attrs:
+            parts.append(f" {name}" if value is None else f' {name}="{escape(value, quote=True)}"')
+        parts.append(" />" if closed else ">")
+        self.out.append("".join(parts))
+
+        if tag in PRESERVE_TAGS and not closed:
+            self.preserve += 1
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, closed=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, closed=True)
+
+    def handle_endtag(self, tag):
+        if tag == "style":
+            self.in_style = False
+            return
+        self._flush_space(tag)
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                break
+        if tag in PRESERVE_TAGS and self.preserve:
+            self.preserve -= 1
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self.in_style:
+            return
+        if not self.minify or self.preserve:
+            self._flush_space(None)
+            self.out.append(data)
+            return
+        collapsed = WHITESPACE_PATTERN.sub(" ", data)
+        if not collapsed.strip():
+            self.pending_space = True
+            return
+        if collapsed[0] == " ":
+            self.pending_space = True
+            collapsed = collapsed[1:]
+        self._flush_space(None)
+        if collapsed[-1] == " ":
+            self.pending_space = True
+            collapsed = collapsed[:-1]
+        self.out.append(collapsed)
+
+    def handle_entityref(self, name):
+        self._flush_space(None)
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self._flush_space(None)
+        self.out.append(f"&#{name};")
+
+    def handle_comment(self, data):
+        # Outlook conditional comments carry markup; everything else goes
+        if not self.minify or data.startswith("[if") or data.startswith("<![endif"):
+            self._flush_space(None)
+            self.out.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+    def unknown_decl(self, data):
+        self.out.append(f"<![{data}]>")
+
+    def handle_pi(self, data):
+        self.out.append(f"<?{data}>")
+
+    def result(self) -> str:
+        if self.pending_space and self.last_tag not in BLOCK_TAGS:
+            self.out.append(" ")
+        return "".join(self.out).strip()
+
+
+class _StyleCollector(HTMLParser):
+    """First pass: gather the CSS of every <style> element"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.css: List[str] = []
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        self._in_style = tag == "style"
+
+    def handle_endtag(self, tag):
+        self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self.css.append(data)
+
+
+def optimize_html(html: str, inline_css: bool = True, minify: bool = True) -> OptimizedHTML:
+    """Inline <style> rules and minify; returns the new HTML and the size before and after"""
+    collector = _StyleCollector()
+    collector.feed(html)
+    collector.close()
+    css = "\n".join(collector.css)
+
+    if inline_css:
+        rules, leftover = parse_stylesheet(css)
+    else:
+        rules, leftover = [], WHITESPACE_PATTERN.sub(" ", CSS_COMMENT_PATTERN.sub("", css)).strip()
+
+    rewriter = _Rewriter(rules, leftover, minify)
+    rewriter.feed(html)
+    rewriter.close()
+    optimized = rewriter.result()
+
+    return OptimizedHTML(optimized, len(html.encode("utf-8")), len(optimized.encode("utf-8")))
@@ -0,0 +1,120 @@
+# app/services/html_sanitizer.py
+#
+# Cleans HTML from outside sources (feed items) before it is stored as an
+# article body. One pass over html.parser events, writing the markup back
+# out minus anything that can run code:
+#
+#   - script, style and embedding elements are dropped with their content
+#   - on* event-handler attributes are dropped
+#   - URL attributes with a javascript:, vbscript: or non-image data: URL
+#     are dropped, as are style attributes carrying expression() or script URLs
+#   - comments, doctypes and processing instructions are dropped
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+
+# Dropped together with everything inside them
+DROP_CONTENT_TAGS = frozenset({
+    "script", "style", "iframe", "frame", "frameset", "object", "applet",
+    "noscript", "template", "svg", "math",
+})
+# Dropped, content kept (or void)
+DROP_TAGS = frozenset({"embed", "base", "meta", "link", "form", "html", "head", "body"})
+URL_ATTRIBUTES = frozenset({
+    "href", "src", "action", "formaction", "background", "poster", "cite",
+    "longdesc", "lowsrc", "dynsrc", "xlink:href", "data",
+})
+BLOCKED_SCHEMES = ("javascript:", "vbscript:", "data:")
+# Browsers ignore control characters and whitespace inside a scheme ("java\tscript:")
+IGNORED_URL_CHARS = re.compile(r"[\x00-\x20\x7f]+")
+UNSAFE_STYLE = re.compile(r"expression\s*\(|javascript:|vbscript:|behavior\s*:|-moz-binding", re.IGNORECASE)
+
+
+def _is_unsafe_url(value: str) -> bool:
+    url = IGNORED_URL_CHARS.sub("", value).lower()
+    if url.startswith("data:image/") and not url.startswith("data:image/svg"):
+        return False
+    return url.startswith(BLOCKED_SCHEMES)
+
+
+def _safe_attributes(attrs: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, Optional[str]]]:
+    kept = []
+    for name, value in attrs:
+        if name.startswith("on"):
+            continue
+        if value is not None:
+            if name in URL_ATTRIBUTES or name == "srcset":
+                if any(_is_unsafe_url(part) for part in value.split(",")):
+                    continue
+            elif name == "style" and UNSAFE_STYLE.search(IGNORED_URL_CHARS.sub("", value)):
+                continue
+        kept.append((name, value))
+    return kept
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out: List[str] = []
+        self.skip: List[str] = []  # open DROP_CONTENT_TAGS, innermost last
+
+    def _start(self, tag: str, attrs, closed: bool):
+        if self.skip:
+            if tag in DROP_CONTENT_TAGS and not closed:
+                self.skip.append(tag)
+            return
+        if tag in DROP_CONTENT_TAGS:
+            if not closed:
+                self.skip.append(tag)
+            return
+        if tag in DROP_TAGS:
+            return
+        parts = [f"<{tag}"]
+        for name, value in _safe_attributes(attrs):
+            parts.append(f" {name}" if value is None else f' {name}="{escape(value, quote=True)}"')
+        parts.append(" />" if closed else ">")
+        self.out.append("".join(parts))
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, closed=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, closed=True)
+
+    def handle_endtag(self, tag):
+        if self.skip:
+            if tag in self.skip:
+                del self.skip[len(self.skip) - 1 - self.skip[::-1].index(tag):]
+            return
+        if tag in DROP_CONTENT_TAGS or tag in DROP_TAGS:
+            return
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self.skip:
+            # Text outside tags is written back escaped, so a stray "<" stays text
+            self.out.append(escape(data, quote=False))
+
+    def handle_entityref(self, name):
+        if not self.skip:
+            self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        if not self.skip:
+            self.out.append(f"&#{name};")
+
+    def result(self) -> str:
+        return "".join(self.out)
+
+
+def sanitize_html(html: Optional[str]) -> str:
+    """`html` without scripts, styles, event handlers or script URLs"""
+    if not html:
+        return ""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return sanitizer.result()
@@ -0,0 +1,231 @@
+# app/services/html_to_text.py
+#
+# Streaming HTML to plain-text conversion for the text/plain part of
+# newsletters. One linear pass over html.parser events: block elements become
+# line breaks, lists become "* " / "1. " items, links become numbered
+# footnotes, and head/style/script content is dropped.
+
+import asyncio
+import hashlib
+import re
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import List, Optional
+
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+# Blank lines to leave around each block element
+BLOCK_SPACING = {
+    "p": 2, "h1": 2, "h2": 2, "h3": 2, "h4": 2, "h5": 2, "h6": 2,
+    "ul": 2, "ol": 2, "table": 2, "blockquote": 2, "pre": 2, "hr": 2,
+    "div": 1, "tr": 1, "li": 1, "section": 1, "header": 1, "footer": 1,
+    "article": 1, "center": 1, "dl": 1, "dt": 1, "dd": 1,
+}
+SKIP_TAGS = frozenset({"head", "style", "script", "title", "noscript"})
+UNDERLINES = {"h1": "=", "h2": "-"}
+
+
+class _TextWriter(HTMLParser):
+    def __init__(self, footnotes: bool):
+        super().__init__(convert_charrefs=True)
+        self.footnotes = footnotes
+        self.out: List[str] = []
+        self.links: List[str] = []
+        self.pending_breaks = 0
+        self.break_depth = 0  # quote depth the pending blank lines belong to
+        self.line_start = True
+        self.started = False
+        self.pending_space = False
+        self.skip = 0
+        self.pre = 0
+        self.quote_depth = 0
+        self.lists: List[List] = []  # [ordered, next number]
+        self.bullet: Optional[str] = None
+        self.link: Optional[List] = None  # [href, index into out where its text starts]
+        self.heading: Optional[List] = None  # [tag, index into out]
+        self.cell_in_row = 0
+
+    def _prefix(self) -> str:
+        indent = "  " * max(len(self.lists) - 1, 0)
+        return "> " * self.quote_depth + indent
+
+    def _break(self, count: int):
+        if self.started:
+            # A separator belongs to the outermost quote it touches, so the
+            # blank line before a <blockquote> gets no "> " marker
+            depth = min(self.break_depth, self.quote_depth) if self.pending_breaks else self.quote_depth
+            self.break_depth = depth
+            self.pending_breaks = max(self.pending_breaks, count)
+        self.pending_space = False
+
+    def _write(self, text: str):
+        if self.pending_breaks:
+            # Blank lines inside a quote keep their "> " marker
+            depth = min(self.break_depth, self.quote_depth)
+            self.out.append(("\n" + "> " * depth) * (self.pending_breaks - 1) + "\n")
+            self.pending_breaks = 0
+            self.line_start = True
+        if self.line_start:
+            self.out.append(self._prefix())
+            if self.bullet:
+                self.out.append(self.bullet)
+                self.bullet = None
+            self.line_start = False
+        elif self.pending_space:
+            self.out.append(" ")
+        self.pending_space = False
+        self.out.append(text)
+        self.started = True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip += 1
+            return
+        if self.skip:
+            return
+
+        if tag in BLOCK_SPACING:
+            # Nested lists sit directly under their parent item
+            nested = tag in ("ul", "ol", "li") and self.lists
+            self._break(1 if nested else BLOCK_SPACING[tag])
+
+        if tag == "br":
+            if self.started:
+                self.out.append("\n")
+                self.line_start = True
+                self.pending_space = False
+        elif tag == "hr":
+            self._write("-" * 40)
+            self._break(2)
+        elif tag in ("ul", "ol"):
+            self.lists.append([tag == "ol", 1])
+        elif tag == "li":
+            if self.lists:
+                ordered, number = self.lists[-1]
+                self.bullet = f"{number}. " if ordered else "* "
+                self.lists[-1][1] += 1
+            else:
+                self.bullet = "* "
+        elif tag == "blockquote":
+            self.quote_depth += 1
+        elif tag == "pre":
+            self.pre += 1
+        elif tag == "a":
+            href = dict(attrs).get("href") or ""
+            self.link = [href.strip(), len(self.out)]
+        elif tag == "img":
+            alt = (dict(attrs).get("alt") or "").strip()
+            if alt:
+                self._write(alt)
+        elif tag in UNDERLINES:
+            self.heading = [tag, len(self.out)]
+        elif tag in ("td", "th"):
+            if self.cell_in_row:
+                self.pending_space = True
+            self.cell_in_row += 1
+        if tag == "tr":
+            self.cell_in_row = 0
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip = max(self.skip - 1, 0)
+            return
+        if self.skip:
+            return
+
+        if tag == "a" and self.link is not None:
+            href, start = self.link
+            self.link = None
+            text = "".join(self.out[start:]).strip()
+            if self.footnotes and href and not href.startswith("#") and href != text:
+                if href.startswith("mailto:") and href[7:] == text:
+                    pass
+                elif not text:
+                    self._write(href)
+                else:
+                    self.links.append(href)
+                    self.out.append(f" [{len(self.links)}]")
+        elif tag in UNDERLINES and self.heading is not None:
+            heading_tag, start = self.heading
+            self.heading = None
+            text = "".join(self.out[start:]).strip()
+            if text:
+                self.out.append("\n" + self._prefix() + UNDERLINES[heading_tag] * len(text.splitlines()[-1]))
+        elif tag in ("ul", "ol") and self.lists:
+            self.lists.pop()
+        elif tag == "blockquote" and self.quote_depth:
+            self.quote_depth -= 1
+        elif tag == "pre" and self.pre:
+            self.pre -= 1
+
+        if tag in BLOCK_SPACING:
+            nested = tag in ("ul", "ol", "li") and self.lists
+            self._break(1 if nested else BLOCK_SPACING[tag])
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+        if self.pre:
+            lines = data.split("\n")
+            for index, line in enumerate(lines):
+                if index:
+                    self.out.append("\n")
+                    self.line_start = True
+                if line:
+                    self._write(line)
+            return
+
+        collapsed = WHITESPACE_PATTERN.sub(" ", data)
+        if not collapsed.strip():
+            if collapsed and not self.line_start:
+                self.pending_space = True
+            return
+        if collapsed[0] == " " and not self.line_start:
+            self.pending_space = True
+        self._write(collapsed.strip())
+        if collapsed[-1] == " ":
+            self.pending_space = True
+
+    def result(self) -> str:
+        text = "".join(self.out)
+        text = "\n".join(line.rstrip() for line in text.split("\n"))
+        text = BLANK_LINES_PATTERN.sub("\n\n", text).strip()
+        if self.links:
+            notes = "\n".join(f"[{index}] {href}" for index, href in enumerate(self.links, 1))
+            text = f"{text}\n\n{notes}"
+        return text
+
+
+def html_to_text(html: str, footnotes: bool = True) -> str:
+    """Convert HTML to readable plain text in a single pass"""
+    writer = _TextWriter(footnotes)
+    writer.feed(html or "")
+    writer.close()
+    return writer.result()
+
+
+class TextConversionCache:
+    """LRU of converted text keyed by a hash of the HTML"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    async def convert(self, html: str) -> str:
+        """The text for `html`; conversions run in a worker thread, off the event loop"""
+        key = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        text = self._entries.get(key)
+        if text is None:
+            text = await asyncio.to_thread(html_to_text, html)
+            self._entries[key] = text
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return text
+
+
+# Shared cache used when newsletters are saved
+text_conversions = TextConversionCache()
@@ -0,0 +1,409 @@
+# app/services/keyword_tagger.py
+#
+# Automatic tags for articles, extracted locally:
+#
+#   1. candidates   RAKE-style: title and body are cut into phrases at
+#                   punctuation and stopwords; runs of up to three words are
+#                   candidates, longer runs fall back to their single words
+#   2. scoring      occurrences x mean IDF of the phrase's words, favouring
+#                   multi-word phrases and phrases in the title; the best
+#                   non-overlapping phrases become the keywords
+#   3. IDF          document frequencies over every tagged article, kept up
+#                   to date as articles are tagged
+#
+# The document-frequency table lives in keyword_terms and, in memory, as two
+# NumPy arrays (sorted 64-bit term hashes and their counts, 12 bytes a
+# term) plus a small dict of recent increments merged in periodically, so
+# tagging 100k articles needs a few MB rather than a dict of strings.
+# Increments reach the arrays only once the transaction storing them
+# commits, and the arrays are reloaded every RELOAD_INTERVAL seconds to
+# take in what other processes counted.
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.article import Article
+from app.models.keyword import ArticleKeywords, KeywordTerm
+from app.services.html_to_text import html_to_text
+from app.services.summarizer import STOPWORDS
+
+
+PHRASE_BREAK = re.compile(r"[.,;:!?()\[\]{}\"“”‘’/|\n]+|\s[-–—]+\s")
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9'+-]*[A-Za-z0-9+]|[A-Za-z]")
+MAX_PHRASE_WORDS = 3
+TITLE_BOOST = 2.0
+PHRASE_BOOST = 0.5  # extra weight per additional word in a phrase
+PENDING_LIMIT = 50000  # recent increments held in a dict before merging into the arrays
+DOCUMENTS_KEY = 0  # keyword_terms row counting the articles themselves
+RELOAD_INTERVAL = 600.0  # seconds before the arrays are reloaded from keyword_terms
+STAGED_KEY = "keyword_increments"  # Session.info entry holding uncommitted increments
+
+
+@lru_cache(maxsize=200000)
+def term_hash(term: str) -> int:
+    """Stable 63-bit hash of a lowercased term (fits a signed BIGINT, never 0)"""
+    value = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little") >> 1
+    return value or 1
+
+
+def _is_keyword_word(word: str) -> bool:
+    lowered = word.lower()
+    return lowered not in STOPWORDS and "'" not in word and (len(word) > 2 or word.isupper() and len(word) > 1)
+
+
+class Candidate(NamedTuple):
+    words: Tuple[str, ...]  # lowercased
+    count: int
+    in_title: bool
+    surface: str  # most frequent spelling
+
+
+class Analysis(NamedTuple):
+    """What keyword extraction needs from one article"""
+    terms: np.ndarray  # distinct term hashes, uint64
+    word_hashes: Dict[str, int]
+    candidates: List[Candidate]
+
+
+def analyze(title: str, body: str) -> Analysis:
+    counts: Counter = Counter()
+    spellings: Dict[Tuple[str, ...], Counter] = {}
+    in_title = set()
+    words_seen = set()
+
+    for text, is_title in ((title or "", True), (html_to_text(body or "", footnotes=False), False)):
+        for fragment in PHRASE_BREAK.split(text):
+            run: List[str] = []
+            for word in WORD_PATTERN.findall(fragment) + [""]:
+                if word.endswith(("'s", "'S")):
+                    word = word[:-2]
+                if word and _is_keyword_word(word):
+                    run.append(word)
+                    words_seen.add(word.lower())
+                    continue
+                # A stopword (or the end) closes the phrase
+                phrases = [run] if len(run) <= MAX_PHRASE_WORDS else [[single] for single in run]
+                for phrase in phrases:
+                    if not phrase:
+                        continue
+                    key = tuple(part.lower() for part in phrase)
+                    counts[key] += 1
+                    spellings.setdefault(key, Counter())[" ".join(phrase)] += 1
+                    if is_title:
+                        in_title.add(key)
+                run = []
+
+    candidates = []
+    for key, count in counts.items():
+        surface = spellings[key].most_common(1)[0][0]
+        if surface.islower():
+            surface = " ".join(part[:1].upper() + part[1:] for part in surface.split())
+        candidates.append(Candidate(key, count, key in in_title, surface))
+
+    word_hashes = {word: term_hash(word) for word in words_seen}
+    terms = np.fromiter(word_hashes.values(), dtype=np.uint64, count=len(word_hashes))
+    return Analysis(np.unique(terms), word_hashes, candidates)
+
+
+def pick_keywords(analysis: Analysis, idf: Dict[int, float], count: int) -> List[str]:
+    """The best `count` non-overlapping phrases, as tags"""
+    def score(candidate: Candidate) -> float:
+        weight = sum(idf[analysis.word_hashes[word]] for word in candidate.words) / len(candidate.words)
+        weight *= candidate.count * (1.0 + PHRASE_BOOST * (len(candidate.words) - 1))
+        return weight * TITLE_BOOST if candidate.in_title else weight
+
+    keywords: List[str] = []
+    used_words = set()
+    seen_tags = set()
+    for candidate in sorted(analysis.candidates, key=score, reverse=True):
+        if used_words.intersection(candidate.words) or candidate.surface.lower() in seen_tags:
+            continue
+        keywords.append(candidate.surface)
+        used_words.update(candidate.words)
+        seen_tags.add(candidate.surface.lower())
+        if len(keywords) == count:
+            break
+    return keywords
+
+
+def _upsert_terms(db: AsyncSession):
+    """INSERT adding to the count of terms already stored, where the dialect supports it"""
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    statement = dialect_insert(KeywordTerm)
+    return statement.on_conflict_do_update(
+        index_elements=[KeywordTerm.term_hash],
+        set_={"documents": KeywordTerm.documents + statement.excluded.documents}
+    )
+
+
+def count_terms(documents: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct term hashes over documents' term arrays, and how many documents have each"""
+    if not documents:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(documents), return_counts=True)
+
+
+class DocumentFrequencies:
+    """Articles per term: sorted uint64 hashes and int32 counts, plus recent increments"""
+
+    def __init__(self):
+        self.documents = 0
+        self.loaded = False
+        self.loaded_at = 0.0
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._counts = np.empty(0, dtype=np.int32)
+        self._pending: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        if self._pending:
+            self._merge_pending()
+        return len(self._hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._hashes.nbytes + self._counts.nbytes
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """Document frequency of each hash (0 when unseen), as of the last commit"""
+        positions = np.minimum(np.searchsorted(self._hashes, hashes), max(len(self._hashes) - 1, 0))
+        if len(self._hashes):
+            counts = np.where(self._hashes[positions] == hashes, self._counts[positions], 0).astype(np.int64)
+        else:
+            counts = np.zeros(len(hashes), dtype=np.int64)
+        if self._pending:
+            counts += np.fromiter(
+                (self._pending.get(value, 0) for value in hashes.tolist()), dtype=np.int64, count=len(hashes)
+            )
+        return counts
+
+    def idf(
+        self,
+        hashes: np.ndarray,
+        uncommitted: Optional[Tuple[np.ndarray, np.ndarray, int]] = None
+    ) -> Dict[int, float]:
+        """IDF of each hash, counting `uncommitted` (hashes, increments, documents) as well"""
+        frequencies = self.lookup(hashes)
+        documents = self.documents
+        if uncommitted is not None:
+            extra_hashes, extra_counts, extra_documents = uncommitted
+            if len(extra_hashes):
+                positions = np.minimum(np.searchsorted(extra_hashes, hashes), len(extra_hashes) - 1)
+                frequencies = frequencies + np.where(extra_hashes[positions] == hashes, extra_counts[positions], 0)
+            documents += extra_documents
+        values = np.log((1 + documents) / (1 + frequencies)) + 1.0
+        return dict(zip(hashes.tolist(), values.tolist()))
+
+    def apply(self, hashes: np.ndarray, increments: np.ndarray, documents: int):
+        """Add committed increments to the in-memory counts"""
+        if not self.loaded:
+            return
+        self.documents += documents
+        if len(hashes) > PENDING_LIMIT // 10:
+            self._merge(hashes, increments)
+        else:
+            for value, increment in zip(hashes.tolist(), increments.tolist()):
+                self._pending[value] = self._pending.get(value, 0) + increment
+            if len(self._pending) > PENDING_LIMIT:
+                self._merge_pending()
+
+    def _merge_pending(self):
+        pending, self._pending = self._pending, {}
+        hashes = np.fromiter(pending.keys(), dtype=np.uint64, count=len(pending))
+        increments = np.fromiter(pending.values(), dtype=np.int64, count=len(pending))
+        self._merge(hashes, increments)
+
+    def _merge(self, hashes: np.ndarray, increments: np.ndarray):
+        merged, inverse = np.unique(np.concatenate((self._hashes, hashes)), return_inverse=True)
+        weights = np.concatenate((self._counts, increments)).astype(np.float64)
+        self._counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(merged)).astype(np.int32)
+        self._hashes = merged
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """Load the counts on first use, and reload them once RELOAD_INTERVAL has passed"""
+        if self.loaded and time.monotonic() - self.loaded_at < RELOAD_INTERVAL:
+            return
+        async with self._lock:
+            if self.loaded and time.monotonic() - self.loaded_at < RELOAD_INTERVAL:
+                return
+            first = not self.loaded
+            result = await db.execute(select(KeywordTerm.term_hash, KeywordTerm.documents))
+            rows = result.all()
+            hashes = np.array([row[0] for row in rows], dtype=np.uint64)
+            counts = np.array([row[1] for row in rows], dtype=np.int32)
+
+            is_total = hashes == DOCUMENTS_KEY
+            order = np.argsort(hashes[~is_total])
+            # Replaces increments applied since the last load; the table has them too
+            self.documents = int(counts[is_total].sum())
+            self._hashes = hashes[~is_total][order]
+            self._counts = counts[~is_total][order]
+            self._pending = {}
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+            if first:
+                print(f"🏷️ Keyword document frequencies loaded: {len(self._hashes)} terms, {self.nbytes // 1024} KB")
+
+    async def store(self, db: AsyncSession, hashes: np.ndarray, increments: np.ndarray, documents: int):
+        """
+        Add increments to keyword_terms; the caller commits. They are applied
+        in memory when `db` commits and dropped if it rolls back.
+        """
+        rows = [{"term_hash": DOCUMENTS_KEY, "documents": documents}] + [
+            {"term_hash": value, "documents": increment}
+            for value, increment in zip(hashes.tolist(), increments.tolist())
+        ]
+        db.sync_session.info.setdefault(STAGED_KEY, []).append((self, hashes, increments, documents))
+        statement = _upsert_terms(db)
+        if statement is not None:
+            await db.execute(statement, rows)
+            return
+        for row in rows:
+            result = await db.execute(
+                update(KeywordTerm)
+                .where(KeywordTerm.term_hash == row["term_hash"])
+                .values(documents=KeywordTerm.documents + row["documents"])
+            )
+            if not result.rowcount:
+                db.add(KeywordTerm(**row))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_increments(session: Session):
+    for frequencies, hashes, increments, documents in session.info.pop(STAGED_KEY, ()):
+        frequencies.apply(hashes, increments, documents)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_uncommitted_increments(session: Session, transaction):
+    # Still staged when the outermost transaction ends: it was rolled back
+    if transaction.parent is None:
+        session.info.pop(STAGED_KEY, None)
+
+
+class KeywordTagger:
+    """Extracts keyword tags and keeps the document frequencies they are scored with"""
+
+    def __init__(self, count: int = 5):
+        self.count = count
+        self.frequencies = DocumentFrequencies()
+
+    async def extract(self, db: AsyncSession, title: str, body: str) -> Tuple[Analysis, List[str]]:
+        """Analysis and keywords for an article about to be stored"""
+        await self.frequencies.ensure_loaded(db)
+        analysis = await asyncio.to_thread(analyze, title, body)
+        return analysis, pick_keywords(analysis, self.frequencies.idf(analysis.terms), self.count)
+
+    async def record(self, db: AsyncSession, article_id: int, analysis: Analysis, keywords: Sequence[str]):
+        """Store an article's keywords and count its terms, from extract(); the caller commits"""
+        hashes, increments = count_terms([analysis.terms])
+        await self.frequencies.store(db, hashes, increments, 1)
+        db.add(ArticleKeywords(article_id=article_id, keywords=list(keywords)))
+
+    async def extract_many(self, db: AsyncSession, articles: Sequence[Tuple[str, str]]) -> List[Tuple[Analysis, List[str]]]:
+        """Analyses and keywords for many (title, body) pairs about to be stored, in one pass"""
+        await self.frequencies.ensure_loaded(db)
+        analyses = await asyncio.to_thread(lambda: [analyze(title, body) for title, body in articles])
+        if not analyses:
+            return []
+        idf = self.frequencies.idf(np.unique(np.concatenate([analysis.terms for analysis in analyses])))
+        return [(analysis, pick_keywords(analysis, idf, self.count)) for analysis in analyses]
+
+    async def record_many(self, db: AsyncSession, article_ids: Sequence[int], extracted: Sequence[Tuple[Analysis, List[str]]]):
+        """record() for many new articles, from extract_many(); the caller commits"""
+        if not article_ids:
+            return
+        hashes, increments = count_terms([analysis.terms for analysis, _ in extracted])
+        await self.frequencies.store(db, hashes, increments, len(extracted))
+        await db.execute(
+            ArticleKeywords.__table__.insert(),
+            [{"article_id": article_id, "keywords": words} for article_id, (_, words) in zip(article_ids, extracted)]
+        )
+
+    async def backfill(
+        self,
+        db: AsyncSession,
+        batch_size: int = 500,
+        limit: Optional[int] = None,
+        overwrite: bool = False
+    ) -> int:
+        """
+        Tag articles never processed (every article with `overwrite`),
+        `batch_size` at a time in id order, committing after each batch.
+        Tags are set on articles without any, or replaced with `overwrite`;
+        each article's terms are counted once. Returns how many were tagged.
+        """
+        await self.frequencies.ensure_loaded(db)
+        done = 0
+        last_id = 0
+        while limit is None or done < limit:
+            size = batch_size if limit is None else min(batch_size, limit - done)
+            query = (
+                select(Article.id, Article.title, Article.body, Article.tags, ArticleKeywords.article_id.label("recorded"))
+                .outerjoin(ArticleKeywords, ArticleKeywords.article_id == Article.id)
+                .where(Article.id > last_id)
+            )
+            if not overwrite:
+                query = query.where(ArticleKeywords.article_id.is_(None))
+            result = await db.execute(query.order_by(Article.id).limit(size))
+            rows = result.all()
+            if not rows:
+                break
+
+            # Count the batch first, so its own articles inform the IDF
+            analyses = await asyncio.to_thread(lambda: [analyze(row.title, row.body) for row in rows])
+            new = [analysis.terms for row, analysis in zip(rows, analyses) if row.recorded is None]
+            hashes, increments = count_terms(new)
+            if new:
+                await self.frequencies.store(db, hashes, increments, len(new))
+
+            all_terms = np.unique(np.concatenate([analysis.terms for analysis in analyses]))
+            idf = self.frequencies.idf(all_terms, uncommitted=(hashes, increments, len(new)))
+            keywords = [pick_keywords(analysis, idf, self.count) for analysis in analyses]
+
+            ids = [row.id for row in rows]
+            await db.execute(delete(ArticleKeywords).where(ArticleKeywords.article_id.in_(ids)))
+            await db.execute(
+                ArticleKeywords.__table__.insert(),
+                [{"article_id": article_id, "keywords": words} for article_id, words in zip(ids, keywords)]
+            )
+            retag = [
+                {"id": row.id, "tags": words}
+                for row, words in zip(rows, keywords)
+                if words and (overwrite or not row.tags)
+            ]
+            if retag:
+                await db.execute(update(Article), retag)
+            await db.commit()
+
+            done += len(rows)
+            last_id = rows[-1].id
+        return done
+
+    async def untagged_count(self, db: AsyncSession) -> int:
+        """Articles whose keywords were never extracted"""
+        result = await db.execute(
+            select(func.count(Article.id))
+            .outerjoin(ArticleKeywords, ArticleKeywords.article_id == Article.id)
+            .where(ArticleKeywords.article_id.is_(None))
+        )
+        return result.scalar() or 0
+
+
+# Shared by article routes, bulk tagging and imports
+keyword_tagger = KeywordTagger(settings.KEYWORD_TAGS)
@@ -0,0 +1,319 @@
+# app/services/mail_outbox.py
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from itertools import count
+from typing import List, Optional, Set
+from sqlalchemy import delete, or_, select, update
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.delivery import DeliveryStatus, OutboxEmail
+from app.services.delivery_service import retry_delay
+from app.services.email_service import DeliveryFailure, classify_exception, deliver_prepared
+from app.services.mime_cache import PreparedMessage
+
+
+class QueuedEmail:
+    """One transactional email waiting in (or retrying through) the outbox"""
+
+    def __init__(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        outbox_id: Optional[int] = None,
+        attempts: int = 0
+    ):
+        self.to_email = to_email
+        self.subject = subject
+        self.html_content = html_content
+        self.text_content = text_content
+        self.outbox_id = outbox_id
+        self.attempts = attempts
+        self.key: Optional[int] = None  # position in MailOutbox._pending
+        self.enqueued_at = time.monotonic()
+
+
+class MailOutbox:
+    """
+    Background queue for transactional email. Routes enqueue and return at
+    once; a few consumer tasks send through the shared SMTP pool, retry
+    transient failures with backoff and give up on permanent ones.
+
+    With `persist`, each email is written to the email_outbox table before
+    it is queued, claimed by this process for `claim_timeout` seconds. The
+    claim is renewed before every attempt and checked atomically, so with
+    several API processes each stored email is sent by one of them only.
+    Emails whose claim ran out (a process that died) are taken over on
+    startup and every `claim_timeout / 2` seconds after. Sent rows are
+    deleted and dead letters lose their body.
+
+    Until `start()` is called (scripts, one-off CLIs) `enqueue` sends inline.
+    """
+
+    def __init__(self, workers: int = 2, max_size: int = 10000, persist: bool = False, claim_timeout: float = 300.0):
+        self.workers = workers
+        self.max_size = max_size
+        self.persist = persist
+        self.claim_timeout = claim_timeout
+        self.owner = uuid.uuid4().hex
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        # Every email not yet sent or given up on, oldest first
+        self._pending: "OrderedDict[int, QueuedEmail]" = OrderedDict()
+        self._keys = count()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Start the consumers, re-queueing persisted emails left over from the last run"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(self.workers, 1))]
+
+        if self.persist:
+            await self._take_over()
+            self._tasks.append(asyncio.create_task(self._take_over_loop()))
+
+    async def close(self, timeout: float = 10.0):
+        """Give queued emails `timeout` seconds to go out, then stop the consumers"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+        if self._pending:
+            where = "kept in the database" if self.persist else "dropped"
+            print(f"⚠️ {len(self._pending)} transactional emails still queued at shutdown ({where})")
+            if self.persist:
+                await self._release()
+            self._pending.clear()
+
+    async def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ):
+        """Queue an email for the background senders"""
+        email = QueuedEmail(to_email, subject, html_content, text_content)
+
+        if not self._tasks:
+            await self._finish(email, await self._send(email))
+            return
+
+        if self.persist:
+            email.outbox_id = await self._store(email)
+        await self._put(email)
+
+    def metrics(self) -> dict:
+        """Queue depth, age of the oldest queued email and running totals"""
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            "depth": len(self._pending),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "retrying": len(self._retries),
+            "oldest_age_seconds": round(time.monotonic() - oldest.enqueued_at, 3) if oldest else 0.0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "workers": self.workers if self._tasks else 0,
+            "persist": self.persist
+        }
+
+    async def _put(self, email: QueuedEmail):
+        email.key = next(self._keys)
+        self._pending[email.key] = email
+        await self._queue.put(email)
+
+    async def _worker(self):
+        while True:
+            email = await self._queue.get()
+            try:
+                if email.outbox_id is not None and not await self._renew_claim(email):
+                    # Another process took it over while it waited here
+                    self._pending.pop(email.key, None)
+                    continue
+                await self._finish(email, await self._send(email))
+            except Exception as e:
+                print(f"❌ Outbox error for {email.to_email}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, email: QueuedEmail) -> Optional[DeliveryFailure]:
+        prepared = PreparedMessage(email.subject, email.html_content, email.text_content)
+        try:
+            refused = await deliver_prepared(prepared, [email.to_email])
+        except Exception as e:
+            return classify_exception(e)
+        return next(iter(refused.values()), None)
+
+    async def _finish(self, email: QueuedEmail, failure: Optional[DeliveryFailure]):
+        email.attempts += 1
+
+        if failure is None:
+            self.sent += 1
+            status = DeliveryStatus.SENT
+            print(f"✅ Email sent to {email.to_email}")
+        elif failure.transient and email.attempts < settings.DELIVERY_MAX_ATTEMPTS and self._tasks:
+            self.retried += 1
+            task = asyncio.create_task(self._retry_later(email, retry_delay(email.attempts)))
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+            status = DeliveryStatus.PENDING
+        else:
+            self.failed += 1
+            status = DeliveryStatus.FAILED
+            print(f"❌ Failed to send email to {email.to_email}: {failure}")
+
+        if status != DeliveryStatus.PENDING:
+            self._pending.pop(email.key, None)
+        if email.outbox_id is not None:
+            await self._update(email, status, failure)
+
+    async def _retry_later(self, email: QueuedEmail, delay: float):
+        await asyncio.sleep(delay)
+        await self._queue.put(email)
+
+    def _lease(self, extra: float = 0.0) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.claim_timeout + extra)
+
+    async def _store(self, email: QueuedEmail) -> int:
+        async with AsyncSessionLocal() as db:
+            row = OutboxEmail(
+                to_email=email.to_email,
+                subject=email.subject,
+                html_content=email.html_content,
+                text_content=email.text_content,
+                claimed_by=self.owner,
+                claimed_until=self._lease()
+            )
+            db.add(row)
+            await db.commit()
+            return row.id
+
+    async def _renew_claim(self, email: QueuedEmail) -> bool:
+        """Extend this process's claim before an attempt; False if it was taken over"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(OutboxEmail)
+                .where(
+                    OutboxEmail.id == email.outbox_id,
+                    OutboxEmail.status == DeliveryStatus.PENDING,
+                    OutboxEmail.claimed_by == self.owner
+                )
+                .values(claimed_until=self._lease())
+            )
+            await db.commit()
+            return bool(result.rowcount)
+
+    async def _update(self, email: QueuedEmail, status: DeliveryStatus, failure: Optional[DeliveryFailure]):
+        """Record an attempt: delete a sent email, strip a dead letter's body, extend a retry's claim"""
+        async with AsyncSessionLocal() as db:
+            if status == DeliveryStatus.SENT:
+                await db.execute(delete(OutboxEmail).where(OutboxEmail.id == email.outbox_id))
+            else:
+                values = {
+                    "status": status,
+                    "attempts": email.attempts,
+                    "last_error": str(failure)[:1000] if failure else None,
+                    "smtp_code": failure.code if failure else None
+                }
+                if status == DeliveryStatus.FAILED:
+                    values.update(html_content="", text_content=None, claimed_by=None, claimed_until=None)
+                else:
+                    values["claimed_until"] = self._lease(settings.DELIVERY_RETRY_MAX_DELAY)
+                await db.execute(update(OutboxEmail).where(OutboxEmail.id == email.outbox_id).values(**values))
+            await db.commit()
+
+    async def _take_over(self) -> int:
+        """Claim stored emails nobody holds (left by a stopped or dead process) and queue them"""
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            result = await db.execute(
+                update(OutboxEmail)
+                .where(
+                    OutboxEmail.status == DeliveryStatus.PENDING,
+                    or_(OutboxEmail.claimed_until.is_(None), OutboxEmail.claimed_until <= now)
+                )
+                .values(claimed_by=self.owner, claimed_until=self._lease())
+                .returning(OutboxEmail.id)
+            )
+            claimed = list(result.scalars().all())
+            await db.commit()
+            if not claimed:
+                return 0
+
+            # Our own emails can expire while still queued here; they are already in line
+            queued = {email.outbox_id for email in self._pending.values()}
+            claimed = [outbox_id for outbox_id in claimed if outbox_id not in queued]
+            if not claimed:
+                return 0
+            result = await db.execute(
+                select(OutboxEmail).where(OutboxEmail.id.in_(claimed)).order_by(OutboxEmail.id)
+            )
+            leftovers = [
+                QueuedEmail(
+                    row.to_email, row.subject, row.html_content, row.text_content,
+                    outbox_id=row.id, attempts=row.attempts
+                )
+                for row in result.scalars()
+            ]
+        for email in leftovers:
+            await self._put(email)
+        print(f"📥 Took over {len(leftovers)} transactional emails from the outbox")
+        return len(leftovers)
+
+    async def _take_over_loop(self):
+        while True:
+            await asyncio.sleep(max(self.claim_timeout / 2, 1.0))
+            try:
+                await self._take_over()
+            except Exception as e:
+                print(f"❌ Outbox take-over error: {e}")
+
+    async def _release(self):
+        """Let another process have the stored emails still queued here"""
+        ids = [email.outbox_id for email in self._pending.values() if email.outbox_id is not None]
+        if not ids:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(OutboxEmail)
+                    .where(OutboxEmail.id.in_(ids), OutboxEmail.claimed_by == self.owner)
+                    .values(claimed_by=None, claimed_until=None)
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"⚠️ Could not release queued outbox emails: {e}")
+
+
+# Shared outbox started and stopped by the API lifespan
+mail_outbox = MailOutbox(
+    workers=settings.MAIL_OUTBOX_WORKERS,
+    max_size=settings.MAIL_OUTBOX_MAX_SIZE,
+    persist=settings.MAIL_OUTBOX_PERSIST,
+    claim_timeout=settings.MAIL_OUTBOX_CLAIM_TIMEOUT
+)
@@ -0,0 +1,132 @@
+# app/services/mime_cache.py
+
+from collections import OrderedDict
+from email import policy
+from email.generator import BytesGenerator
+from email.charset import Charset, QP
+from email.header import Header
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from io import BytesIO
+from typing import Hashable, Optional
+from app.core.config import settings
+
+
+def _header(name: str, value: str) -> bytes:
+    """Serialize a single header line, RFC 2047-encoding it only when needed"""
+    # ASCII values are written verbatim: folding would mangle long URLs in
+    # List-Unsubscribe, and lines stay well under the 998 octet limit
+    if value.isascii() and "\n" not in value and "\r" not in value:
+        return f"{name}: {value}\r\n".encode("ascii")
+    return policy.SMTP.fold(name, value).encode("utf-8")
+
+
+# UTF-8 with quoted-printable bodies: wraps long lines and keeps ASCII readable
+UTF8_QP = Charset("utf-8")
+UTF8_QP.body_encoding = QP
+
+# SMTP line limit, excluding CRLF (RFC 5321 4.5.3.1.6)
+MAX_LINE_LENGTH = 998
+
+
+def _text_part(text: str, subtype: str) -> MIMEText:
+    """7bit when the text allows it, quoted-printable when mostly ASCII, base64 otherwise"""
+    lines = text.splitlines() or [""]
+    if text.isascii() and max(len(line) for line in lines) <= MAX_LINE_LENGTH:
+        return MIMEText(text, subtype)
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    if non_ascii * 10 < len(text):
+        # Minified HTML is one long line; QP keeps it under the limit cheaply
+        return MIMEText(text, subtype, UTF8_QP)
+    return MIMEText(text, subtype, "utf-8")
+
+
+class PreparedMessage:
+    """
+    A message whose shared headers and MIME body are serialized once.
+
+    The per-recipient message is produced by prepending the few headers that
+    differ between recipients (To, Date, Message-ID, List-Unsubscribe) to the
+    pre-encoded bytes, so a large send does not re-encode the same HTML and
+    text parts for every address.
+    """
+
+    def __init__(
+        self,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        from_header: Optional[str] = None
+    ):
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject if subject.isascii() else Header(subject, "utf-8")
+        message["From"] = from_header or f"{settings.FROM_NAME} <{settings.FROM_EMAIL}>"
+
+        if text_content:
+            message.attach(_text_part(text_content, "plain"))
+        message.attach(_text_part(html_content, "html"))
+
+        buffer = BytesIO()
+        BytesGenerator(buffer, policy=policy.compat32.clone(linesep="\r\n")).flatten(message)
+        self.payload = buffer.getvalue()
+        self.msgid_domain = settings.FROM_EMAIL.rpartition("@")[2] or None
+
+    @classmethod
+    def from_payload(cls, payload: bytes) -> "PreparedMessage":
+        """Rebuild from bytes produced earlier (e.g. read back from the artifact store)"""
+        prepared = cls.__new__(cls)
+        prepared.payload = payload
+        prepared.msgid_domain = settings.FROM_EMAIL.rpartition("@")[2] or None
+        return prepared
+
+    def __len__(self) -> int:
+        return len(self.payload)
+
+    def render(
+        self,
+        to_email: str,
+        unsubscribe_url: Optional[str] = None,
+        message_id: Optional[str] = None
+    ) -> bytes:
+        """Splice the per-recipient headers onto the pre-encoded message"""
+        headers = [
+            _header("To", to_email),
+            _header("Date", formatdate()),
+            _header("Message-ID", message_id or make_msgid(domain=self.msgid_domain)),
+        ]
+        if unsubscribe_url:
+            headers.append(_header("List-Unsubscribe", f"<{unsubscribe_url}>"))
+        headers.append(self.payload)
+        return b"".join(headers)
+
+
+class PreparedMessageCache:
+    """Small LRU of prepared messages, keyed by newsletter version"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, PreparedMessage]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[PreparedMessage]:
+        prepared = self._entries.get(key)
+        if prepared is not None:
+            self._entries.move_to_end(key)
+        return prepared
+
+    def put(self, key: Hashable, prepared: PreparedMessage):
+        self._entries[key] = prepared
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, subject: str, html_content: str, text_content: Optional[str] = None) -> PreparedMessage:
+        prepared = self.get(key)
+        if prepared is None:
+            prepared = PreparedMessage(subject, html_content, text_content)
+            self.put(key, prepared)
+        return prepared
+
+
+# Shared cache used by the newsletter send path
+prepared_messages = PreparedMessageCache()
@@ -2,15 +2,256 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.models.newsletter import Newsletter
-from app.models.user import User
-from app.models.subscriber import Subscriber
-from app.services.email_service import send_email
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
 import asyncio
+import hashlib
+import time
+from datetime import datetime
+from app.models.newsletter import Newsletter, NewsletterStatus
+from app.models.template import Template
+from app.models.user import User
+from app.core.config import settings
+from app.services.email_service import DeliveryFailure, classify_exception, deliver_prepared, build_unsubscribe_url
+from app.services.mime_cache import PreparedMessage, PreparedMessageCache, prepared_messages
+from app.services.delivery_service import (
+    DeliveryProgress, Recipient, SendFunction, Shard,
+    deliver, enqueue_newsletter
+)
+from app.services.rate_limiter import DeliveryRateLimiter
+from app.services.template_engine import CompiledTemplate, compile_template, compiled_templates
+from app.services.html_optimizer import optimize_html
+from app.services.artifact_store import artifact_key, artifact_store
+from app.services.archive_service import ArchivedPage, archived_pages, build_archived_page
+from app.services.generation_service import article_excerpts, assemble_sections, select_articles, standalone_page
+from app.services.html_to_text import text_conversions
+
+
+# Recipient variables that are (nearly) unique per address: a message using
+# them cannot be shared between recipients
+PER_ADDRESS_VARIABLES = frozenset({"subscriber.email", "subscriber.full_name", "unsubscribe_url"})
+
+
+def is_recipient_variable(name: str) -> bool:
+    """Template variables that differ between recipients"""
+    return name.startswith("subscriber.") or name == "unsubscribe_url"
+
+
+def newsletter_variables(newsletter: Newsletter) -> Dict[str, Any]:
+    """Variables shared by every recipient of a newsletter"""
+    return {
+        "newsletter.title": newsletter.title,
+        "newsletter.subject": newsletter.subject,
+    }
+
+
+def subscriber_variables(recipient: Recipient) -> Dict[str, Any]:
+    """Per-recipient template variables, including one flag per followed topic"""
+    full_name = recipient.full_name or ""
+    preferences = recipient.preferences or {}
+    topics = preferences.get("topics") or []
+    
+    variables = {
+        "subscriber.email": recipient.email,
+        "subscriber.full_name": full_name,
+        "subscriber.first_name": full_name.split(" ", 1)[0],
+        "subscriber.topics": ", ".join(topics),
+        "subscriber.frequency": preferences.get("frequency") or "",
+        "unsubscribe_url": build_unsubscribe_url(recipient.email, recipient.unsubscribe_token),
+    }
+    for topic in topics:
+        # {{#subscriber.topics.AI}} ... {{/subscriber.topics.AI}}
+        variables[f"subscriber.topics.{topic}"] = True
+    return variables
+
+
+class CompiledNewsletter(NamedTuple):
+    """A newsletter merged into its layout, with only per-recipient slots left open"""
+    version: tuple
+    html: CompiledTemplate
+    text: Optional[CompiledTemplate]
+    
+    @property
+    def variables(self) -> FrozenSet[str]:
+        if self.text is None:
+            return self.html.variables
+        return self.html.variables | self.text.variables
+    
+    @property
+    def is_static(self) -> bool:
+        return not self.variables
+    
+    def render(self, context: Dict[str, Any] = None) -> Tuple[str, Optional[str]]:
+        html = self.html.render(context)
+        text = self.text.render(context) if self.text is not None else None
+        return html, text
+
+
+def newsletter_digest(newsletter: Newsletter, template: Optional[Template] = None) -> str:
+    """Hash of everything a newsletter's rendering depends on: its content and its layout"""
+    
+    digest = hashlib.sha256()
+    for part in (
+        newsletter.title, newsletter.subject, newsletter.content_html,
+        newsletter.content_text, template.html_content if template else None
+    ):
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def compile_newsletter(newsletter: Newsletter, template: Optional[Template] = None) -> CompiledNewsletter:
+    """
+    Merge a newsletter body into its template. The template is parsed once
+    per (template_id, updated_at) and the merged result once per content
+    digest, so a send only fills the per-recipient slots.
+    """
+    
+    version = (newsletter.id, newsletter_digest(newsletter, template))
+    
+    html = compiled_templates.get(("html",) + version)
+    if html is None:
+        html = await merge_newsletter_html(newsletter, template, version)
+        compiled_templates.put(("html",) + version, html)
+    
+    text = None
+    if newsletter.content_text:
+        text = compiled_templates.get(("text",) + version)
+        if text is None:
+            text = compile_template(newsletter.content_text, autoescape=False).bind(
+                newsletter_variables(newsletter), keep=is_recipient_variable
+            )
+            compiled_templates.put(("text",) + version, text)
+    
+    return CompiledNewsletter(version, html, text)
+
+
+async def merge_newsletter_html(newsletter: Newsletter, template: Optional[Template], version: tuple) -> CompiledTemplate:
+    """Merge, inline and minify a newsletter version (or load that from the artifact store), then bind its values"""
+    
+    # The stored artifact keeps every slot open: source() writes text
+    # verbatim, so a bound title containing "{{" would parse as a tag again
+    key = artifact_key("html", version, settings.NEWSLETTER_INLINE_CSS, settings.NEWSLETTER_MINIFY_HTML)
+    stored = await artifact_store.get(key)
+    if stored is not None:
+        merged = compile_template(stored.decode("utf-8"))
+    else:
+        body = compile_template(newsletter.content_html)
+        if template is not None:
+            layout = compiled_templates.get_or_compile(
+                ("template", template.id, template.updated_at),
+                template.html_content
+            )
+            merged = layout.bind({"content": body})
+        else:
+            merged = body
+        merged = optimize_newsletter_html(newsletter, merged)
+        await artifact_store.put(key, merged.source().encode("utf-8"))
+    
+    return merged.bind(newsletter_variables(newsletter), keep=is_recipient_variable)
+
+
+async def render_segment(
+    newsletter: Newsletter,
+    compiled: CompiledNewsletter,
+    signature: tuple,
+    context: Optional[Dict[str, Any]] = None
+) -> PreparedMessage:
+    """
+    The MIME-encoded message for one segment. Segments that carry nothing
+    address-specific are kept in the artifact store, so resending or
+    retrying an unchanged newsletter skips rendering and encoding.
+    """
+    
+    shareable = not PER_ADDRESS_VARIABLES.intersection(compiled.variables)
+    key = artifact_key(
+        "mime", compiled.version, signature, newsletter.subject,
+        settings.FROM_NAME, settings.FROM_EMAIL,
+        settings.NEWSLETTER_INLINE_CSS, settings.NEWSLETTER_MINIFY_HTML
+    )
+    if shareable:
+        payload = await artifact_store.get(key)
+        if payload is not None:
+            return PreparedMessage.from_payload(payload)
+    
+    html, text = compiled.render(context)
+    prepared = PreparedMessage(newsletter.subject, html, text)
+    if shareable:
+        await artifact_store.put(key, prepared.payload)
+    return prepared
+
+
+async def render_newsletter_page(newsletter: Newsletter, template: Optional[Template] = None) -> str:
+    """The newsletter as a web page (previews, archive), recipient slots left empty"""
+    
+    compiled = await compile_newsletter(newsletter, template)
+    key = artifact_key("page", compiled.version, settings.NEWSLETTER_INLINE_CSS, settings.NEWSLETTER_MINIFY_HTML)
+    stored = await artifact_store.get(key)
+    if stored is not None:
+        return stored.decode("utf-8")
+    
+    html = compiled.html.render()
+    await artifact_store.put(key, html.encode("utf-8"))
+    return html
+
+
+async def archive_newsletter(newsletter: Newsletter, template: Optional[Template] = None) -> ArchivedPage:
+    """The public archive page with its precompressed bodies, built once per version"""
+    
+    version = (newsletter.id, newsletter_digest(newsletter, template))
+    page = await archived_pages.get(version)
+    if page is None:
+        html = await render_newsletter_page(newsletter, template)
+        # gzip -9 and brotli -q 11 take long enough to stall the event loop
+        page = await asyncio.to_thread(build_archived_page, html)
+        await archived_pages.put(version, page)
+    return page
+
+
+def optimize_newsletter_html(newsletter: Newsletter, html: CompiledTemplate) -> CompiledTemplate:
+    """Inline CSS and minify the merged HTML; its byte count is multiplied by every recipient"""
+    
+    if not (settings.NEWSLETTER_INLINE_CSS or settings.NEWSLETTER_MINIFY_HTML):
+        return html
+    
+    optimized = optimize_html(
+        html.source(),
+        inline_css=settings.NEWSLETTER_INLINE_CSS,
+        minify=settings.NEWSLETTER_MINIFY_HTML
+    )
+    saved = optimized.saved_bytes / optimized.original_bytes * 100 if optimized.original_bytes else 0.0
+    print(
+        f"🗜️ Newsletter {newsletter.id}: HTML {optimized.original_bytes} -> "
+        f"{optimized.optimized_bytes} bytes ({saved:.0f}% smaller per message)"
+    )
+    return compile_template(optimized.html)
 
 
-async def generate_newsletter_content(email: str, db: AsyncSession):
-    """Generate AI-powered newsletter content (placeholder)"""
+async def get_newsletter_template(newsletter: Newsletter, db: AsyncSession) -> Optional[Template]:
+    """The layout a newsletter is rendered into, if it has one"""
+    
+    if newsletter.template_id is None:
+        return None
+    result = await db.execute(
+        select(Template).where(Template.id == newsletter.template_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def generate_newsletter_content(
+    email: str,
+    db: AsyncSession,
+    topics: Optional[List[str]] = None,
+    template_id: Optional[int] = None,
+    max_articles: Optional[int] = None
+):
+    """
+    Generate a draft newsletter from recently published articles: rank the
+    candidates by recency, topic match and engagement, drop near-duplicate
+    stories and lay the winners out in topic sections.
+    """
+    
+    started = time.perf_counter()
+    topics = topics or []
     
     # Get user
     result = await db.execute(select(User).where(User.email == email))
@@ -19,36 +260,107 @@ async def generate_newsletter_content(email: str, db: AsyncSession):
     if not user:
         return None
     
-    # TODO: Implement AI content generation
-    # For now, create a placeholder newsletter
+    articles, considered = await select_articles(db, topics, max_articles or settings.GENERATION_MAX_ARTICLES)
+    if not articles:
+        print(f"⚠️ No recent articles to generate a newsletter from ({considered} candidates)")
+        return None
+    
+    # The requested layout, else the default one, else a bare page
+    template = None
+    if template_id is not None:
+        result = await db.execute(select(Template).where(Template.id == template_id))
+        template = result.scalar_one_or_none()
+        if template is None:
+            print(f"⚠️ Template {template_id} not found, using the default layout")
+    if template is None:
+        result = await db.execute(
+            select(Template).where(Template.is_default == True).order_by(Template.id).limit(1)
+        )
+        template = result.scalar_one_or_none()
     
-    placeholder_html = """
-    <html>
-        <body style="font-family: Arial, sans-serif;">
-            <h1>AI-Generated Newsletter</h1>
-            <p>This is a placeholder for AI-generated content.</p>
-        </body>
-    </html>
-    """
+    content_html = assemble_sections(articles, topics, await article_excerpts(db, articles))
+    if template is None:
+        content_html = standalone_page(content_html)
     
+    lead = articles[0].title
+    more = len(articles) - 1
     new_newsletter = Newsletter(
-        title="AI-Generated Newsletter",
-        subject="Your Weekly AI Newsletter",
-        content_html=placeholder_html,
+        title=f"{', '.join(topics) or 'Top'} stories, {datetime.utcnow():%B %d, %Y}",
+        subject=f"{lead} and {more} more stories" if more else lead,
+        content_html=content_html,
+        content_text=await text_conversions.convert(content_html),
+        content_text_generated=True,
         author_id=user.id,
-        status="draft"
+        template_id=template.id if template else None,
+        status=NewsletterStatus.DRAFT
     )
     
     db.add(new_newsletter)
     await db.commit()
     await db.refresh(new_newsletter)
     
-    print(f"✅ Newsletter generated: {new_newsletter.id}")
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Newsletter generated: {new_newsletter.id} "
+        f"({len(articles)} of {considered} candidate articles, {elapsed:.2f}s)"
+    )
     return new_newsletter.id
 
 
 async def send_newsletter_to_subscribers(newsletter_id: int, db: AsyncSession):
-    """Send newsletter to all subscribers"""
+    """
+    Send newsletter to all subscribers.
+    Safe to call again after a crash: only subscribers without a recorded
+    delivery are sent to.
+    """
+    
+    # Record one outbox job per subscriber, then drain it
+    if not await queue_newsletter(newsletter_id, db):
+        return False
+    
+    progress = await drain_newsletter(newsletter_id, db)
+    
+    print(f"✅ Newsletter sent to {progress.sent}/{progress.processed} subscribers")
+    
+    return True
+
+
+async def queue_newsletter(newsletter_id: int, db: AsyncSession) -> bool:
+    """Fill the delivery outbox for a newsletter and mark it sent; False if it does not exist"""
+    
+    result = await db.execute(
+        select(Newsletter).where(Newsletter.id == newsletter_id)
+    )
+    newsletter = result.scalar_one_or_none()
+    if newsletter is None:
+        return False
+    
+    queued = await enqueue_newsletter(db, newsletter_id)
+    if queued:
+        print(f"📥 Queued {queued} deliveries for newsletter {newsletter_id}")
+    
+    if newsletter.status in (NewsletterStatus.DRAFT, NewsletterStatus.SCHEDULED):
+        newsletter.status = NewsletterStatus.SENT
+        newsletter.sent_at = datetime.utcnow()
+        await db.commit()
+    
+    # Compress the archive copy now, before the send brings readers to it
+    try:
+        template = await get_newsletter_template(newsletter, db)
+        await archive_newsletter(newsletter, template)
+    except Exception as e:
+        print(f"⚠️ Could not prepare the archive page for newsletter {newsletter_id}: {e}")
+    return True
+
+
+async def drain_newsletter(
+    newsletter_id: int,
+    db: AsyncSession,
+    shard: Optional[Shard] = None,
+    stop: Optional[asyncio.Event] = None,
+    limiter: Optional[DeliveryRateLimiter] = None
+) -> Optional[DeliveryProgress]:
+    """Send a newsletter's pending outbox jobs (optionally one shard of them)"""
     
     # Get newsletter
     result = await db.execute(
@@ -57,29 +369,105 @@ async def send_newsletter_to_subscribers(newsletter_id: int, db: AsyncSession):
     newsletter = result.scalar_one_or_none()
     
     if not newsletter:
-        return False
+        return None
     
-    # Get all active subscribers
-    result = await db.execute(
-        select(Subscriber).where(Subscriber.is_subscribed == True)
+    template = await get_newsletter_template(newsletter, db)
+    send, per_message = await build_newsletter_sender(newsletter, template)
+    
+    return await deliver(
+        db, newsletter.id, send,
+        recipients_per_message=per_message,
+        shard=shard,
+        stop=stop,
+        limiter=limiter
     )
-    subscribers = result.scalars().all()
-    
-    # Send emails asynchronously
-    tasks = []
-    for subscriber in subscribers:
-        task = send_email(
-            subscriber.email,
-            newsletter.subject,
-            newsletter.content_html,
-            newsletter.content_text
-        )
-        tasks.append(task)
+
+
+async def build_newsletter_sender(
+    newsletter: Newsletter,
+    template: Optional[Template] = None
+) -> Tuple[SendFunction, int]:
+    """
+    Build the send function for a newsletter and how many recipients it
+    takes per call.
+    
+    Recipients are grouped by their segment: the values of the recipient
+    variables the compiled template actually uses (for a topic-driven
+    layout, which of its topics they follow). Each segment is rendered and
+    MIME-encoded once per send and reused for everyone in it, and members of
+    a segment share one SMTP transaction. A template without recipient
+    variables is a single segment, encoded once per newsletter version.
+    """
     
-    # Wait for all emails to be sent
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    compiled = await compile_newsletter(newsletter, template)
+    slots = sorted(compiled.variables)
+    msgid_domain = settings.FROM_EMAIL.rpartition("@")[2]
     
-    success_count = sum(1 for r in results if r is True)
-    print(f"✅ Newsletter sent to {success_count}/{len(subscribers)} subscribers")
+    if compiled.is_static:
+        shared = prepared_messages.get(compiled.version)
+        if shared is None:
+            shared = await render_segment(newsletter, compiled, ())
+            prepared_messages.put(compiled.version, shared)
+    segments = PreparedMessageCache(max_entries=settings.DELIVERY_SEGMENT_CACHE_SIZE)
     
-    return True
+    async def segment(recipient: Recipient) -> Tuple[tuple, PreparedMessage]:
+        if compiled.is_static:
+            return (), shared
+        context = subscriber_variables(recipient)
+        signature = tuple(context.get(name) for name in slots)
+        prepared = segments.get(signature)
+        if prepared is None:
+            prepared = await render_segment(newsletter, compiled, signature, context)
+            segments.put(signature, prepared)
+        return signature, prepared
+    
+    async def send_segment(prepared: PreparedMessage, members: List[Recipient]) -> Dict[int, DeliveryFailure]:
+        if len(members) == 1:
+            recipient = members[0]
+            refused = await deliver_prepared(
+                prepared,
+                [recipient.email],
+                unsubscribe_url=build_unsubscribe_url(recipient.email, recipient.unsubscribe_token),
+                message_id=f"<newsletter-{newsletter.id}.{recipient.id}@{msgid_domain}>"
+            )
+            return {recipient.job_id: error for error in refused.values()}
+        
+        refused = await deliver_prepared(
+            prepared,
+            [recipient.email for recipient in members],
+            unsubscribe_url=build_unsubscribe_url(),
+            message_id=f"<newsletter-{newsletter.id}.b{members[0].job_id}@{msgid_domain}>"
+        )
+        return {
+            recipient.job_id: refused[recipient.email]
+            for recipient in members
+            if recipient.email in refused
+        }
+    
+    async def send(recipients: List[Recipient]) -> Dict[int, DeliveryFailure]:
+        groups: Dict[tuple, Tuple[PreparedMessage, List[Recipient]]] = {}
+        for recipient in recipients:
+            signature, prepared = await segment(recipient)
+            groups.setdefault(signature, (prepared, []))[1].append(recipient)
+        
+        if len(groups) == 1:
+            prepared, members = next(iter(groups.values()))
+            return await send_segment(prepared, members)
+        
+        # One transaction per segment; a failed one only fails its own members
+        refused: Dict[int, DeliveryFailure] = {}
+        for prepared, members in groups.values():
+            try:
+                refused.update(await send_segment(prepared, members))
+            except Exception as e:
+                failure = classify_exception(e)
+                print(f"❌ Delivery to {len(members)} recipient(s) failed: {failure}")
+                refused.update({recipient.job_id: failure for recipient in members})
+        return refused
+    
+    # Identical messages can share one transaction across many RCPT TOs, at
+    # the cost of the per-recipient List-Unsubscribe (opt-in, see config)
+    batch_size = settings.DELIVERY_RCPT_BATCH_SIZE
+    if batch_size > 1 and not PER_ADDRESS_VARIABLES.intersection(slots):
+        return send, batch_size
+    return send, 1
@@ -0,0 +1,116 @@
+# app/services/rate_limiter.py
+
+import asyncio
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        # `now` may predate a bucket created after the caller read the clock
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 when one is available now)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    @property
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class DeliveryRateLimiter:
+    """
+    Outbound rate limits: one global bucket for the relay plus one bucket per
+    destination domain. A message may only go out when both its domain bucket
+    and the global bucket have a token, so the send rate never exceeds either
+    limit. A rate of 0 disables that limit.
+    """
+
+    # Idle (full) domain buckets are dropped once this many are tracked
+    MAX_TRACKED_DOMAINS = 10000
+
+    def __init__(
+        self,
+        global_rate: float = 0,
+        domain_rate: float = 0,
+        domain_rates: Optional[Dict[str, float]] = None
+    ):
+        self.global_bucket = TokenBucket(global_rate) if global_rate > 0 else None
+        self.domain_rate = domain_rate
+        self.domain_rates = {d.lower(): r for d, r in (domain_rates or {}).items()}
+        self._domain_buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket_for(self, domain: str) -> Optional[TokenBucket]:
+        bucket = self._domain_buckets.get(domain)
+        if bucket is None:
+            rate = self.domain_rates.get(domain, self.domain_rate)
+            if rate <= 0:
+                return None
+            if len(self._domain_buckets) >= self.MAX_TRACKED_DOMAINS:
+                self._prune()
+            bucket = self._domain_buckets[domain] = TokenBucket(rate)
+        return bucket
+
+    def _prune(self):
+        for domain in [d for d, b in self._domain_buckets.items() if b.is_full]:
+            del self._domain_buckets[domain]
+
+    def reserve(self, domain: str) -> float:
+        """
+        Take a token for `domain` if both buckets allow it and return 0,
+        otherwise take nothing and return how long to wait
+        """
+        now = time.monotonic()
+        buckets = [b for b in (self._bucket_for(domain.lower()), self.global_bucket) if b]
+        wait = max((b.delay(now) for b in buckets), default=0.0)
+        if wait == 0:
+            for bucket in buckets:
+                bucket.take()
+        return wait
+
+    async def acquire(self, domain: str, max_wait: float) -> Optional[float]:
+        """
+        Wait for a send slot for `domain`.
+        Returns None once the slot is taken, or the expected remaining wait
+        if it would exceed `max_wait` so the caller can defer the message.
+        """
+        waited = 0.0
+        while True:
+            wait = self.reserve(domain)
+            if wait == 0:
+                return None
+            if waited + wait > max_wait:
+                return wait
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+def email_domain(email: str) -> str:
+    return email.rpartition("@")[2].lower()
+
+
+# Shared limiter for newsletter delivery
+delivery_rate_limiter = DeliveryRateLimiter(
+    global_rate=settings.DELIVERY_GLOBAL_RATE,
+    domain_rate=settings.DELIVERY_DOMAIN_RATE,
+    domain_rates=settings.DELIVERY_DOMAIN_RATES
+)
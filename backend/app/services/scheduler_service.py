@@ -1,10 +1,12 @@
 # app/services/scheduler_service.py
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists
 from datetime import datetime
+from app.models.delivery import DeliveryJob, DeliveryStatus
 from app.models.schedule import Schedule, ScheduleStatus
-from app.services.newsletter_service import send_newsletter_to_subscribers
+from app.services.delivery_service import count_pending_jobs
+from app.services.newsletter_service import send_newsletter_to_subscribers, queue_newsletter
 
 
 async def process_pending_schedules(db: AsyncSession):
@@ -12,10 +14,13 @@ async def process_pending_schedules(db: AsyncSession):
     
     now = datetime.utcnow()
     
-    # Get all pending schedules that should be executed
+    # Get all pending schedules that should be executed, plus any left
+    # PROCESSING by an interrupted run; the delivery outbox resumes those
+    # where they stopped instead of starting over, and its job claims keep
+    # this from sending anything a delivery worker is already sending
     result = await db.execute(
         select(Schedule).where(
-            Schedule.status == ScheduleStatus.PENDING,
+            Schedule.status.in_([ScheduleStatus.PENDING, ScheduleStatus.PROCESSING]),
             Schedule.scheduled_for <= now
         )
     )
@@ -30,7 +35,10 @@ async def process_pending_schedules(db: AsyncSession):
             # Send newsletter
             success = await send_newsletter_to_subscribers(schedule.newsletter_id, db)
             
-            if success:
+            if success and await count_pending_jobs(db, schedule.newsletter_id):
+                # Retries are still outstanding; the next run resumes them
+                pass
+            elif success:
                 schedule.status = ScheduleStatus.COMPLETED
                 schedule.executed_at = datetime.utcnow()
             else:
@@ -46,3 +54,63 @@ async def process_pending_schedules(db: AsyncSession):
             schedule.retry_count += 1
             await db.commit()
             print(f"❌ Failed to process schedule {schedule.id}: {e}")
+
+
+async def queue_due_schedules(db: AsyncSession) -> int:
+    """
+    Fill the delivery outbox for every due schedule and mark it PROCESSING.
+    Used by the standalone delivery workers, which drain the outbox themselves.
+    """
+    
+    now = datetime.utcnow()
+    
+    result = await db.execute(
+        select(Schedule).where(
+            Schedule.status == ScheduleStatus.PENDING,
+            Schedule.scheduled_for <= now
+        )
+    )
+    schedules = result.scalars().all()
+    
+    for schedule in schedules:
+        try:
+            if await queue_newsletter(schedule.newsletter_id, db):
+                schedule.status = ScheduleStatus.PROCESSING
+            else:
+                schedule.status = ScheduleStatus.FAILED
+                schedule.error_message = "Newsletter not found"
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            await db.refresh(schedule)
+            schedule.status = ScheduleStatus.FAILED
+            schedule.error_message = str(e)
+            schedule.retry_count += 1
+            await db.commit()
+            print(f"❌ Failed to queue schedule {schedule.id}: {e}")
+    
+    return len(schedules)
+
+
+async def complete_drained_schedules(db: AsyncSession) -> int:
+    """Mark PROCESSING schedules COMPLETED once their outbox has no pending jobs"""
+    
+    has_pending = exists().where(
+        DeliveryJob.newsletter_id == Schedule.newsletter_id,
+        DeliveryJob.status == DeliveryStatus.PENDING
+    )
+    result = await db.execute(
+        select(Schedule).where(
+            Schedule.status == ScheduleStatus.PROCESSING,
+            ~has_pending
+        )
+    )
+    schedules = result.scalars().all()
+    
+    for schedule in schedules:
+        schedule.status = ScheduleStatus.COMPLETED
+        schedule.executed_at = datetime.utcnow()
+    
+    if schedules:
+        await db.commit()
+    return len(schedules)
@@ -0,0 +1,224 @@
+# app/services/smtp_pool.py
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Sequence, Union
+import aiosmtplib
+from aiosmtplib.email import extract_recipients, extract_sender, flatten_message
+from aiosmtplib.errors import SMTPRecipientsRefused, SMTPResponseException, SMTPServerDisconnected
+from app.core.config import settings
+
+
+# Reply code a relay sends before it drops the session ("service not available")
+SMTP_SERVICE_UNAVAILABLE = 421
+
+
+class PooledConnection:
+    """An authenticated SMTP session owned by the pool"""
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    @property
+    def is_connected(self) -> bool:
+        return self.smtp.is_connected
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` authenticated SMTP sessions alive and hands them out
+    to senders. Sessions are recycled after `max_messages` messages or after
+    sitting idle for `idle_timeout` seconds, and are transparently
+    re-established when the relay disconnects or answers 421.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = 5,
+        max_messages: int = 100,
+        idle_timeout: float = 60.0,
+        timeout: float = 60.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.start_tls = start_tls
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._idle: list = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._closed = False
+
+        # Counters, handy when benchmarking against a local sink
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so the pool can be instantiated at import time,
+        # before an event loop exists
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self._slots
+
+    async def _connect(self) -> PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        self.connections_opened += 1
+        return PooledConnection(smtp)
+
+    def _is_reusable(self, conn: PooledConnection) -> bool:
+        if not conn.is_connected:
+            return False
+        if conn.messages_sent >= self.max_messages:
+            return False
+        if time.monotonic() - conn.last_used > self.idle_timeout:
+            return False
+        return True
+
+    async def _discard(self, conn: PooledConnection):
+        """Politely end a session, ignoring errors from an already dead socket"""
+        try:
+            if conn.is_connected:
+                await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    def _touch(self, conn: PooledConnection):
+        """Count a finished mail transaction against the session"""
+        conn.messages_sent += 1
+        conn.last_used = time.monotonic()
+
+    async def acquire(self) -> PooledConnection:
+        """Borrow a live session, opening a new one if none is reusable"""
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+
+        await self._semaphore().acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if self._is_reusable(conn):
+                    return conn
+                await self._discard(conn)
+            return await self._connect()
+        except BaseException:
+            self._semaphore().release()
+            raise
+
+    async def release(self, conn: PooledConnection, discard: bool = False):
+        """Return a session to the pool, or close it if it is spent"""
+        try:
+            if discard or self._closed or not self._is_reusable(conn):
+                await self._discard(conn)
+            else:
+                self._idle.append(conn)
+        finally:
+            self._semaphore().release()
+
+    @asynccontextmanager
+    async def connection(self):
+        """Context manager around acquire/release"""
+        conn = await self.acquire()
+        discard = False
+        try:
+            yield conn
+        except BaseException:
+            # The session may be mid-transaction; never hand it out again
+            discard = True
+            raise
+        finally:
+            await self.release(conn, discard=discard)
+
+    async def sendmail(
+        self,
+        sender: str,
+        recipients: Union[str, Sequence[str]],
+        message: Union[str, bytes],
+    ):
+        """
+        Run one mail transaction on a pooled session.
+        A disconnect or 421 is retried once on a fresh session; other
+        rejections keep the session, which aiosmtplib has already reset.
+        """
+        for attempt in range(2):
+            conn = await self.acquire()
+            try:
+                response = await conn.smtp.sendmail(sender, recipients, message)
+            except (SMTPServerDisconnected, ConnectionError) as e:
+                await self.release(conn, discard=True)
+                if attempt:
+                    raise
+                print(f"⚠️ SMTP session dropped, reconnecting: {e}")
+                continue
+            except SMTPResponseException as e:
+                if e.code != SMTP_SERVICE_UNAVAILABLE:
+                    # aiosmtplib has already sent RSET, so the session is still good
+                    self._touch(conn)
+                    await self.release(conn)
+                    raise
+                await self.release(conn, discard=True)
+                if attempt:
+                    raise
+                print(f"⚠️ SMTP relay answered 421, reconnecting: {e.message}")
+                continue
+            except SMTPRecipientsRefused:
+                self._touch(conn)
+                await self.release(conn)
+                raise
+            except BaseException:
+                await self.release(conn, discard=True)
+                raise
+
+            self._touch(conn)
+            self.messages_sent += 1
+            await self.release(conn)
+            return response
+
+    async def send_message(self, message, sender: Optional[str] = None, recipients=None):
+        """Send an email.message.Message, deriving envelope from its headers"""
+        if sender is None:
+            sender = extract_sender(message) or settings.FROM_EMAIL
+        if recipients is None:
+            recipients = extract_recipients(message)
+        return await self.sendmail(sender, recipients, flatten_message(message, cte_type="7bit"))
+
+    async def close(self):
+        """Close every idle session; busy ones are closed as they are released"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+
+
+# Shared pool used by the email service
+smtp_pool = SMTPConnectionPool(
+    hostname=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD,
+    start_tls=settings.SMTP_START_TLS,
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_POOL_MAX_MESSAGES,
+    idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT,
+    timeout=settings.SMTP_TIMEOUT,
+)
@@ -0,0 +1,230 @@
+# app/services/summarizer.py
+#
+# Extractive article summaries with TextRank, no external model:
+#
+#   1. the body is converted to text and split into sentences
+#   2. sentences become TF-IDF vectors (IDF over every sentence in the batch)
+#   3. cosine similarities form each article's sentence graph
+#   4. power iteration ranks the sentences; the best few, in reading order,
+#      are the summary
+#
+# summarize_batch runs steps 3-4 for many articles at once: articles are
+# grouped by sentence count, their similarity matrices stacked into one
+# (articles, n, n) array, and the power iteration is a batched matmul.
+
+import re
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.article import Article
+from app.services.derived_cache import derived_fields
+from app.services.html_to_text import html_to_text
+
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'-]*")
+ABBREVIATIONS = frozenset({
+    "mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.",
+    "e.g.", "i.e.", "inc.", "ltd.", "co.", "corp.", "no.", "fig.", "approx.",
+    "jan.", "feb.", "mar.", "apr.", "jun.", "jul.", "aug.", "sep.", "sept.",
+    "oct.", "nov.", "dec.", "u.s.", "u.k.",
+})
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor
+not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours yourself yourselves
+also may might must shall us new one two said says
+""".split())
+
+SUMMARY_SENTENCES = 3
+MAX_SENTENCES = 60  # only the opening of very long articles is ranked
+MIN_WORDS = 5  # shorter sentences (captions, bylines) are never picked
+MAX_SUMMARY_CHARS = 600
+DAMPING = 0.85
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+GROUP_SIZE = 256  # articles per batched power iteration
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of plain text; line breaks always end one"""
+    sentences: List[str] = []
+    for block in text.split("\n"):
+        block = " ".join(block.split())
+        if not block:
+            continue
+        pending = ""
+        for piece in SENTENCE_BOUNDARY.split(block):
+            pending = f"{pending} {piece}" if pending else piece
+            last_word = pending.rsplit(" ", 1)[-1].lower()
+            if last_word in ABBREVIATIONS or re.fullmatch(r"[a-z]\.", last_word):
+                continue
+            sentences.append(pending)
+            pending = ""
+        if pending:
+            sentences.append(pending)
+    return sentences
+
+
+def _terms(sentence: str) -> List[str]:
+    return [word for word in WORD_PATTERN.findall(sentence.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+class _Document:
+    __slots__ = ("sentences", "terms", "eligible")
+
+    def __init__(self, text: str):
+        sentences = split_sentences(html_to_text(text or "", footnotes=False))
+        # Heading underlines and rules from the text conversion are not sentences
+        self.sentences = [sentence for sentence in sentences if any(char.isalnum() for char in sentence)][:MAX_SENTENCES]
+        self.terms = [_terms(sentence) for sentence in self.sentences]
+        self.eligible = np.array([len(sentence.split()) >= MIN_WORDS for sentence in self.sentences], dtype=bool)
+
+
+def _similarity(document: _Document, vocabulary: Dict[str, int], idf: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a document's TF-IDF sentence vectors, diagonal zeroed"""
+    local: Dict[int, int] = {}
+    rows, cols = [], []
+    for row, terms in enumerate(document.terms):
+        for term in terms:
+            rows.append(row)
+            cols.append(local.setdefault(vocabulary[term], len(local)))
+
+    n = len(document.sentences)
+    vectors = np.zeros((n, max(len(local), 1)))
+    if rows:
+        np.add.at(vectors, (np.array(rows), np.array(cols)), 1.0)
+        vectors *= idf[np.fromiter(local.keys(), dtype=np.int64, count=len(local))]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1.0, norms)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    return similarity
+
+
+def _rank_group(matrices: List[np.ndarray]) -> List[np.ndarray]:
+    """TextRank scores for a group of sentence graphs in one batched power iteration"""
+    size = max(matrix.shape[0] for matrix in matrices)
+    graphs = np.zeros((len(matrices), size, size))
+    mask = np.zeros((len(matrices), size))
+    for index, matrix in enumerate(matrices):
+        n = matrix.shape[0]
+        graphs[index, :n, :n] = matrix
+        mask[index, :n] = 1.0
+    counts = mask.sum(axis=1, keepdims=True)
+
+    # Row-stochastic transitions; a sentence sharing no terms jumps uniformly
+    out_weight = graphs.sum(axis=2, keepdims=True)
+    uniform = mask[:, None, :] / counts[:, :, None]
+    transitions = np.where(out_weight > 0, graphs / np.where(out_weight == 0, 1.0, out_weight), uniform)
+
+    scores = mask / counts
+    teleport = (1 - DAMPING) * mask / counts
+    for _ in range(MAX_ITERATIONS):
+        updated = teleport + DAMPING * np.einsum("bij,bi->bj", transitions, scores) * mask
+        converged = np.abs(updated - scores).max() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return [scores[index, :matrix.shape[0]] for index, matrix in enumerate(matrices)]
+
+
+def _pick(document: _Document, scores: Optional[np.ndarray], count: int) -> str:
+    """The `count` best eligible sentences in their original order, within MAX_SUMMARY_CHARS"""
+    if scores is None:
+        chosen = list(range(len(document.sentences)))
+    else:
+        order = np.argsort(-np.where(document.eligible, scores, -1.0), kind="stable")
+        chosen = sorted(int(i) for i in order[:count] if document.eligible[i])
+
+    summary = ""
+    for index in chosen:
+        candidate = f"{summary} {document.sentences[index]}".strip()
+        if len(candidate) > MAX_SUMMARY_CHARS and summary:
+            break
+        summary = candidate
+    if len(summary) > MAX_SUMMARY_CHARS:
+        summary = summary[:MAX_SUMMARY_CHARS].rsplit(" ", 1)[0] + "..."
+    return summary
+
+
+def summarize_batch(texts: Sequence[str], sentences: int = SUMMARY_SENTENCES) -> List[str]:
+    """Summaries for many articles (HTML or text), ranked in batched NumPy passes"""
+    documents = [_Document(text) for text in texts]
+
+    # IDF over every sentence in the batch
+    vocabulary: Dict[str, int] = {}
+    document_frequency: List[int] = []
+    total_sentences = 0
+    for document in documents:
+        total_sentences += len(document.terms)
+        for terms in document.terms:
+            for term in set(terms):
+                index = vocabulary.setdefault(term, len(vocabulary))
+                if index == len(document_frequency):
+                    document_frequency.append(0)
+                document_frequency[index] += 1
+    idf = np.log((1 + total_sentences) / (1 + np.array(document_frequency, dtype=float))) + 1.0
+
+    # Only articles with more sentences than the summary needs are ranked;
+    # grouping by size keeps the padding of the stacked matrices small
+    ranked = sorted(
+        (index for index, document in enumerate(documents) if document.eligible.sum() > sentences),
+        key=lambda index: len(documents[index].sentences)
+    )
+    scores: Dict[int, np.ndarray] = {}
+    for start in range(0, len(ranked), GROUP_SIZE):
+        group = ranked[start:start + GROUP_SIZE]
+        matrices = [_similarity(documents[index], vocabulary, idf) for index in group]
+        for index, result in zip(group, _rank_group(matrices)):
+            scores[index] = result
+
+    return [_pick(document, scores.get(index), sentences) for index, document in enumerate(documents)]
+
+
+def summarize(text: str, sentences: int = SUMMARY_SENTENCES) -> str:
+    """Extractive summary of one article"""
+    return summarize_batch([text], sentences)[0]
+
+
+async def backfill_summaries(
+    db: AsyncSession,
+    batch_size: int = 500,
+    limit: Optional[int] = None,
+    overwrite: bool = False
+) -> int:
+    """
+    Summarize articles without a summary (every article with `overwrite`),
+    `batch_size` at a time in id order, committing after each batch.
+    Returns how many were summarized.
+    """
+    done = 0
+    last_id = 0
+    while limit is None or done < limit:
+        size = batch_size if limit is None else min(batch_size, limit - done)
+        query = select(Article.id, Article.body).where(Article.id > last_id)
+        if not overwrite:
+            query = query.where(Article.summary.is_(None))
+        result = await db.execute(query.order_by(Article.id).limit(size))
+        rows = result.all()
+        if not rows:
+            break
+
+        # Bodies summarized before (or shared with another article) come from the cache
+        summaries = await derived_fields.get_many(db, [row.body for row in rows], "summary")
+        await db.execute(
+            update(Article),
+            [{"id": row.id, "summary": summary or None} for row, summary in zip(rows, summaries)]
+        )
+        await db.commit()
+
+        done += len(rows)
+        last_id = rows[-1].id
+    return done
@@ -0,0 +1,237 @@
+# app/services/template_engine.py
+#
+# A small mustache-style template language for newsletter layouts and bodies:
+#
+#     {{ subscriber.full_name }}      HTML-escaped variable
+#     {{{ content }}}                 raw variable (the newsletter body in a layout)
+#     {{#name}} ... {{/name}}         section, rendered when `name` is truthy
+#     {{^name}} ... {{/name}}         inverted section, rendered when it is falsy
+#
+# Sources are parsed once into a flat list of nodes and cached by version, so
+# rendering for a recipient is a walk over pre-split text plus one join.
+
+import re
+from collections import OrderedDict
+from html import escape
+from typing import Any, Callable, FrozenSet, Hashable, List, Mapping, Optional, Tuple, Union
+
+
+TAG_PATTERN = re.compile(r"\{\{\{\s*(?P<raw>[^{}]+?)\s*\}\}\}|\{\{\s*(?P<sigil>[#^/]?)\s*(?P<name>[^{}]+?)\s*\}\}")
+
+
+class TemplateError(ValueError):
+    """Raised for templates that cannot be compiled (unbalanced sections)"""
+
+
+class Variable:
+    __slots__ = ("name", "raw")
+
+    def __init__(self, name: str, raw: bool):
+        self.name = name
+        self.raw = raw
+
+
+class Section:
+    __slots__ = ("name", "inverted", "nodes")
+
+    def __init__(self, name: str, inverted: bool, nodes: List["Node"]):
+        self.name = name
+        self.inverted = inverted
+        self.nodes = nodes
+
+
+Node = Union[str, Variable, Section]
+
+
+def _parse(source: str, autoescape: bool = True) -> List[Node]:
+    root: List[Node] = []
+    stack: List[Tuple[str, bool, List[Node]]] = []
+    nodes = root
+    position = 0
+
+    for match in TAG_PATTERN.finditer(source):
+        if match.start() > position:
+            nodes.append(source[position:match.start()])
+        position = match.end()
+
+        if match.group("raw"):
+            nodes.append(Variable(match.group("raw"), raw=True))
+            continue
+
+        sigil, name = match.group("sigil"), match.group("name")
+        if sigil in ("#", "^"):
+            stack.append((name, sigil == "^", nodes))
+            nodes = []
+        elif sigil == "/":
+            if not stack or stack[-1][0] != name:
+                raise TemplateError(f"Unexpected closing tag {{{{/{name}}}}}")
+            opened, inverted, parent = stack.pop()
+            parent.append(Section(opened, inverted, nodes))
+            nodes = parent
+        else:
+            nodes.append(Variable(name, raw=not autoescape))
+
+    if stack:
+        raise TemplateError(f"Unclosed section {{{{#{stack[-1][0]}}}}}")
+    if position < len(source):
+        nodes.append(source[position:])
+    return _merge_text(root)
+
+
+def _merge_text(nodes: List[Node]) -> List[Node]:
+    """Join adjacent text nodes so rendering appends as few pieces as possible"""
+    merged: List[Node] = []
+    for node in nodes:
+        if isinstance(node, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += node
+        elif not (isinstance(node, str) and not node):
+            merged.append(node)
+    return merged
+
+
+def _collect(nodes: List[Node], names: set):
+    for node in nodes:
+        if isinstance(node, Variable):
+            names.add(node.name)
+        elif isinstance(node, Section):
+            names.add(node.name)
+            _collect(node.nodes, names)
+
+
+def _source(nodes: List[Node], out: List[str]):
+    for node in nodes:
+        if type(node) is str:
+            out.append(node)
+        elif type(node) is Variable:
+            out.append(f"{{{{{{{node.name}}}}}}}" if node.raw else f"{{{{{node.name}}}}}")
+        else:
+            out.append(f"{{{{{'^' if node.inverted else '#'}{node.name}}}}}")
+            _source(node.nodes, out)
+            out.append(f"{{{{/{node.name}}}}}")
+
+
+def _text(value: Any, raw: bool) -> str:
+    if value is None:
+        return ""
+    value = value if isinstance(value, str) else str(value)
+    return value if raw else escape(value)
+
+
+class CompiledTemplate:
+    """A parsed template: text chunks interleaved with variable slots and sections"""
+
+    def __init__(self, nodes: List[Node]):
+        self.nodes = nodes
+        names: set = set()
+        _collect(nodes, names)
+        self.variables: FrozenSet[str] = frozenset(names)
+
+    @property
+    def is_static(self) -> bool:
+        """True when rendering does not depend on any variable"""
+        return not self.variables
+
+    def source(self) -> str:
+        """
+        Serialize back to template syntax; after `bind` only the open slots
+        remain. Text is written verbatim, so a bound value containing "{{"
+        would parse as a tag again: serialize before binding user values.
+        """
+        out: List[str] = []
+        _source(self.nodes, out)
+        return "".join(out)
+
+    def render(self, context: Mapping[str, Any] = None) -> str:
+        """Fill the slots from `context`; missing names render empty"""
+        if self.is_static:
+            return "".join(self.nodes)
+        out: List[str] = []
+        self._render(self.nodes, context or {}, out)
+        return "".join(out)
+
+    def _render(self, nodes: List[Node], context: Mapping[str, Any], out: List[str]):
+        append = out.append
+        for node in nodes:
+            if type(node) is str:
+                append(node)
+            elif type(node) is Variable:
+                append(_text(context.get(node.name), node.raw))
+            elif bool(context.get(node.name)) != node.inverted:
+                self._render(node.nodes, context, out)
+
+    def bind(
+        self,
+        values: Mapping[str, Any],
+        keep: Optional[Callable[[str], bool]] = None
+    ) -> "CompiledTemplate":
+        """
+        Partially evaluate: substitute the names in `values` (a
+        CompiledTemplate value is spliced in as nodes and bound the same way,
+        so its own recipient slots stay open) and return a new template with
+        only the remaining slots.
+        Names neither bound nor accepted by `keep` render empty.
+        """
+        return CompiledTemplate(_merge_text(self._bind(self.nodes, values, keep)))
+
+    def _bind(self, nodes: List[Node], values: Mapping[str, Any], keep) -> List[Node]:
+        bound: List[Node] = []
+        for node in nodes:
+            if type(node) is str:
+                bound.append(node)
+            elif type(node) is Variable:
+                if node.name in values:
+                    value = values[node.name]
+                    if isinstance(value, CompiledTemplate):
+                        # Bind the spliced template too, minus itself (no recursion)
+                        inner = {name: v for name, v in values.items() if name != node.name}
+                        bound.extend(self._bind(value.nodes, inner, keep))
+                    else:
+                        bound.append(_text(value, node.raw))
+                elif keep is None or keep(node.name):
+                    bound.append(node)
+            elif node.name in values or (keep is not None and not keep(node.name)):
+                if bool(values.get(node.name)) != node.inverted:
+                    bound.extend(self._bind(node.nodes, values, keep))
+            else:
+                bound.append(Section(node.name, node.inverted, self._bind(node.nodes, values, keep)))
+        return bound
+
+
+def compile_template(source: str, autoescape: bool = True) -> CompiledTemplate:
+    """Parse a template source; plain-text templates pass autoescape=False"""
+    return CompiledTemplate(_parse(source or "", autoescape))
+
+
+class TemplateCache:
+    """LRU of compiled templates, keyed by whatever identifies a version"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CompiledTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CompiledTemplate]:
+        compiled = self._entries.get(key)
+        if compiled is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return compiled
+
+    def put(self, key: Hashable, compiled: CompiledTemplate):
+        self._entries[key] = compiled
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_compile(self, key: Hashable, source: str) -> CompiledTemplate:
+        compiled = self.get(key)
+        if compiled is None:
+            self.misses += 1
+            compiled = compile_template(source)
+            self.put(key, compiled)
+        return compiled
+
+
+# Shared cache for templates, newsletter bodies and their merged layouts
+compiled_templates = TemplateCache()
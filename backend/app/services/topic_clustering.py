@@ -0,0 +1,396 @@
+# app/services/topic_clustering.py
+#
+# Topics for analytics, found by clustering published articles:
+#
+#   1. vectors   title + body as sublinear TF-IDF over the TOPIC_MAX_TERMS
+#                most frequent terms, L2-normalised and held as a CSR sparse
+#                matrix in plain NumPy arrays
+#   2. k-means   spherical mini-batch k-means with k-means++ seeding; each
+#                step assigns a random batch of rows and moves the centroids
+#                toward it, so a run reads every article only a few times
+#   3. labels    a cluster is named by the heaviest terms of its centroid
+#
+# Results are stored (topic_models, topic_clusters, article_topics), so the
+# analytics endpoints read a dozen precomputed rows. When only new or edited
+# articles arrived, recluster() assigns just those to the nearest centroid
+# and nudges the centroids, and refits from scratch only once more than
+# TOPIC_REBUILD_RATIO of the articles arrived that way.
+
+import asyncio
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import delete, exists, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.article import Article
+from app.models.topic import ArticleTopic, TopicCluster, TopicModel
+from app.services.html_to_text import html_to_text
+from app.services.summarizer import STOPWORDS, WORD_PATTERN
+
+
+MIN_DOCUMENT_FREQUENCY = 2  # rarer terms are noise (applied from MIN_DF_ARTICLES articles)
+MIN_DF_ARTICLES = 100
+MAX_DOCUMENT_RATIO = 0.5  # terms in more articles than this say nothing about a topic
+BATCH_SIZE = 1024  # rows per mini-batch step
+ITERATIONS = 100
+TOLERANCE = 1e-4  # stop once no centroid value moves more than this in a step
+CHUNK_ROWS = 2048  # rows per dense (rows, clusters) product
+LOAD_BATCH = 1000
+LABEL_TERMS = 2
+STORED_TERMS = 10
+SEED = 42
+
+_lock = asyncio.Lock()
+
+
+class SparseRows(NamedTuple):
+    """CSR matrix: row i holds data[indptr[i]:indptr[i + 1]] at columns indices[...]"""
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def take(self, rows: np.ndarray) -> "SparseRows":
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        positions = np.arange(indptr[-1]) + np.repeat(starts - indptr[:-1], lengths)
+        return SparseRows(indptr, self.indices[positions], self.data[positions])
+
+
+# Vectors
+
+def tokenize(text: str) -> List[str]:
+    return [
+        word for word in WORD_PATTERN.findall(text.lower())
+        if len(word) > 2 and word not in STOPWORDS and not word[0].isdigit()
+    ]
+
+
+def count_terms(texts: Sequence[str], vocabulary: Dict[str, int], grow: bool) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """(term ids, counts) per text; unknown terms join `vocabulary` when `grow`, else are skipped"""
+    documents = []
+    for text in texts:
+        if grow:
+            ids = [vocabulary.setdefault(term, len(vocabulary)) for term in tokenize(text)]
+        else:
+            ids = [vocabulary[term] for term in tokenize(text) if term in vocabulary]
+        unique, counts = np.unique(np.array(ids, dtype=np.int64), return_counts=True)
+        documents.append((unique, counts.astype(np.float32)))
+    return documents
+
+
+def fit_vocabulary(
+    documents: Sequence[Tuple[np.ndarray, np.ndarray]],
+    size: int,
+    max_terms: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Kept term ids, a remap from old to new ids (-1 = dropped) and their IDF"""
+    n = len(documents)
+    frequency = np.bincount(
+        np.concatenate([ids for ids, _ in documents]) if documents else np.empty(0, dtype=np.int64),
+        minlength=size
+    )
+    min_frequency = MIN_DOCUMENT_FREQUENCY if n >= MIN_DF_ARTICLES else 1
+    eligible = np.flatnonzero((frequency >= min_frequency) & (frequency <= max(MAX_DOCUMENT_RATIO * n, 1)))
+    kept = np.sort(eligible[np.argsort(-frequency[eligible], kind="stable")[:max_terms]])
+
+    remap = np.full(size, -1, dtype=np.int64)
+    remap[kept] = np.arange(len(kept))
+    idf = (np.log((1 + n) / (1 + frequency[kept])) + 1.0).astype(np.float32)
+    return kept, remap, idf
+
+
+def build_matrix(
+    documents: Sequence[Tuple[np.ndarray, np.ndarray]],
+    idf: np.ndarray,
+    remap: Optional[np.ndarray] = None
+) -> Tuple[SparseRows, List[int]]:
+    """TF-IDF rows for the documents with at least one vocabulary term, and their positions"""
+    row_terms, row_counts, positions = [], [], []
+    for position, (ids, counts) in enumerate(documents):
+        if remap is not None:
+            ids = remap[ids]
+            present = ids >= 0
+            ids, counts = ids[present], counts[present]
+        if ids.size:
+            row_terms.append(ids)
+            row_counts.append(counts)
+            positions.append(position)
+    if not positions:
+        empty = np.empty(0, dtype=np.int64)
+        return SparseRows(np.zeros(1, dtype=np.int64), empty, empty.astype(np.float32)), []
+
+    lengths = np.array([len(ids) for ids in row_terms])
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.concatenate(row_terms)
+    data = (1.0 + np.log(np.concatenate(row_counts))) * idf[indices]
+    norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1]))
+    data = (data / np.repeat(norms, lengths)).astype(np.float32)
+    return SparseRows(indptr, indices, data), positions
+
+
+# Clustering
+
+def _row_dots(matrix: SparseRows, vector: np.ndarray) -> np.ndarray:
+    return np.add.reduceat(vector[matrix.indices] * matrix.data, matrix.indptr[:-1])
+
+
+def similarities(matrix: SparseRows, centroids: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every row to every centroid, (rows, clusters)"""
+    transposed = np.ascontiguousarray(centroids.T)
+    result = np.empty((matrix.n_rows, centroids.shape[0]), dtype=np.float32)
+    for start in range(0, matrix.n_rows, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, matrix.n_rows)
+        low, high = matrix.indptr[start], matrix.indptr[stop]
+        products = transposed[matrix.indices[low:high]] * matrix.data[low:high, None]
+        result[start:stop] = np.add.reduceat(products, matrix.indptr[start:stop] - low, axis=0)
+    return result
+
+
+def _seed_centroids(matrix: SparseRows, k: int, terms: int, random: np.random.RandomState) -> np.ndarray:
+    """k-means++: each seed is drawn in proportion to its distance from the nearest one so far"""
+    centroids = np.zeros((k, terms), dtype=np.float32)
+    closest = np.full(matrix.n_rows, -1.0, dtype=np.float32)
+    row = random.randint(matrix.n_rows)
+    for cluster in range(k):
+        low, high = matrix.indptr[row], matrix.indptr[row + 1]
+        centroids[cluster, matrix.indices[low:high]] = matrix.data[low:high]
+        closest = np.maximum(closest, _row_dots(matrix, centroids[cluster]))
+        # 1 - cosine is half the squared distance between unit vectors
+        distance = np.maximum(1.0 - closest, 0.0).astype(np.float64)
+        total = distance.sum()
+        row = random.choice(matrix.n_rows, p=distance / total) if total > 0 else random.randint(matrix.n_rows)
+    return centroids
+
+
+def update_centroids(centroids: np.ndarray, seen: np.ndarray, batch: SparseRows, labels: np.ndarray) -> float:
+    """
+    One mini-batch step: each centroid moves toward the mean of its new
+    members at a rate of (members in batch / members ever seen), then is
+    re-normalised. Returns the largest change of any centroid value.
+    """
+    k, terms = centroids.shape
+    owners = np.repeat(labels, np.diff(batch.indptr))
+    sums = np.bincount(owners * terms + batch.indices, weights=batch.data, minlength=k * terms).reshape(k, terms)
+    members = np.bincount(labels, minlength=k).astype(np.float64)
+    seen += members
+
+    moved = np.flatnonzero(members)
+    if not moved.size:
+        return 0.0
+    previous = centroids[moved].copy()
+    rate = (members[moved] / seen[moved])[:, None]
+    updated = previous * (1.0 - rate) + sums[moved] / seen[moved][:, None]
+    norms = np.linalg.norm(updated, axis=1, keepdims=True)
+    centroids[moved] = updated / np.where(norms == 0, 1.0, norms)
+    return float(np.abs(centroids[moved] - previous).max())
+
+
+def minibatch_kmeans(matrix: SparseRows, k: int, terms: int, seed: int = SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical mini-batch k-means; returns the centroids and every row's cluster"""
+    random = np.random.RandomState(seed)
+    k = min(k, matrix.n_rows)
+    centroids = _seed_centroids(matrix, k, terms, random)
+    seen = np.zeros(k)
+    size = min(BATCH_SIZE, matrix.n_rows)
+    for _ in range(ITERATIONS):
+        batch = matrix.take(random.choice(matrix.n_rows, size=size, replace=False))
+        labels = similarities(batch, centroids).argmax(axis=1)
+        if update_centroids(centroids, seen, batch, labels) < TOLERANCE:
+            break
+    return centroids, similarities(matrix, centroids).argmax(axis=1)
+
+
+def top_terms(centroid: np.ndarray, vocabulary: Sequence[str], count: int = STORED_TERMS) -> List[str]:
+    heaviest = np.argsort(-centroid, kind="stable")[:count]
+    return [vocabulary[index] for index in heaviest if centroid[index] > 0]
+
+
+def label_for(terms: Sequence[str]) -> str:
+    return " / ".join(term.title() for term in terms[:LABEL_TERMS]) or "Miscellaneous"
+
+
+# Runs
+
+def _article_text(title: str, body: str) -> str:
+    return f"{title or ''}\n{html_to_text(body or '', footnotes=False)}"
+
+
+async def _read_articles(db: AsyncSession, query, vocabulary: Dict[str, int], grow: bool):
+    """(article ids, term counts) for every row of `query`, read in id-ordered batches"""
+    article_ids: List[int] = []
+    documents: List[Tuple[np.ndarray, np.ndarray]] = []
+    last_id = 0
+    while True:
+        result = await db.execute(query.where(Article.id > last_id).order_by(Article.id).limit(LOAD_BATCH))
+        rows = result.all()
+        if not rows:
+            return article_ids, documents
+        texts = [_article_text(row.title, row.body) for row in rows]
+        documents.extend(await asyncio.to_thread(count_terms, texts, vocabulary, grow))
+        article_ids.extend(row.id for row in rows)
+        last_id = rows[-1].id
+
+
+def _assignment_rows(article_ids: Sequence[int], positions: Sequence[int], labels, cluster_ids: Sequence[int]):
+    assigned = dict(zip(positions, labels.tolist()))
+    return [
+        {"article_id": article_id, "cluster_id": cluster_ids[assigned[position]] if position in assigned else None}
+        for position, article_id in enumerate(article_ids)
+    ]
+
+
+async def _full_run(db: AsyncSession) -> int:
+    vocabulary: Dict[str, int] = {}
+    article_ids, documents = await _read_articles(
+        db, select(Article.id, Article.title, Article.body).where(Article.is_published == True), vocabulary, True
+    )
+
+    def fit():
+        kept, remap, idf = fit_vocabulary(documents, len(vocabulary), settings.TOPIC_MAX_TERMS)
+        matrix, positions = build_matrix(documents, idf, remap)
+        if not positions:
+            return kept, idf, None, positions, None
+        centroids, labels = minibatch_kmeans(matrix, settings.TOPIC_CLUSTERS, len(kept))
+        return kept, idf, centroids, positions, labels
+
+    kept, idf, centroids, positions, labels = await asyncio.to_thread(fit)
+
+    await db.execute(delete(ArticleTopic))
+    await db.execute(delete(TopicCluster))
+    await db.execute(delete(TopicModel))
+    if centroids is None:
+        return 0
+
+    terms = [None] * len(vocabulary)
+    for term, index in vocabulary.items():
+        terms[index] = term
+    model_terms = [terms[index] for index in kept.tolist()]
+    model = TopicModel(
+        vocabulary=model_terms,
+        idf=idf.tobytes(),
+        fitted_articles=len(article_ids),
+        added_articles=0
+    )
+    db.add(model)
+    await db.flush()
+
+    clusters = []
+    for centroid in centroids:
+        cluster_terms = top_terms(centroid, model_terms)
+        clusters.append(TopicCluster(
+            model_id=model.id,
+            label=label_for(cluster_terms),
+            terms=cluster_terms,
+            centroid=centroid.astype(np.float32).tobytes()
+        ))
+    db.add_all(clusters)
+    await db.flush()
+
+    rows = _assignment_rows(article_ids, positions, labels, [cluster.id for cluster in clusters])
+    if rows:
+        await db.execute(insert(ArticleTopic), rows)
+    return len(article_ids)
+
+
+async def _incremental_run(db: AsyncSession, model: TopicModel, changed) -> int:
+    result = await db.execute(
+        select(TopicCluster).where(TopicCluster.model_id == model.id).order_by(TopicCluster.id)
+    )
+    clusters = result.scalars().all()
+    vocabulary = {term: index for index, term in enumerate(model.vocabulary)}
+    idf = np.frombuffer(model.idf, dtype=np.float32)
+
+    article_ids, documents = await _read_articles(db, changed, vocabulary, False)
+    if not article_ids:
+        return 0
+
+    def assign():
+        centroids = np.stack([np.frombuffer(cluster.centroid, dtype=np.float32) for cluster in clusters])
+        seen = np.array([cluster.size or 0 for cluster in clusters], dtype=np.float64)
+        matrix, positions = build_matrix(documents, idf)
+        labels = np.empty(0, dtype=np.int64)
+        if positions:
+            labels = similarities(matrix, centroids).argmax(axis=1)
+            for start in range(0, matrix.n_rows, BATCH_SIZE):
+                rows = np.arange(start, min(start + BATCH_SIZE, matrix.n_rows))
+                update_centroids(centroids, seen, matrix.take(rows), labels[rows])
+        return centroids, positions, labels
+
+    centroids, positions, labels = await asyncio.to_thread(assign)
+
+    for start in range(0, len(article_ids), LOAD_BATCH):
+        await db.execute(delete(ArticleTopic).where(ArticleTopic.article_id.in_(article_ids[start:start + LOAD_BATCH])))
+    rows = _assignment_rows(article_ids, positions, labels, [cluster.id for cluster in clusters])
+    await db.execute(insert(ArticleTopic), rows)
+
+    for cluster, centroid in zip(clusters, centroids):
+        cluster_terms = top_terms(centroid, model.vocabulary)
+        cluster.centroid = centroid.astype(np.float32).tobytes()
+        cluster.terms = cluster_terms
+        cluster.label = label_for(cluster_terms)
+    model.added_articles = (model.added_articles or 0) + len(article_ids)
+    return len(article_ids)
+
+
+async def _refresh_sizes(db: AsyncSession):
+    """Drop assignments of deleted or unpublished articles and recount every cluster"""
+    await db.execute(
+        delete(ArticleTopic).where(
+            ~exists().where(Article.id == ArticleTopic.article_id, Article.is_published == True)
+        )
+    )
+    result = await db.execute(
+        select(ArticleTopic.cluster_id, func.count())
+        .where(ArticleTopic.cluster_id.is_not(None))
+        .group_by(ArticleTopic.cluster_id)
+    )
+    counts = dict(result.all())
+    result = await db.execute(select(TopicCluster.id))
+    for cluster_id in result.scalars().all():
+        await db.execute(
+            update(TopicCluster).where(TopicCluster.id == cluster_id).values(size=counts.get(cluster_id, 0))
+        )
+
+
+async def recluster(db: AsyncSession, full: bool = False) -> Dict[str, Any]:
+    """
+    Bring the stored topics up to date and commit. Articles published or
+    edited since their assignment are placed incrementally unless `full`,
+    no model exists yet, or too many have arrived since the last fit.
+    """
+    async with _lock:
+        started = time.perf_counter()
+        result = await db.execute(select(TopicModel).order_by(TopicModel.id.desc()).limit(1))
+        model = result.scalar_one_or_none()
+
+        changed = (
+            select(Article.id, Article.title, Article.body)
+            .outerjoin(ArticleTopic, ArticleTopic.article_id == Article.id)
+            .where(
+                Article.is_published == True,
+                or_(ArticleTopic.article_id.is_(None), Article.content_updated_at > ArticleTopic.assigned_at)
+            )
+        )
+        if not full and model is not None:
+            result = await db.execute(select(func.count()).select_from(changed.subquery()))
+            pending = result.scalar() or 0
+            full = (model.added_articles or 0) + pending > settings.TOPIC_REBUILD_RATIO * max(model.fitted_articles or 0, 1)
+
+        if full or model is None:
+            mode = "full"
+            articles = await _full_run(db)
+        else:
+            mode = "incremental"
+            articles = await _incremental_run(db, model, changed)
+        await _refresh_sizes(db)
+        await db.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"🗂️ Topic clustering ({mode}): {articles} articles in {elapsed:.1f}s")
+        return {"mode": mode, "articles": articles, "seconds": round(elapsed, 2)}
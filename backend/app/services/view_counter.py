@@ -0,0 +1,71 @@
+# app/services/view_counter.py
+#
+# Article view counts (the engagement signal in newsletter generation).
+# Reads are counted in memory and written in one transaction every
+# VIEW_COUNT_FLUSH_INTERVAL seconds, so reading an article never becomes a
+# write on its row. Views still buffered when a process dies are lost,
+# which an engagement weight can afford.
+
+import asyncio
+from collections import Counter
+from typing import Optional
+from sqlalchemy import update
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.article import Article
+
+
+class ViewCounter:
+    """Buffered `view_count` increments, flushed by a background task"""
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, article_id: int):
+        """Count one view of a published article"""
+        self._pending[article_id] += 1
+
+    async def flush(self) -> int:
+        """Write the buffered views; returns how many were written"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, Counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                # Sorted, so concurrent flushes from several processes lock rows in the same order
+                for article_id in sorted(pending):
+                    await db.execute(
+                        update(Article)
+                        .where(Article.id == article_id, Article.is_published == True)
+                        .values(view_count=Article.view_count + pending[article_id])
+                    )
+                await db.commit()
+        except Exception as e:
+            # Keep them for the next flush
+            self._pending.update(pending)
+            print(f"⚠️ Could not record article views: {e}")
+            return 0
+        return sum(pending.values())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        """Stop the background task and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+
+# Shared counter, flushed by the API lifespan
+view_counter = ViewCounter(settings.VIEW_COUNT_FLUSH_INTERVAL)
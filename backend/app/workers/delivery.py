@@ -0,0 +1,158 @@
+# app/workers/delivery.py
+#
+# Standalone newsletter delivery workers, run outside the API process:
+#
+#     python -m app.workers.delivery --processes 4
+#
+# Each process owns one shard of the delivery outbox (subscriber_id % N) and
+# drains it with its own event loop, database engine and SMTP pool. SIGTERM
+# (or Ctrl+C) lets every worker finish and record the page it is sending,
+# then exit with a throughput report.
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from typing import Optional
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.services.delivery_service import Shard, newsletters_with_due_jobs
+from app.services.newsletter_service import drain_newsletter
+from app.services.rate_limiter import DeliveryRateLimiter
+from app.services.scheduler_service import queue_due_schedules, complete_drained_schedules
+from app.services.smtp_pool import smtp_pool
+
+
+class WorkerStats:
+    """Per-worker totals for the throughput report"""
+
+    def __init__(self, shard: Shard):
+        self.shard = shard
+        self.sent = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    def add(self, progress):
+        self.sent += progress.sent
+        self.failed += progress.failed
+
+    def report(self):
+        elapsed = time.monotonic() - self.started_at
+        rate = self.sent / elapsed if elapsed > 0 else 0.0
+        print(
+            f"🧵 Worker {self.shard.index + 1}/{self.shard.count} (pid {os.getpid()}): "
+            f"{self.sent} sent, {self.failed} failed in {elapsed:.0f}s ({rate:.1f} msg/s)"
+        )
+
+
+def shard_rate_limiter(shard_count: int) -> DeliveryRateLimiter:
+    """Split the configured rate limits evenly across worker processes"""
+    return DeliveryRateLimiter(
+        global_rate=settings.DELIVERY_GLOBAL_RATE / shard_count,
+        domain_rate=settings.DELIVERY_DOMAIN_RATE / shard_count,
+        domain_rates={
+            domain: rate / shard_count
+            for domain, rate in settings.DELIVERY_DOMAIN_RATES.items()
+        }
+    )
+
+
+async def run_worker(shard: Shard, poll_interval: float, once: bool = False):
+    """Drain this shard of the outbox until asked to stop"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    limiter = shard_rate_limiter(shard.count)
+    stats = WorkerStats(shard)
+    print(f"🚚 Delivery worker {shard.index + 1}/{shard.count} started (pid {os.getpid()})")
+
+    try:
+        while not stop.is_set():
+            async with AsyncSessionLocal() as db:
+                # A single worker turns due schedules into outbox jobs
+                if shard.index == 0:
+                    await queue_due_schedules(db)
+
+                newsletter_ids = await newsletters_with_due_jobs(db, shard)
+                for newsletter_id in newsletter_ids:
+                    if stop.is_set():
+                        break
+                    progress = await drain_newsletter(
+                        newsletter_id, db, shard=shard, stop=stop, limiter=limiter
+                    )
+                    if progress is not None:
+                        stats.add(progress)
+
+                if shard.index == 0:
+                    await complete_drained_schedules(db)
+
+            if once:
+                break
+            if not newsletter_ids:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        await smtp_pool.close()
+        stats.report()
+
+
+def _run_process(index: int, count: int, poll_interval: float, once: bool):
+    asyncio.run(run_worker(Shard(index, count), poll_interval, once))
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Run newsletter delivery workers")
+    parser.add_argument(
+        "--processes", type=int,
+        default=settings.DELIVERY_WORKER_PROCESSES or os.cpu_count() or 1,
+        help="number of worker processes (one outbox shard each)"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float,
+        default=settings.DELIVERY_WORKER_POLL_INTERVAL,
+        help="seconds to sleep when there is nothing to send"
+    )
+    parser.add_argument(
+        "--once", action="store_true",
+        help="drain what is due right now and exit"
+    )
+    args = parser.parse_args(argv)
+    count = max(args.processes, 1)
+
+    if count == 1:
+        _run_process(0, 1, args.poll_interval, args.once)
+        return
+
+    # Spawn, not fork: every worker needs its own engine, pool and event loop
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_run_process,
+            args=(index, count, args.poll_interval, args.once),
+            name=f"delivery-worker-{index}"
+        )
+        for index in range(count)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
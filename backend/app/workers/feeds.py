@@ -0,0 +1,60 @@
+# app/workers/feeds.py
+#
+# Poll RSS/Atom feeds and store their new items:
+#
+#     python -m app.workers.feeds [--url https://example.com/rss ...]
+#     python -m app.workers.feeds --loop [--interval 900]
+#
+# Without --url the FEED_SOURCES setting is used. Feeds unchanged since the
+# last poll (ETag / Last-Modified) answer 304 and cost nothing further.
+# --loop keeps polling every FEED_POLL_INTERVAL seconds until SIGTERM (or
+# Ctrl+C). Run a single looping worker: polls from separate processes are
+# not coordinated and could store the same article twice.
+
+import argparse
+import asyncio
+import signal
+from typing import List, Optional
+from app.core.config import settings
+from app.database import engine
+from app.services.feed_ingestion import feed_ingestor
+
+
+async def run(urls: Optional[List[str]], interval: Optional[float] = None):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        while not stop.is_set():
+            try:
+                await feed_ingestor.poll(urls)
+            except Exception as e:
+                if interval is None:
+                    raise
+                print(f"❌ Feed polling error: {e}")
+            if interval is None:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Ingest articles from RSS/Atom feeds")
+    parser.add_argument("--url", action="append", dest="urls", help="feed to poll (repeatable); default FEED_SOURCES")
+    parser.add_argument("--loop", action="store_true", help="keep polling until stopped")
+    parser.add_argument(
+        "--interval", type=float, default=settings.FEED_POLL_INTERVAL,
+        help="seconds between polls with --loop"
+    )
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.urls, max(args.interval, 1.0) if args.loop else None))
+
+
+if __name__ == "__main__":
+    main()
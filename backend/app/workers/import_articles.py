@@ -0,0 +1,76 @@
+# app/workers/import_articles.py
+#
+# Bulk-import articles from an NDJSON file (one article per line, the same
+# fields as POST /api/articles/ plus is_published / published_at):
+#
+#     python -m app.workers.import_articles archive.ndjson --author editor@example.com
+#
+# The file is read in chunks and written in batches of --batch-size, each
+# committed on its own, so memory stays flat and an interrupted run can be
+# repeated: articles with a source_url are matched instead of duplicated.
+# Use - to read standard input.
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import AsyncIterator, BinaryIO, Optional
+from sqlalchemy import select
+from app.core.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models.user import User
+from app.services.article_import import import_ndjson
+
+
+CHUNK_BYTES = 1024 * 1024
+
+
+async def read_chunks(stream: BinaryIO) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(stream.read, CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def run(stream: BinaryIO, author: str, batch_size: int, max_errors: int) -> int:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.id).where(User.email == author))
+        author_id = result.scalar_one_or_none()
+        if author_id is None:
+            print(f"❌ No user {author}")
+            return 1
+        report = await import_ndjson(db, read_chunks(stream), author_id, batch_size=batch_size, max_errors=max_errors)
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    rate = report["lines"] / elapsed if elapsed > 0 else 0.0
+    for error in report["errors"]:
+        print(f"⚠️ Line {error['line']}: {error['error']}")
+    print(
+        f"📥 {report['lines']} lines in {elapsed:.1f}s ({rate:.0f} lines/s): "
+        f"{report['inserted']} inserted, {report['updated']} updated, "
+        f"{report['unchanged']} unchanged, {report['failed']} failed"
+    )
+    return 1 if report["failed"] else 0
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Bulk-import articles from NDJSON")
+    parser.add_argument("path", help="NDJSON file, or - for standard input")
+    parser.add_argument("--author", required=True, help="email of the user who owns the articles")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE, help="lines per batch and commit")
+    parser.add_argument("--max-errors", type=int, default=settings.IMPORT_MAX_ERRORS, help="failed lines to list")
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        code = asyncio.run(run(sys.stdin.buffer, args.author, max(args.batch_size, 1), args.max_errors))
+    else:
+        with open(args.path, "rb") as stream:
+            code = asyncio.run(run(stream, args.author, max(args.batch_size, 1), args.max_errors))
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# app/workers/summaries.py
+#
+# Backfill extractive summaries for articles that have none:
+#
+#     python -m app.workers.summaries --batch-size 500
+#
+# Articles are summarized in batches (one vectorized TextRank pass each)
+# and committed batch by batch, so an interrupted run resumes where it
+# stopped. --overwrite re-summarizes every article.
+
+import argparse
+import asyncio
+import time
+from typing import Optional
+from app.database import AsyncSessionLocal, engine
+from app.services.summarizer import backfill_summaries
+
+
+async def run(batch_size: int, limit: Optional[int], overwrite: bool):
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        summarized = await backfill_summaries(db, batch_size=batch_size, limit=limit, overwrite=overwrite)
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    rate = summarized / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"📝 Summarized {summarized} articles in {elapsed:.1f}s ({rate:.0f} articles/min)")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Backfill article summaries")
+    parser.add_argument("--batch-size", type=int, default=500, help="articles per vectorized pass and commit")
+    parser.add_argument("--limit", type=int, help="stop after this many articles")
+    parser.add_argument("--overwrite", action="store_true", help="also replace existing summaries")
+    args = parser.parse_args(argv)
+    asyncio.run(run(max(args.batch_size, 1), args.limit, args.overwrite))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# app/workers/tags.py
+#
+# Extract keywords for articles never tagged automatically:
+#
+#     python -m app.workers.tags --batch-size 500
+#
+# Keywords become the tags of articles that have none (of every article
+# with --overwrite). Batches are committed one by one, so an interrupted
+# run resumes where it stopped.
+
+import argparse
+import asyncio
+import time
+from typing import Optional
+from app.database import AsyncSessionLocal, engine
+from app.services.keyword_tagger import keyword_tagger
+
+
+async def run(batch_size: int, limit: Optional[int], overwrite: bool):
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        tagged = await keyword_tagger.backfill(db, batch_size=batch_size, limit=limit, overwrite=overwrite)
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    rate = tagged / elapsed * 60 if elapsed > 0 else 0.0
+    terms = len(keyword_tagger.frequencies)
+    print(f"🏷️ Tagged {tagged} articles in {elapsed:.1f}s ({rate:.0f} articles/min, {terms} terms)")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Tag articles with extracted keywords")
+    parser.add_argument("--batch-size", type=int, default=500, help="articles per batch and commit")
+    parser.add_argument("--limit", type=int, help="stop after this many articles")
+    parser.add_argument("--overwrite", action="store_true", help="also replace existing tags")
+    args = parser.parse_args(argv)
+    asyncio.run(run(max(args.batch_size, 1), args.limit, args.overwrite))
+
+
+if __name__ == "__main__":
+    main()
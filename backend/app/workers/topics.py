@@ -0,0 +1,31 @@
+# app/workers/topics.py
+#
+# Update the topic clusters behind the analytics topics and categories:
+#
+#     python -m app.workers.topics [--full]
+#
+# Without --full only articles published or edited since the last run are
+# assigned, unless enough have arrived that the clustering is refit anyway.
+
+import argparse
+import asyncio
+from typing import Optional
+from app.database import AsyncSessionLocal, engine
+from app.services.topic_clustering import recluster
+
+
+async def run(full: bool):
+    async with AsyncSessionLocal() as db:
+        await recluster(db, full=full)
+    await engine.dispose()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Cluster articles into topics")
+    parser.add_argument("--full", action="store_true", help="refit the clustering from scratch")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.full))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# benchmarks/delivery.py
+#
+# End-to-end newsletter delivery benchmark against a local SMTP sink:
+#
+#     python -m benchmarks.delivery --subscribers 20000 --latency 0.005
+#
+# An aiosmtpd sink runs in its own process (with optional per-message
+# latency and 4xx/5xx reply rates), N subscribers are seeded into a
+# throwaway SQLite database, and send_newsletter_to_subscribers runs end to
+# end. Reports messages/sec, p50/p99 per-transaction latency, peak RSS and
+# SMTP connection counts; --json writes the numbers for comparison between
+# runs, and --min-throughput makes the run fail below a floor.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+
+COUNTERS = ("connections", "transactions", "recipients", "rejected", "deferred", "bytes")
+
+
+class SinkHandler:
+    """Accepts and discards mail, with artificial latency and error replies"""
+
+    def __init__(self, latency: float, temp_fail_rate: float, perm_fail_rate: float, counters: Dict):
+        self.latency = latency
+        self.temp_fail_rate = temp_fail_rate
+        self.perm_fail_rate = perm_fail_rate
+        self.counters = counters
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        self.counters["connections"].value += 1
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        roll = random.random()
+        if roll < self.perm_fail_rate:
+            self.counters["rejected"].value += 1
+            return "550 5.1.1 No such user"
+        if roll < self.perm_fail_rate + self.temp_fail_rate:
+            self.counters["deferred"].value += 1
+            return "451 4.7.1 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.counters["transactions"].value += 1
+        self.counters["recipients"].value += len(envelope.rcpt_tos)
+        self.counters["bytes"].value += len(envelope.content)
+        return "250 OK"
+
+
+def run_sink(port: int, latency: float, temp_fail_rate: float, perm_fail_rate: float,
+             counters: Dict, ready, stop):
+    """Sink process entry point: serve until `stop` is set"""
+    from aiosmtpd.controller import Controller
+
+    handler = SinkHandler(latency, temp_fail_rate, perm_fail_rate, counters)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    ready.set()
+    stop.wait()
+    controller.stop()
+
+
+def configure_environment(args, scratch_dir: str):
+    """Point the app at the sink and a scratch database before it is imported"""
+    os.environ.update({
+        "DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{os.path.join(scratch_dir, 'bench.db')}",
+        "ARTIFACT_CACHE_DIR": os.path.join(scratch_dir, "artifacts"),
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(args.port),
+        "SMTP_USER": "",
+        "SMTP_PASSWORD": "",
+        "SMTP_START_TLS": "false",
+        "DEBUG": "false",
+        "SMTP_POOL_SIZE": str(args.pool_size),
+        "DELIVERY_CONCURRENCY": str(args.concurrency),
+        "DELIVERY_RCPT_BATCH_SIZE": str(args.rcpt_batch),
+        "DELIVERY_GLOBAL_RATE": str(args.rate),
+        "DELIVERY_DOMAIN_RATE": str(args.rate),
+        "DELIVERY_RETRY_BASE_DELAY": "0.05",
+        "DELIVERY_RETRY_MAX_DELAY": "0.5",
+        "DELIVERY_PROGRESS_EVERY": "0",
+    })
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def seed(subscribers: int, domains: int, body_kb: int, personalized: bool, topics: int) -> int:
+    """Create the tables, one newsletter and `subscribers` subscribers"""
+    from sqlalchemy import insert
+    from app.database import AsyncSessionLocal, init_db
+    from app.models.newsletter import Newsletter
+    from app.models.subscriber import Subscriber
+    from app.models.user import User
+
+    await init_db()
+
+    paragraph = "<p>" + "Benchmark newsletter body. " * 36 + "</p>\n"
+    body = paragraph * max(body_kb, 1)
+    if personalized:
+        body = "<p>Hi {{ subscriber.full_name }},</p>\n" + body
+    topic_names = [f"topic{t}" for t in range(topics)]
+    for name in topic_names:
+        body += f"{{{{#subscriber.topics.{name}}}}}<h2>{name}</h2>{paragraph}{{{{/subscriber.topics.{name}}}}}\n"
+
+    async with AsyncSessionLocal() as db:
+        author = User(email="bench@example.com", password_hash="-", full_name="Benchmark")
+        db.add(author)
+        await db.flush()
+
+        newsletter = Newsletter(
+            title="Benchmark",
+            subject="Benchmark newsletter",
+            content_html=f"<html><body>{body}</body></html>",
+            author_id=author.id
+        )
+        db.add(newsletter)
+
+        for start in range(0, subscribers, 5000):
+            await db.execute(insert(Subscriber), [
+                {
+                    "email": f"user{i}@domain{i % domains}.example",
+                    "full_name": f"Subscriber {i}",
+                    "unsubscribe_token": f"token-{i}",
+                    "is_subscribed": True,
+                    "preferences": {
+                        "topics": [name for t, name in enumerate(topic_names) if i >> t & 1]
+                    }
+                }
+                for i in range(start, min(start + 5000, subscribers))
+            ])
+        await db.commit()
+        return newsletter.id
+
+
+async def run_benchmark(args) -> dict:
+    """Seed, send the newsletter once and collect client-side numbers"""
+    from sqlalchemy import select, func
+    from app.database import AsyncSessionLocal, engine
+    from app.models.delivery import DeliveryJob
+    from app.services.newsletter_service import send_newsletter_to_subscribers
+    from app.services.smtp_pool import smtp_pool
+
+    newsletter_id = await seed(args.subscribers, args.domains, args.body_kb, args.personalized, args.topics)
+
+    # Time every SMTP transaction the pool runs
+    latencies: List[float] = []
+    sendmail = smtp_pool.sendmail
+
+    async def timed_sendmail(*a, **kw):
+        started = time.perf_counter()
+        try:
+            return await sendmail(*a, **kw)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    smtp_pool.sendmail = timed_sendmail
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await send_newsletter_to_subscribers(newsletter_id, db)
+    elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(DeliveryJob.status, func.count()).group_by(DeliveryJob.status)
+        )
+        statuses = {status.value: total for status, total in result.all()}
+
+    await smtp_pool.close()
+    await engine.dispose()
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "statuses": statuses,
+        "transactions_timed": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "connections_opened": smtp_pool.connections_opened,
+    }
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Benchmark newsletter delivery against a local SMTP sink")
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--domains", type=int, default=50, help="distinct recipient domains")
+    parser.add_argument("--body-kb", type=int, default=8, help="approximate HTML body size")
+    parser.add_argument("--personalized", action="store_true",
+                        help="add a merge field so every subscriber gets their own message")
+    parser.add_argument("--topics", type=int, default=0,
+                        help="topic sections in the body; subscribers follow a mix of them")
+    parser.add_argument("--latency", type=float, default=0.0, help="sink delay per DATA, seconds")
+    parser.add_argument("--temp-fail-rate", type=float, default=0.0, help="share of RCPTs answered 451")
+    parser.add_argument("--perm-fail-rate", type=float, default=0.0, help="share of RCPTs answered 550")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--rcpt-batch", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=0.0, help="rate limit, msg/s (0 = unlimited)")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--database-url", help="use this database instead of a scratch SQLite file")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    parser.add_argument("--min-throughput", type=float, default=0.0,
+                        help="exit non-zero when messages/sec falls below this")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory(prefix="newsletter-bench-")
+    configure_environment(args, scratch.name)
+
+    context = multiprocessing.get_context("spawn")
+    counters = {name: context.RawValue("q", 0) for name in COUNTERS}
+    ready, stop = context.Event(), context.Event()
+    sink = context.Process(
+        target=run_sink,
+        args=(args.port, args.latency, args.temp_fail_rate, args.perm_fail_rate, counters, ready, stop),
+        name="smtp-sink"
+    )
+    sink.start()
+    try:
+        if not ready.wait(timeout=10):
+            raise RuntimeError("SMTP sink did not start")
+        client = asyncio.run(run_benchmark(args))
+    finally:
+        stop.set()
+        sink.join(timeout=10)
+        scratch.cleanup()
+
+    server = {name: counters[name].value for name in COUNTERS}
+    throughput = server["recipients"] / client["elapsed_seconds"] if client["elapsed_seconds"] else 0.0
+    results = {
+        "subscribers": args.subscribers,
+        "messages_per_second": round(throughput, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **client,
+        "sink": server,
+    }
+
+    print(
+        f"\n📊 {server['recipients']} messages in {client['elapsed_seconds']:.2f}s "
+        f"({throughput:.1f} msg/s)\n"
+        f"   per transaction: p50 {client['p50_ms']}ms, p99 {client['p99_ms']}ms "
+        f"over {client['transactions_timed']} transactions\n"
+        f"   connections: {client['connections_opened']} opened by the pool, "
+        f"{server['connections']} seen by the sink\n"
+        f"   peak RSS: {results['peak_rss_mb']} MB\n"
+        f"   outbox: {client['statuses']}"
+    )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.min_throughput and throughput < args.min_throughput:
+        print(f"❌ Throughput {throughput:.1f} msg/s is below the {args.min_throughput} msg/s floor")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# benchmarks/feeds.py
+#
+# RSS/Atom ingestion benchmark against a local HTTP feed server:
+#
+#     python -m benchmarks.feeds --feeds 50 --items 200 --latency 0.05
+#
+# A threaded HTTP server in its own process serves generated feeds (RSS 2.0
+# and Atom alternately) with ETag / Last-Modified validators and answers
+# conditional GETs with 304. A throwaway SQLite database gets one admin,
+# then every feed is polled twice: the first poll ingests everything, the
+# second should be all 304s. Reports items/sec, peak RSS and the requests
+# the server saw; --json writes the numbers for comparison between runs.
+
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+
+COUNTERS = ("requests", "not_modified", "bytes")
+WORDS = (
+    "market rocket vaccine league software climate election storage battery "
+    "satellite startup harvest museum transit reactor"
+).split()
+
+
+def render_feed(index: int, items: int, body_words: int) -> bytes:
+    """Feed `index`: RSS 2.0 for even indexes, Atom for odd ones"""
+    stamp = formatdate(1700000000 + index, usegmt=True)
+    entries = []
+    for item in range(items):
+        words = " ".join(WORDS[(index + item + w) % len(WORDS)] for w in range(body_words))
+        url = f"https://feed{index}.example/articles/{item}"
+        title = f"Story {item} from feed {index}"
+        body = escape(f"<p>{words}.</p>")
+        if index % 2 == 0:
+            entries.append(
+                f"<item><title>{title}</title><link>{url}</link><guid>{url}</guid>"
+                f"<pubDate>{stamp}</pubDate><category>bench</category>"
+                f"<description>{body}</description></item>"
+            )
+        else:
+            entries.append(
+                f"<entry><title>{title}</title><link href=\"{url}\"/><id>{url}</id>"
+                f"<updated>2024-01-01T00:00:00Z</updated><category term=\"bench\"/>"
+                f"<content type=\"html\">{body}</content></entry>"
+            )
+    if index % 2 == 0:
+        document = f"<?xml version=\"1.0\"?><rss version=\"2.0\"><channel><title>Feed {index}</title>{''.join(entries)}</channel></rss>"
+    else:
+        document = f"<?xml version=\"1.0\"?><feed xmlns=\"http://www.w3.org/2005/Atom\"><title>Feed {index}</title>{''.join(entries)}</feed>"
+    return document.encode("utf-8")
+
+
+def run_server(port: int, feeds: int, items: int, body_words: int, latency: float, counters: Dict, ready, stop):
+    """Server process entry point: serve /feed/<n>.xml until `stop` is set"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    documents = [render_feed(index, items, body_words) for index in range(feeds)]
+    etags = [f"\"{hashlib.sha1(document).hexdigest()}\"" for document in documents]
+    modified = formatdate(1700000000, usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            counters["requests"].value += 1
+            if latency:
+                time.sleep(latency)
+            try:
+                index = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+                document, etag = documents[index], etags[index]
+            except (ValueError, IndexError):
+                self.send_error(404)
+                return
+            if self.headers.get("If-None-Match") == etag:
+                counters["not_modified"].value += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            counters["bytes"].value += len(document)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml" if index % 2 == 0 else "application/atom+xml")
+            self.send_header("Content-Length", str(len(document)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modified)
+            self.end_headers()
+            self.wfile.write(document)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    ready.set()
+    stop.wait()
+    server.shutdown()
+
+
+def configure_environment(args, scratch_dir: str):
+    """Point the app at a scratch database before it is imported"""
+    os.environ.update({
+        "DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{os.path.join(scratch_dir, 'bench.db')}",
+        "ARTIFACT_CACHE_DIR": os.path.join(scratch_dir, "artifacts"),
+        "DEBUG": "false",
+        "FEED_CONCURRENCY": str(args.concurrency),
+        "FEED_BATCH_SIZE": str(args.batch_size),
+        "FEED_POLL_INTERVAL": "0",
+    })
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_benchmark(args) -> dict:
+    """Seed an admin, poll every feed twice and count the stored articles"""
+    from sqlalchemy import select, func
+    from app.database import AsyncSessionLocal, engine, init_db
+    from app.models.article import Article
+    from app.models.user import User, UserRole
+    from app.services.feed_ingestion import feed_ingestor
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        db.add(User(email="bench@example.com", password_hash="-", full_name="Benchmark", role=UserRole.ADMIN))
+        await db.commit()
+
+    urls: List[str] = [f"http://127.0.0.1:{args.port}/feed/{index}.xml" for index in range(args.feeds)]
+    started = time.perf_counter()
+    first = await feed_ingestor.poll(urls)
+    first_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    second = await feed_ingestor.poll(urls)
+    second_seconds = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(func.count(Article.id)))
+        stored = result.scalar() or 0
+    await engine.dispose()
+
+    return {
+        "first_poll": {**first, "seconds": round(first_seconds, 3)},
+        "second_poll": {**second, "seconds": round(second_seconds, 3)},
+        "articles_stored": stored,
+    }
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Benchmark RSS/Atom ingestion against a local feed server")
+    parser.add_argument("--feeds", type=int, default=20)
+    parser.add_argument("--items", type=int, default=100, help="items per feed")
+    parser.add_argument("--body-words", type=int, default=150, help="words per item body")
+    parser.add_argument("--latency", type=float, default=0.0, help="server delay per request, seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", help="use this database instead of a scratch SQLite file")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.TemporaryDirectory(prefix="feeds-bench-")
+    configure_environment(args, scratch.name)
+
+    context = multiprocessing.get_context("spawn")
+    counters = {name: context.RawValue("q", 0) for name in COUNTERS}
+    ready, stop = context.Event(), context.Event()
+    server = context.Process(
+        target=run_server,
+        args=(args.port, args.feeds, args.items, args.body_words, args.latency, counters, ready, stop),
+        name="feed-server"
+    )
+    server.start()
+    try:
+        if not ready.wait(timeout=30):
+            raise RuntimeError("Feed server did not start")
+        client = asyncio.run(run_benchmark(args))
+    finally:
+        stop.set()
+        server.join(timeout=10)
+        scratch.cleanup()
+
+    seen = {name: counters[name].value for name in COUNTERS}
+    first = client["first_poll"]
+    throughput = first["inserted"] / first["seconds"] if first["seconds"] else 0.0
+    results = {
+        "feeds": args.feeds,
+        "items_per_second": round(throughput, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **client,
+        "server": seen,
+    }
+
+    print(
+        f"\n📊 {first['inserted']} articles from {args.feeds} feeds in {first['seconds']:.2f}s "
+        f"({throughput:.1f} items/s)\n"
+        f"   second poll: {client['second_poll']['not_modified']} of {args.feeds} feeds unchanged "
+        f"in {client['second_poll']['seconds']:.2f}s\n"
+        f"   server: {seen['requests']} requests, {seen['not_modified']} answered 304, "
+        f"{seen['bytes'] // 1024} KB sent\n"
+        f"   stored: {client['articles_stored']} articles, peak RSS: {results['peak_rss_mb']} MB"
+    )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
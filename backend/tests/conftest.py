@@ -0,0 +1,73 @@
+# tests/conftest.py
+
+import asyncio
+import os
+import tempfile
+import pytest
+from email import message_from_bytes
+from aiosmtplib.errors import SMTPRecipientRefused, SMTPRecipientsRefused
+
+# Settings are read at import time, so point them at scratch locations first
+scratch = tempfile.mkdtemp(prefix="newsletter-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{scratch}/test.db")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("SMTP_USER", "")
+os.environ.setdefault("SMTP_PASSWORD", "")
+os.environ.setdefault("ARTIFACT_CACHE_DIR", os.path.join(scratch, "artifacts"))
+
+
+@pytest.fixture
+def database():
+    """
+    Empty tables in the test database. Returns a runner for the test's
+    coroutine that disposes of the engine's connections afterwards, since
+    each asyncio.run call has its own event loop.
+    """
+    from app.database import Base, engine, init_db
+
+    def run(awaitable):
+        async def main():
+            try:
+                return await awaitable
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await init_db()
+
+    run(reset())
+    return run
+
+
+class FakeRelay:
+    """Records transactions; addresses in `refuse` get a RCPT reply of (code, message)"""
+
+    def __init__(self, refuse=None):
+        self.refuse = refuse or {}
+        self.transactions = []
+
+    async def sendmail(self, sender, recipients, message):
+        self.transactions.append((recipients, message_from_bytes(message)))
+        refused = {
+            address: SMTPRecipientRefused(*self.refuse[address], address)
+            for address in recipients if address in self.refuse
+        }
+        if len(refused) == len(recipients):
+            raise SMTPRecipientsRefused(list(refused.values()))
+        return refused, "250 OK"
+
+
+@pytest.fixture
+def relay(monkeypatch):
+    """Installs a FakeRelay in place of the shared SMTP pool"""
+    from app.services.smtp_pool import smtp_pool
+
+    def install(refuse=None):
+        fake = FakeRelay(refuse)
+        monkeypatch.setattr(smtp_pool, "sendmail", fake.sendmail)
+        return fake
+    return install
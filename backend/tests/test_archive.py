@@ -0,0 +1,79 @@
+# tests/test_archive.py
+
+import asyncio
+import gzip
+import httpx
+from app.services.archive_service import ArchiveCache, build_archived_page, negotiate_encoding
+from app.services.artifact_store import artifact_key, artifact_store
+
+
+def test_negotiate_encoding():
+    available = {"identity": b"", "gzip": b""}
+    assert negotiate_encoding(None, available) == "identity"
+    assert negotiate_encoding("gzip, deflate", available) == "gzip"
+    assert negotiate_encoding("gzip;q=0", available) == "identity"
+    assert negotiate_encoding("*", available) == "gzip"
+    assert negotiate_encoding("*, gzip;q=0", available) == "identity"
+    assert negotiate_encoding("br", available) == "identity"
+
+
+def test_etags_per_representation():
+    page = build_archived_page("<p>archived</p>")
+    assert gzip.decompress(page.bodies["gzip"]) == page.bodies["identity"]
+    assert page.etag_for("gzip") == page.etag[:-1] + '-gzip"'
+    
+    assert page.matches(page.etag)
+    assert page.matches(f'"other", W/{page.etag_for("gzip")}')
+    assert page.matches("*")
+    assert not page.matches('"other"')
+    assert not page.matches(None)
+
+
+def test_pages_are_shared_through_the_artifact_store():
+    page = build_archived_page("<p>shared</p>")
+    
+    async def run():
+        await ArchiveCache().put(("archive-test", 1), page)
+        # A fresh cache, as in another process, loads the stored bodies
+        return await ArchiveCache().get(("archive-test", 1))
+    
+    loaded = asyncio.run(run())
+    assert loaded == page
+    # Already-compressed bodies are stored as they are, not gzipped again
+    stored = artifact_store._path(artifact_key("archive", ("archive-test", 1), "gzip") + ".raw")
+    assert stored.read_bytes() == page.bodies["gzip"]
+
+
+def test_archive_route(database):
+    from app.main import app
+    from app.database import AsyncSessionLocal
+    from app.models.newsletter import Newsletter, NewsletterStatus
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                Newsletter(id=1, title="Sent", subject="s", content_html="<p>hello</p>", status=NewsletterStatus.SENT, author_id=1),
+                Newsletter(id=2, title="Draft", subject="s", content_html="<p>draft</p>", author_id=1),
+            ])
+            await db.commit()
+        
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            # httpx sends "Accept-Encoding: gzip, deflate" unless told otherwise
+            plain = await client.get("/api/archive/1", headers={"Accept-Encoding": "identity"})
+            zipped = await client.get("/api/archive/1", headers={"Accept-Encoding": "gzip"})
+            cached = await client.get("/api/archive/1", headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["ETag"]})
+            draft = await client.get("/api/archive/2")
+        return plain, zipped, cached, draft
+    
+    plain, zipped, cached, draft = database(scenario())
+    
+    assert plain.status_code == 200 and plain.text == "<p>hello</p>"
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Vary"] == "Accept-Encoding"
+    
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.text == "<p>hello</p>"  # httpx decodes the body
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    
+    assert cached.status_code == 304 and cached.content == b""
+    assert draft.status_code == 404
@@ -0,0 +1,45 @@
+# tests/test_article_import.py
+
+import asyncio
+from app.services.article_import import ndjson_lines
+
+
+def collect(chunks, max_line_bytes=10):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [item async for item in ndjson_lines(stream(), max_line_bytes)]
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunks():
+    assert collect([b"ab", b"c\nde", b"f\n", b"gh"]) == [
+        (1, b"abc", None),
+        (2, b"def", None),
+        (3, b"gh", None),
+    ]
+
+
+def test_line_completed_by_a_chunk_is_limited():
+    # 16 bytes arriving as 8 + 8 must not slip past a 10-byte limit
+    lines = collect([b"aaaaaaaa", b"bbbbbbbb\nok\n"])
+    assert lines[0][0] == 1 and lines[0][1] is None and "longer than 10" in lines[0][2]
+    assert lines[1] == (2, b"ok", None)
+
+
+def test_oversized_line_inside_one_chunk():
+    lines = collect([b"x" * 11 + b"\nok"])
+    assert lines[0][1] is None
+    assert lines[1] == (2, b"ok", None)
+
+
+def test_oversized_last_line_without_newline():
+    lines = collect([b"x" * 6, b"x" * 6])
+    assert len(lines) == 1 and lines[0][0] == 1 and lines[0][1] is None
+
+
+def test_line_at_the_limit_is_kept():
+    assert collect([b"x" * 5, b"x" * 5, b"\n"]) == [(1, b"x" * 10, None)]
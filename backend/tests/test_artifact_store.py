@@ -0,0 +1,71 @@
+# tests/test_artifact_store.py
+
+import asyncio
+from app.services.artifact_store import ArtifactStore, artifact_key
+
+
+def test_miss_then_hit(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=1 << 20)
+    key = artifact_key("html", 1)
+    
+    async def run():
+        assert await store.get(key) is None
+        await store.put(key, b"<p>cached</p>")
+        return await store.get(key)
+    
+    assert asyncio.run(run()) == b"<p>cached</p>"
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    async def run():
+        probe = ArtifactStore(str(tmp_path / "probe"), max_bytes=1 << 20)
+        await probe.put("probe", bytes(1000))
+        size = probe.total_bytes
+        
+        store = ArtifactStore(str(tmp_path / "store"), max_bytes=2 * size)
+        await store.put("a" * 64, bytes(1000))
+        await store.put("b" * 64, bytes(1000))
+        await store.get("a" * 64)
+        await store.put("c" * 64, bytes(1000))
+        return store, [await store.get(key * 64) for key in "abc"]
+    
+    store, found = asyncio.run(run())
+    assert found == [bytes(1000), None, bytes(1000)]
+    assert not store._path("b" * 64 + ".gz").exists()
+
+
+def test_artifact_stored_by_another_process_is_found(tmp_path):
+    reader = ArtifactStore(str(tmp_path), max_bytes=1 << 20)
+    writer = ArtifactStore(str(tmp_path), max_bytes=1 << 20)
+    
+    async def run():
+        assert await reader.get("k" * 64) is None  # builds the (empty) index
+        await writer.put("k" * 64, b"shared")
+        return await reader.get("k" * 64)
+    
+    assert asyncio.run(run()) == b"shared"
+    assert "k" * 64 + ".gz" in reader._index
+
+
+def test_torn_file_is_a_miss(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=1 << 20)
+    
+    async def run():
+        await store.put("t" * 64, b"data" * 100)
+        store._path("t" * 64 + ".gz").write_bytes(b"\x1f\x8b broken")
+        return await store.get("t" * 64)
+    
+    assert asyncio.run(run()) is None
+    assert "t" * 64 + ".gz" not in store._index
+
+
+def test_disabled_store_never_touches_disk(tmp_path):
+    store = ArtifactStore(str(tmp_path / "off"), max_bytes=1 << 20, enabled=False)
+    
+    async def run():
+        await store.put("x" * 64, b"data")
+        return await store.get("x" * 64)
+    
+    assert asyncio.run(run()) is None
+    assert not (tmp_path / "off").exists()
@@ -0,0 +1,47 @@
+# tests/test_benchmarks.py
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import pytest
+from benchmarks.delivery import percentile
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_percentile():
+    samples = [float(n) for n in range(1, 101)]
+    
+    assert percentile(samples, 50) in (50.0, 51.0)
+    assert percentile(samples, 99) == 99.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 99) == 0.0
+
+
+def test_small_run_delivers_to_every_subscriber(tmp_path):
+    pytest.importorskip("aiosmtpd")
+    results_path = tmp_path / "results.json"
+    # A fresh interpreter: the benchmark configures the app through the environment
+    env = {key: value for key, value in os.environ.items() if key not in ("DATABASE_URL", "ARTIFACT_CACHE_DIR")}
+    
+    completed = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.delivery",
+            "--subscribers", "60", "--domains", "4", "--rcpt-batch", "10",
+            "--port", str(free_port()), "--json", str(results_path),
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, timeout=120
+    )
+    
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    results = json.loads(results_path.read_text())
+    assert results["sink"]["recipients"] == 60
+    assert results["statuses"] == {"sent": 60}
+    assert results["sink"]["transactions"] < 60
@@ -0,0 +1,113 @@
+# tests/test_delivery_retries.py
+
+import httpx
+from datetime import datetime
+from aiosmtplib.errors import SMTPAuthenticationError, SMTPResponseException, SMTPServerDisconnected
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.security import get_current_user_email
+from app.models.delivery import DeliveryJob, DeliveryStatus
+from app.services.delivery_service import Recipient, deliver, failure_result, retry_delay
+from app.services.email_service import DeliveryFailure, classify_exception
+from tests.test_delivery_service import UNLIMITED, seed
+
+
+def recipient(attempts: int) -> Recipient:
+    return Recipient(
+        job_id=1, attempts=attempts, id=1, email="reader@example.com",
+        full_name=None, unsubscribe_token="t", is_subscribed=True, preferences=None
+    )
+
+
+def test_backoff_grows_and_is_capped():
+    base, cap = settings.DELIVERY_RETRY_BASE_DELAY, settings.DELIVERY_RETRY_MAX_DELAY
+    for attempts, ceiling in ((1, base), (2, base * 2), (4, base * 8), (40, cap)):
+        delays = [retry_delay(attempts) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        # Full jitter spreads retries over the whole window
+        assert max(delays) > ceiling / 2
+
+
+def test_exceptions_are_classified():
+    assert classify_exception(SMTPResponseException(421, "Try later")) == DeliveryFailure(421, "Try later", True)
+    assert classify_exception(SMTPResponseException(554, "Rejected")) == DeliveryFailure(554, "Rejected", False)
+    assert classify_exception(SMTPAuthenticationError(535, "Bad credentials")).transient
+    assert classify_exception(SMTPServerDisconnected("gone")) == DeliveryFailure(None, "gone", True)
+    assert classify_exception(TimeoutError()) == DeliveryFailure(None, "TimeoutError", True)
+
+
+def test_transient_failures_retry_until_attempts_run_out():
+    greylisted = DeliveryFailure(450, "Greylisted", transient=True)
+    
+    retry = failure_result(recipient(0), greylisted)
+    assert retry.status == DeliveryStatus.PENDING
+    assert retry.defer_until > datetime.utcnow()
+    assert retry.attempted
+    
+    exhausted = failure_result(recipient(settings.DELIVERY_MAX_ATTEMPTS - 1), greylisted)
+    assert exhausted.status == DeliveryStatus.FAILED
+    
+    permanent = failure_result(recipient(0), DeliveryFailure(550, "No such user", transient=False))
+    assert permanent.status == DeliveryStatus.FAILED
+    assert permanent.defer_until is None
+
+
+def test_failed_sends_are_retried_later_or_dead_lettered(database):
+    from app.database import AsyncSessionLocal
+    database(seed(2))
+    
+    async def send(recipients):
+        if recipients[0].id == 1:
+            raise SMTPResponseException(451, "Local error")
+        return {recipients[0].job_id: DeliveryFailure(550, "No such user", transient=False)}
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            progress = await deliver(db, 1, send, limiter=UNLIMITED, linger=0)
+            result = await db.execute(
+                select(
+                    DeliveryJob.subscriber_id, DeliveryJob.status, DeliveryJob.attempts,
+                    DeliveryJob.smtp_code, DeliveryJob.next_attempt_at
+                ).order_by(DeliveryJob.subscriber_id)
+            )
+            return progress, result.all()
+    
+    progress, (retried, dead) = database(scenario())
+    assert (progress.sent, progress.failed) == (0, 1)
+    assert retried.status == DeliveryStatus.PENDING
+    assert (retried.attempts, retried.smtp_code) == (1, 451)
+    assert retried.next_attempt_at is not None
+    assert dead.status == DeliveryStatus.FAILED
+    assert (dead.attempts, dead.smtp_code, dead.next_attempt_at) == (1, 550, None)
+
+
+def test_dead_letters_are_admin_only(database):
+    from app.database import AsyncSessionLocal
+    from app.main import app
+    from app.models.user import User, UserRole
+    database(seed(1))
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                User(id=1, email="admin@example.com", password_hash="x", full_name="Admin", role=UserRole.ADMIN),
+                User(id=2, email="editor@example.com", password_hash="x", full_name="Editor"),
+            ])
+            job = await db.get(DeliveryJob, 1)
+            job.status, job.smtp_code, job.last_error = DeliveryStatus.FAILED, 550, "550 No such user"
+            await db.commit()
+        
+        responses = []
+        transport = httpx.ASGITransport(app=app)
+        for email in ("editor@example.com", "admin@example.com"):
+            app.dependency_overrides[get_current_user_email] = lambda email=email: email
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses.append(await client.get("/api/deliveries/dead-letters"))
+        app.dependency_overrides.clear()
+        return responses
+    
+    forbidden, allowed = database(scenario())
+    assert forbidden.status_code == 403
+    assert allowed.status_code == 200
+    [letter] = allowed.json()
+    assert (letter["email"], letter["smtp_code"]) == ("reader1@a.example", 550)
@@ -0,0 +1,202 @@
+# tests/test_delivery_service.py
+
+import asyncio
+from sqlalchemy import select, update
+from app.models.delivery import DeliveryJob, DeliveryStatus
+from app.models.subscriber import Subscriber
+from app.services.delivery_service import deliver, enqueue_newsletter
+from app.services.email_service import DeliveryFailure
+from app.services.rate_limiter import DeliveryRateLimiter
+
+UNLIMITED = DeliveryRateLimiter()
+REFUSED = DeliveryFailure(550, "No such user", transient=False)
+
+
+def seed(count, unsubscribe=()):
+    """`count` subscribers with jobs queued for newsletter 1; `unsubscribe` opt out afterwards"""
+    from app.database import AsyncSessionLocal
+    
+    async def run():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                Subscriber(id=i, email=f"reader{i}@{'a' if i % 2 else 'b'}.example", unsubscribe_token=f"t{i}")
+                for i in range(1, count + 1)
+            ])
+            await db.commit()
+            queued = await enqueue_newsletter(db, 1)
+            if unsubscribe:
+                await db.execute(
+                    update(Subscriber).where(Subscriber.id.in_(unsubscribe)).values(is_subscribed=False)
+                )
+                await db.commit()
+            return queued
+    return run()
+
+
+async def job_statuses():
+    from app.database import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(DeliveryJob.subscriber_id, DeliveryJob.status).order_by(DeliveryJob.subscriber_id))
+        return dict(result.all())
+
+
+class RecordingSender:
+    """A send function that counts how many calls overlap"""
+    
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.sent = []
+    
+    async def __call__(self, recipients):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            self.sent.extend(recipient.email for recipient in recipients)
+            return {}
+        finally:
+            self.active -= 1
+
+
+def test_fan_out_is_bounded_and_covers_every_job(database):
+    from app.database import AsyncSessionLocal
+    assert database(seed(40, unsubscribe=[7])) == 40
+    send = RecordingSender()
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            progress = await deliver(db, 1, send, concurrency=4, batch_size=7, limiter=UNLIMITED)
+        return progress, await job_statuses()
+    
+    progress, statuses = database(scenario())
+    assert 1 < send.peak <= 4
+    assert (progress.sent, progress.skipped, progress.failed) == (39, 1, 0)
+    assert sorted(send.sent) == sorted(f"reader{i}@{'a' if i % 2 else 'b'}.example" for i in range(1, 41) if i != 7)
+    assert statuses[7] == DeliveryStatus.SKIPPED
+    assert all(status == DeliveryStatus.SENT for sid, status in statuses.items() if sid != 7)
+
+
+def test_enqueue_is_idempotent(database):
+    from app.database import AsyncSessionLocal
+    database(seed(5))
+    
+    async def again():
+        async with AsyncSessionLocal() as db:
+            return await enqueue_newsletter(db, 1)
+    
+    assert database(again()) == 0
+
+
+def test_concurrent_drains_never_send_a_job_twice(database):
+    from app.database import AsyncSessionLocal
+    database(seed(60))
+    send = RecordingSender()
+    
+    async def drain():
+        async with AsyncSessionLocal() as db:
+            return await deliver(db, 1, send, concurrency=3, batch_size=5, limiter=UNLIMITED)
+    
+    async def scenario():
+        await asyncio.gather(drain(), drain(), drain())
+        return await job_statuses()
+    
+    statuses = database(scenario())
+    assert len(send.sent) == len(set(send.sent)) == 60
+    assert set(statuses.values()) == {DeliveryStatus.SENT}
+
+
+def test_stopped_send_resumes_where_it_left_off(database):
+    from app.database import AsyncSessionLocal
+    database(seed(30))
+    stop = asyncio.Event()
+    first = RecordingSender()
+    second = RecordingSender()
+    
+    async def stopping(recipients):
+        if len(first.sent) >= 10:
+            stop.set()
+        return await first(recipients)
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await deliver(db, 1, stopping, concurrency=2, batch_size=4, limiter=UNLIMITED, stop=stop)
+            async with AsyncSessionLocal() as check:
+                claimed = (await check.execute(
+                    select(DeliveryJob.id).where(DeliveryJob.claimed_until.isnot(None))
+                )).all()
+            await deliver(db, 1, second, concurrency=2, batch_size=4, limiter=UNLIMITED)
+        return claimed, await job_statuses()
+    
+    claimed, statuses = database(scenario())
+    assert claimed == []  # unattempted claims were handed back
+    assert 10 <= len(first.sent) < 30
+    assert sorted(first.sent + second.sent) == sorted(set(first.sent + second.sent))
+    assert len(first.sent) + len(second.sent) == 30
+    assert set(statuses.values()) == {DeliveryStatus.SENT}
+
+
+def test_jobs_of_a_crashed_sender_are_taken_over_once_their_claim_expires(database):
+    from datetime import datetime, timedelta
+    from app.database import AsyncSessionLocal
+    database(seed(4))
+    send = RecordingSender()
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            # Jobs 1-2 are leased to a live sender, 3-4 to one whose lease ran out
+            now = datetime.utcnow()
+            await db.execute(update(DeliveryJob).where(DeliveryJob.id <= 2).values(claimed_until=now + timedelta(minutes=5)))
+            await db.execute(update(DeliveryJob).where(DeliveryJob.id > 2).values(claimed_until=now - timedelta(seconds=1)))
+            await db.commit()
+            await deliver(db, 1, send, limiter=UNLIMITED, linger=0)
+        return await job_statuses()
+    
+    statuses = database(scenario())
+    assert sorted(send.sent) == ["reader3@a.example", "reader4@b.example"]
+    assert [statuses[i] for i in (1, 2, 3, 4)] == [DeliveryStatus.PENDING] * 2 + [DeliveryStatus.SENT] * 2
+
+
+def test_throttled_recipients_are_deferred_not_dropped(database):
+    from app.database import AsyncSessionLocal
+    database(seed(6))
+    send = RecordingSender()
+    # b.example allows one message now and the next in 100 seconds
+    limiter = DeliveryRateLimiter(domain_rates={"b.example": 0.01})
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            progress = await deliver(db, 1, send, limiter=limiter, linger=0)
+            deferred = (await db.execute(
+                select(DeliveryJob.subscriber_id).where(DeliveryJob.next_attempt_at.isnot(None))
+            )).scalars().all()
+        return progress, deferred, await job_statuses()
+    
+    progress, deferred, statuses = database(scenario())
+    assert sorted(email.partition("@")[2] for email in send.sent) == ["a.example"] * 3 + ["b.example"]
+    assert progress.sent == 4
+    assert len(deferred) == 2
+    assert all(statuses[subscriber_id] == DeliveryStatus.PENDING for subscriber_id in deferred)
+
+
+def test_grouped_sends_record_each_recipient(database):
+    from app.database import AsyncSessionLocal
+    database(seed(12))
+    groups = []
+    
+    async def send(recipients):
+        groups.append([recipient.id for recipient in recipients])
+        # The relay refuses one address of the transaction
+        return {recipient.job_id: REFUSED for recipient in recipients if recipient.id == 4}
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            progress = await deliver(db, 1, send, recipients_per_message=5, limiter=UNLIMITED, linger=0)
+        return progress, await job_statuses()
+    
+    progress, statuses = database(scenario())
+    assert all(len(group) <= 5 for group in groups) and len(groups) < 12
+    assert sorted(sum(groups, [])) == list(range(1, 13))
+    assert (progress.sent, progress.failed) == (11, 1)
+    assert statuses[4] == DeliveryStatus.FAILED
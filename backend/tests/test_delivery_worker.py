@@ -0,0 +1,43 @@
+# tests/test_delivery_worker.py
+
+import pytest
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.services.delivery_service import Shard, count_pending_jobs, deliver, newsletters_with_due_jobs
+from app.workers.delivery import shard_rate_limiter
+from tests.test_delivery_service import UNLIMITED, RecordingSender, job_statuses, seed
+
+
+def test_shards_split_the_outbox_without_overlap(database):
+    database(seed(20))
+    senders = [RecordingSender() for _ in range(3)]
+    
+    async def scenario():
+        counts = []
+        async with AsyncSessionLocal() as db:
+            assert await newsletters_with_due_jobs(db, Shard(2, 3)) == [1]
+            for index, send in enumerate(senders):
+                shard = Shard(index, 3)
+                counts.append(await count_pending_jobs(db, 1, shard))
+                await deliver(db, 1, send, shard=shard, limiter=UNLIMITED, linger=0)
+            assert await newsletters_with_due_jobs(db, Shard(0, 3)) == []
+        return counts, await job_statuses()
+    
+    counts, statuses = database(scenario())
+    assert counts == [6, 7, 7]
+    for index, send in enumerate(senders):
+        ids = sorted(int(email[len("reader"):].partition("@")[0]) for email in send.sent)
+        assert ids == [i for i in range(1, 21) if i % 3 == index]
+    assert len(statuses) == 20
+
+
+def test_rate_limits_are_split_across_workers(monkeypatch):
+    monkeypatch.setattr(settings, "DELIVERY_GLOBAL_RATE", 100.0)
+    monkeypatch.setattr(settings, "DELIVERY_DOMAIN_RATE", 10.0)
+    monkeypatch.setattr(settings, "DELIVERY_DOMAIN_RATES", {"slow.example": 4.0})
+    
+    limiter = shard_rate_limiter(4)
+    
+    assert limiter.global_bucket.rate == pytest.approx(25)
+    assert limiter.domain_rate == pytest.approx(2.5)
+    assert limiter.domain_rates == {"slow.example": pytest.approx(1.0)}
@@ -0,0 +1,136 @@
+# tests/test_duplicate_index.py
+
+import asyncio
+from app.services.duplicate_index import DuplicateIndex, minhash
+
+STORY = (
+    "The city council approved a new budget on Tuesday that expands bus service, "
+    "repairs three bridges and hires forty teachers for the coming school year"
+)
+RETOLD = STORY.replace("Tuesday", "Wednesday")
+OTHER = "Researchers found that honeybees use a waggle dance to share where flowers grow"
+
+
+def test_minhash_estimates_similarity():
+    assert (minhash(STORY) == minhash("<p>" + STORY + "</p>")).all()
+    assert (minhash(STORY) == minhash(RETOLD)).mean() > 0.5
+    assert (minhash(STORY) == minhash(OTHER)).mean() < 0.2
+    assert minhash("<p></p>") is None
+
+
+def test_collapse_keeps_the_first_copy():
+    index = DuplicateIndex(threshold=0.5)
+    for article_id, body in ((1, STORY), (2, OTHER), (3, RETOLD)):
+        index.add(article_id, minhash(body))
+    
+    assert [other for other, _ in index.duplicates(1)] == [3]
+    assert index.collapse([3, 2, 1]) == [3, 2]
+    index._rebuild()  # same answers once merged into the sorted arrays
+    assert index.collapse([1, 2, 3]) == [1, 2]
+
+
+def add_articles(bodies):
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    
+    async def run():
+        async with AsyncSessionLocal() as db:
+            db.add_all([Article(title=f"a{i}", body=body, author_id=1) for i, body in enumerate(bodies)])
+            await db.commit()
+    return run()
+
+
+def test_request_path_does_not_wait_for_the_load(database):
+    from app.database import AsyncSessionLocal
+    index = DuplicateIndex(threshold=0.5)
+    database(add_articles([STORY, OTHER, RETOLD]))
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            ready = await index.ready(db)
+            loading = not index._warm_up.done()
+            await index._warm_up
+            return ready, loading, await index.ready(db)
+    
+    assert database(scenario()) == (False, True, True)
+    assert sorted(index.signatures) == [1, 2, 3]  # unsigned articles were signed
+    assert index.collapse([1, 2, 3]) == [1, 2]
+
+
+def test_concurrent_requests_sync_once(database):
+    from app.database import AsyncSessionLocal
+    index = DuplicateIndex(threshold=0.5)
+    writer = DuplicateIndex(threshold=0.5)  # another process storing signatures
+    database(add_articles([STORY]))
+    syncs = []
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await index.ensure_loaded(db)
+            async with AsyncSessionLocal() as other:
+                await writer.index_new_articles(other, [(1000, RETOLD)])
+                await other.commit()
+            
+            sync = index._sync
+            
+            async def counted(session):
+                syncs.append(session)
+                return await sync(session)
+            
+            index._sync = counted
+            index._synced_at = 0.0
+            await asyncio.gather(*(index.ready(db) for _ in range(5)))
+    
+    database(scenario())
+    assert len(syncs) == 1
+    assert index.collapse([1, 1000]) == [1]
+
+
+def test_lsh_finds_retold_stories_among_many():
+    import random
+    from app.services import duplicate_index as module
+    rng = random.Random(3)
+    words = [f"word{i}" for i in range(2000)]
+    bodies = {i: " ".join(rng.choice(words) for _ in range(80)) for i in range(1, 301)}
+    index = DuplicateIndex(threshold=0.5)
+    for article_id, body in bodies.items():
+        index.add(article_id, minhash(body))
+    # Retellings change a couple of words of every tenth story
+    for article_id in range(1, 301, 10):
+        retold = bodies[article_id].split()
+        retold[10], retold[50] = "changed", "edited"
+        index.add(1000 + article_id, minhash(" ".join(retold)))
+    
+    assert index._recent_count < module.MERGE_EVERY
+    for article_id in range(1, 301, 10):
+        assert [other for other, _ in index.duplicates(1000 + article_id)] == [article_id]
+    # Unrelated stories rarely even share a bucket
+    assert sum(len(index.candidates(index.signatures[i])) for i in range(2, 301, 10)) < 60
+
+
+def test_edited_and_deleted_articles_leave_no_false_matches(database):
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    index = DuplicateIndex(threshold=0.5)
+    database(add_articles([STORY, RETOLD]))
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await index.ensure_loaded(db)
+            before = index.duplicates(1)
+            # Article 2 is rewritten into a different story
+            await index.index_article(db, 2, OTHER)
+            await db.commit()
+            after_edit = index.duplicates(1)
+            await index.forget_article(db, 2)
+            await db.delete(await db.get(Article, 2))
+            await db.commit()
+            # A fresh process sees the same thing
+            fresh = DuplicateIndex(threshold=0.5)
+            await fresh.ensure_loaded(db)
+        return before, after_edit, index.duplicates(1), sorted(fresh.signatures)
+    
+    before, after_edit, after_delete, stored = database(scenario())
+    assert [other for other, _ in before] == [2]
+    assert after_edit == after_delete == []
+    assert stored == [1]
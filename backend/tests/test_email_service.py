@@ -0,0 +1,79 @@
+# tests/test_email_service.py
+
+import asyncio
+from app.core.config import settings
+from app.models.newsletter import Newsletter
+from app.services.delivery_service import Recipient
+from app.services.email_service import UNDISCLOSED_RECIPIENTS, deliver_prepared
+from app.services.mime_cache import PreparedMessage
+from app.services.newsletter_service import build_newsletter_sender
+
+
+def recipient(number: int) -> Recipient:
+    return Recipient(
+        job_id=100 + number, attempts=0, id=number, email=f"reader{number}@example.com",
+        full_name=None, unsubscribe_token=f"t{number}", is_subscribed=True, preferences=None
+    )
+
+
+def test_one_transaction_reports_only_refused_recipients(relay):
+    fake = relay({"b@example.com": (550, "No such user")})
+    prepared = PreparedMessage("Subject", "<p>Hi</p>")
+
+    refused = asyncio.run(deliver_prepared(prepared, ["a@example.com", "b@example.com", "c@example.com"]))
+
+    assert len(fake.transactions) == 1
+    recipients, message = fake.transactions[0]
+    assert recipients == ["a@example.com", "b@example.com", "c@example.com"]
+    assert message["To"] == UNDISCLOSED_RECIPIENTS
+    assert list(refused) == ["b@example.com"]
+    assert refused["b@example.com"].code == 550
+    assert not refused["b@example.com"].transient
+
+
+def test_every_recipient_refused_is_reported_per_recipient(relay):
+    relay({"a@example.com": (450, "Greylisted"), "b@example.com": (550, "No such user")})
+    prepared = PreparedMessage("Subject", "<p>Hi</p>")
+
+    refused = asyncio.run(deliver_prepared(prepared, ["a@example.com", "b@example.com"]))
+
+    assert refused["a@example.com"].transient
+    assert not refused["b@example.com"].transient
+
+
+def test_static_newsletter_batches_recipients(relay, monkeypatch):
+    monkeypatch.setattr(settings, "DELIVERY_RCPT_BATCH_SIZE", 50)
+    fake = relay({"reader2@example.com": (550, "No such user")})
+    newsletter = Newsletter(id=2001, title="Batched", subject="Batched", content_html="<p>Same for everyone</p>")
+
+    async def scenario():
+        send, batch_size = await build_newsletter_sender(newsletter)
+        return batch_size, await send([recipient(1), recipient(2), recipient(3)])
+
+    batch_size, refused = asyncio.run(scenario())
+    assert batch_size == 50
+    assert len(fake.transactions) == 1
+    assert fake.transactions[0][0] == ["reader1@example.com", "reader2@example.com", "reader3@example.com"]
+    # Outcomes come back keyed by delivery job
+    assert list(refused) == [102]
+
+
+def test_personal_unsubscribe_link_disables_batching(relay, monkeypatch):
+    monkeypatch.setattr(settings, "DELIVERY_RCPT_BATCH_SIZE", 50)
+    fake = relay()
+    newsletter = Newsletter(
+        id=2002, title="Personal", subject="Personal",
+        content_html='<p><a href="{{ unsubscribe_url }}">Unsubscribe</a></p>'
+    )
+
+    async def scenario():
+        send, batch_size = await build_newsletter_sender(newsletter)
+        return batch_size, await send([recipient(1)])
+
+    batch_size, refused = asyncio.run(scenario())
+    assert batch_size == 1
+    assert refused == {}
+    recipients, message = fake.transactions[0]
+    assert recipients == ["reader1@example.com"]
+    assert message["To"] == "reader1@example.com"
+    assert "token=t1" in message["List-Unsubscribe"]
@@ -0,0 +1,167 @@
+# tests/test_feed_ingestion.py
+
+from datetime import datetime
+import httpx
+from app.services import feed_ingestion
+from app.services.feed_ingestion import FeedIngestor, _incoming
+from app.services.feed_parser import FeedItem, FeedParser, parse_date
+
+RSS = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:media="http://search.yahoo.com/mrss/">
+  <channel>
+    <title>Example news</title>
+    <item>
+      <title>Bridges &amp; budgets</title>
+      <link>https://example.com/bridges</link>
+      <description>Short teaser</description>
+      <content:encoded><![CDATA[<p>The full story about bridges.</p>]]></content:encoded>
+      <category>City</category>
+      <category>Budget</category>
+      <category>City</category>
+      <pubDate>Tue, 02 Jun 2026 09:30:00 +0200</pubDate>
+      <media:thumbnail url="https://example.com/bridges.jpg"/>
+    </item>
+    <item>
+      <title>Only a guid</title>
+      <guid>https://example.com/guid-only</guid>
+      <description>Body from the description</description>
+      <enclosure url="https://example.com/photo.png" type="image/png"/>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Atom</title>
+  <entry>
+    <title>Rockets</title>
+    <link rel="alternate" href="https://example.com/rockets"/>
+    <link rel="enclosure" type="image/jpeg" href="https://example.com/rocket.jpg"/>
+    <id>tag:example.com,2026:rockets</id>
+    <updated>2026-06-03T10:00:00Z</updated>
+    <category term="Space"/>
+    <summary>Launch recap</summary>
+    <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Lift <b>off</b></p></div></content>
+  </entry>
+</feed>
+"""
+
+
+def test_rss_items():
+    first, second = FeedParser().feed(RSS)
+    
+    assert first.title == "Bridges & budgets"
+    assert first.link == "https://example.com/bridges"
+    assert first.body == "<p>The full story about bridges.</p>"
+    assert first.summary == "Short teaser"
+    assert first.tags == ["City", "Budget"]
+    assert first.published_at == datetime(2026, 6, 2, 7, 30)
+    assert first.image_url == "https://example.com/bridges.jpg"
+    
+    assert second.link == "https://example.com/guid-only"
+    assert (second.body, second.summary) == ("Body from the description", None)
+    assert second.image_url == "https://example.com/photo.png"
+
+
+def test_atom_entries():
+    [entry] = FeedParser().feed(ATOM)
+    
+    assert entry.link == "https://example.com/rockets"
+    assert entry.body == "<div><p>Lift <b>off</b></p></div>"
+    assert entry.summary == "Launch recap"
+    assert entry.tags == ["Space"]
+    assert entry.published_at == datetime(2026, 6, 3, 10, 0)
+    assert entry.image_url == "https://example.com/rocket.jpg"
+
+
+def test_items_come_out_as_bytes_arrive():
+    parser = FeedParser()
+    items = []
+    for start in range(0, len(RSS), 7):
+        items.extend(parser.feed(RSS[start:start + 7]))
+    items.extend(parser.close())
+    
+    assert items == FeedParser().feed(RSS)
+    # Finished items are dropped from the tree
+    assert len(parser._open) == 0
+
+
+def test_incoming_articles_are_sanitized():
+    item = FeedItem(
+        link="https://example.com/hostile",
+        title="Hostile <b>feed</b>",
+        body='<p onmouseover="steal()">Story</p><script>steal()</script><a href="javascript:steal()">more</a>',
+        summary=None, tags=[], published_at=None, image_url=None
+    )
+    
+    article = _incoming(item)
+    assert article.title == "Hostile feed"
+    assert article.body == "<p>Story</p><a>more</a>"
+    
+    # A body that is nothing but script falls back to the title
+    assert _incoming(item._replace(body="<script>steal()</script>")).body == "Hostile <b>feed</b>"
+
+
+def test_dates():
+    assert parse_date("Tue, 02 Jun 2026 09:30:00 GMT") == datetime(2026, 6, 2, 9, 30)
+    assert parse_date("2026-06-02T09:30:00+02:00") == datetime(2026, 6, 2, 7, 30)
+    assert parse_date("2026-06-02") == datetime(2026, 6, 2)
+    assert parse_date("yesterday") is None
+    assert parse_date(None) is None
+
+
+class FakeFeeds:
+    """Serves feeds by URL, answering 304 when the client sends the current ETag"""
+    
+    def __init__(self, feeds):
+        self.feeds = feeds
+        self.requests = []
+    
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        url = str(request.url)
+        if url not in self.feeds:
+            return httpx.Response(404)
+        etag = f'"{len(self.feeds[url])}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, content=self.feeds[url], headers={"ETag": etag})
+
+
+def test_poll_stores_new_items_and_skips_unchanged_feeds(database, monkeypatch):
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    from app.models.feed import FeedSource
+    from app.models.user import User, UserRole
+    server = FakeFeeds({"https://example.com/rss": RSS, "https://example.com/atom": ATOM})
+    client = httpx.AsyncClient
+    monkeypatch.setattr(
+        feed_ingestion.httpx, "AsyncClient",
+        lambda **options: client(transport=httpx.MockTransport(server.handle), **options)
+    )
+    ingestor = FeedIngestor(batch_size=2)
+    urls = ["https://example.com/rss", "https://example.com/atom", "https://example.com/missing"]
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="admin@example.com", password_hash="x", full_name="Admin", role=UserRole.ADMIN))
+            await db.commit()
+        first = await ingestor.poll(urls)
+        second = await ingestor.poll(urls)
+        async with AsyncSessionLocal() as db:
+            articles = (await db.execute(select(Article).order_by(Article.source_url))).scalars().all()
+            missing = await db.scalar(select(FeedSource).where(FeedSource.url == urls[2]))
+        return first, second, articles, missing
+    
+    first, second, articles, missing = database(scenario())
+    assert (first["fetched"], first["failed"], first["inserted"]) == (2, 1, 3)
+    assert (second["fetched"], second["not_modified"], second["inserted"]) == (0, 2, 0)
+    assert [article.source_url for article in articles] == [
+        "https://example.com/bridges", "https://example.com/guid-only", "https://example.com/rockets"
+    ]
+    assert articles[0].summary == "Short teaser"
+    assert articles[0].author_id == 1
+    assert missing.last_status == 404 and missing.error
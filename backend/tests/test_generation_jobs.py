@@ -0,0 +1,55 @@
+# tests/test_generation_jobs.py
+
+import asyncio
+from app.services.generation_jobs import GenerationJobRunner
+
+
+def test_leftovers_beyond_the_queue_size_all_run(database):
+    from app.database import AsyncSessionLocal
+    from app.models.generation import GenerationJob
+    
+    runner = GenerationJobRunner(workers=1, max_size=2)
+    ran = []
+    
+    async def fake_run(job_id):
+        await asyncio.sleep(0)
+        ran.append(job_id)
+    
+    runner._run = fake_run
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([GenerationJob(id=job_id, user_id=1) for job_id in range(1, 8)])
+            await db.commit()
+        await runner.start()
+        for _ in range(100):
+            if len(ran) == 7:
+                break
+            await asyncio.sleep(0.01)
+        await runner.close()
+    
+    database(scenario())
+    assert ran == list(range(1, 8))
+
+
+def test_job_is_claimed_once_and_records_its_outcome(database):
+    from app.database import AsyncSessionLocal
+    from app.models.generation import GenerationJob, GenerationStatus
+    from app.models.user import User
+    
+    runner = GenerationJobRunner()
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="editor@example.com", password_hash="x", full_name="Editor"))
+            db.add(GenerationJob(id=1, user_id=1, topics=["AI"]))
+            await db.commit()
+        # Not started: submit runs inline; the second run finds the job claimed
+        await asyncio.gather(runner.submit(1), runner.submit(1))
+        async with AsyncSessionLocal() as db:
+            return await db.get(GenerationJob, 1)
+    
+    job = database(scenario())
+    assert job.status == GenerationStatus.FAILED
+    assert job.error == "No recently published articles to generate from"
+    assert runner.failed == 1 and runner.completed == 0
@@ -0,0 +1,108 @@
+# tests/test_generation_service.py
+
+from datetime import datetime, timedelta
+from app.models.article import Article
+from app.services.generation_service import (
+    OTHER_SECTION, Candidate, CandidatePool, assemble_sections, drop_near_duplicates, rank_candidates
+)
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def candidate(id, hours_old=0, tags=(), views=0):
+    return Candidate(id, f"Story {id}", tags, NOW - timedelta(hours=hours_old), views)
+
+
+def ranking(candidates, topics=(), count=10):
+    return [c.id for _, c in rank_candidates(candidates, topics, count, now=NOW)]
+
+
+def test_newer_stories_rank_higher():
+    assert ranking([candidate(1, hours_old=200), candidate(2, hours_old=1), candidate(3, hours_old=50)]) == [2, 3, 1]
+
+
+def test_topic_match_and_engagement_lift_older_stories():
+    old_on_topic = candidate(1, hours_old=48, tags=["AI"])
+    fresh = candidate(3, hours_old=0)
+    
+    assert ranking([old_on_topic, fresh], topics=["ai"]) == [1, 3]
+    assert ranking([candidate(2, hours_old=48, views=5000), candidate(4, hours_old=40, views=3)]) == [2, 4]
+    # Tags only count for the topics asked for
+    assert ranking([old_on_topic, fresh]) == [3, 1]
+
+
+class PairedIndex:
+    """Stands in for the duplicate index: `pairs` are near-duplicates of each other"""
+    
+    def __init__(self, *pairs):
+        self.pairs = pairs
+    
+    def duplicates(self, article_id):
+        return [(b if a == article_id else a, 0.9) for a, b in self.pairs if article_id in (a, b)]
+
+
+def test_near_duplicates_of_a_better_story_are_skipped():
+    ranked = [(1.0 - i / 10, candidate(i)) for i in range(1, 6)]
+    
+    picked = drop_near_duplicates(ranked, 3, PairedIndex((1, 2), (3, 4)))
+    
+    assert [c.id for _, c in picked] == [1, 3, 5]
+
+
+def article(id, tags, summary=None, title=None):
+    return Article(id=id, title=title or f"Story {id}", body="", summary=summary, tags=tags,
+                   source_url=f"https://example.com/{id}")
+
+
+def test_sections_group_by_topic_and_fold_single_stories():
+    articles = [
+        article(1, ["AI"], summary="One"),
+        article(2, ["Space"]),
+        article(3, ["ai", "Space"], summary="Three"),
+        article(4, ["Climate"], summary="Four"),
+        article(5, [], summary="Five"),
+    ]
+    
+    html = assemble_sections(articles, ["AI"], excerpts={2: "Excerpt of two"})
+    
+    titles = [part.split("</h2>")[0] for part in html.split("<h2>")[1:]]
+    assert titles == ["AI", OTHER_SECTION]
+    assert html.index("Story 3") < html.index(OTHER_SECTION)
+    assert "Excerpt of two" in html
+    assert '<a href="https://example.com/4">Story 4</a>' in html
+
+
+def test_article_text_cannot_inject_template_tags():
+    html = assemble_sections([article(1, [], summary="Use {{ unsubscribe_url }}", title="{{{ content }}}")], [], {})
+    
+    assert "{{" not in html and "}}" not in html
+
+
+def test_candidate_pool_follows_changes_without_rescanning(database):
+    from app.database import AsyncSessionLocal
+    from app.models.user import User
+    pool = CandidatePool(timedelta(days=7), limit=3)
+    now = datetime.utcnow()
+    
+    def published(id, days_old):
+        return Article(id=id, title=f"Story {id}", body="b", author_id=1, tags=[],
+                       is_published=True, published_at=now - timedelta(days=days_old))
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="editor@example.com", password_hash="x", full_name="Editor"))
+            db.add_all([published(1, 1), published(2, 2), published(3, 30)])
+            db.add(Article(id=4, title="Draft", body="b", author_id=1, tags=[]))
+            await db.commit()
+            first = sorted(c.id for c in await pool.refresh(db))
+            
+            # Unpublish one, publish the draft, add newer stories past the limit
+            (await db.get(Article, 1)).is_published = False
+            draft = await db.get(Article, 4)
+            draft.is_published, draft.published_at = True, now
+            db.add_all([published(5, 0.5), published(6, 0.1)])
+            await db.commit()
+            second = sorted(c.id for c in await pool.refresh(db))
+        return first, second
+    
+    assert database(scenario()) == ([1, 2], [4, 5, 6])
@@ -0,0 +1,42 @@
+# tests/test_html_optimizer.py
+
+from app.services.html_optimizer import optimize_html
+
+
+def test_inlines_simple_selectors():
+    html = (
+        "<style>p{color:red} .x{margin:0} #i{padding:1px} table td{border:0} ul > li{list-style:none}</style>"
+        '<p class="x" id="i">hi</p><table><tr><td>c</td></tr></table>'
+        "<ul><li>l</li></ul><div><li>no</li></div>"
+    )
+    assert optimize_html(html).html == (
+        '<p class="x" id="i" style="color:red;margin:0;padding:1px">hi</p>'
+        '<table><tr><td style="border:0">c</td></tr></table>'
+        '<ul><li style="list-style:none">l</li></ul><div><li>no</li></div>'
+    )
+
+
+def test_specificity_and_existing_style():
+    html = '<style>.a{color:red} p.a{color:blue} p{margin:0}</style><p class="a" style="margin:1px">t</p><span class="a">s</span>'
+    assert optimize_html(html).html == (
+        '<p class="a" style="color:blue;margin:1px">t</p><span class="a" style="color:red">s</span>'
+    )
+
+
+def test_keeps_rules_it_cannot_inline():
+    html = "<style>a:hover{color:blue} @media (max-width:600px){p{color:green}}</style><p>t</p>"
+    assert optimize_html(html).html == (
+        "<style>a:hover{color:blue}@media (max-width:600px){p{color:green}}</style><p>t</p>"
+    )
+
+
+def test_minify_preserves_pre():
+    html = "<!-- note --><div>\n  <p>a   b</p>\n</div><pre>  x\n  y</pre>"
+    result = optimize_html(html)
+    assert result.html == "<div><p>a b</p></div><pre>  x\n  y</pre>"
+    assert result.original_bytes == len(html) and result.optimized_bytes == len(result.html)
+
+
+def test_inlining_can_be_disabled():
+    html = "<style>p { color: red }</style><p>t</p>"
+    assert optimize_html(html, inline_css=False).html == "<style>p { color: red }</style><p>t</p>"
@@ -0,0 +1,45 @@
+# tests/test_html_sanitizer.py
+
+from app.services.html_sanitizer import sanitize_html
+
+
+def test_safe_markup_is_kept():
+    html = '<p class="lead">Fish &amp; chips &#8212; <a href="https://example.com/a?x=1&amp;y=2" title="A">read</a><br/><img src="/i.png" alt=""></p>'
+
+    assert sanitize_html(html) == html.replace("<br/>", "<br />")
+
+
+def test_script_and_style_are_dropped_with_their_content():
+    html = "<p>Before</p><script>alert('x')</script><style>p { color: red }</style><p>After</p>"
+
+    assert sanitize_html(html) == "<p>Before</p><p>After</p>"
+    # Unclosed, mixed-case and nested embedding elements hide everything inside
+    assert sanitize_html("<p>Keep</p><SCRIPT>steal()") == "<p>Keep</p>"
+    assert sanitize_html("<iframe><object><p>x</p></object></iframe><p>Keep</p>") == "<p>Keep</p>"
+
+
+def test_event_handler_attributes_are_dropped():
+    html = '<img src="/i.png" onerror="steal()" ONLOAD="steal()"><p onclick="x()" id="p">Hi</p>'
+
+    assert sanitize_html(html) == '<img src="/i.png"><p id="p">Hi</p>'
+
+
+def test_script_urls_are_dropped():
+    for url in (
+        "javascript:alert(1)", "JavaScript:alert(1)", "  javascript:alert(1)",
+        "java\tscript:alert(1)", "java&#x09;script:alert(1)", "&#106;avascript:alert(1)",
+        "vbscript:msgbox(1)", "data:text/html;base64,PHNjcmlwdD4=", "data:image/svg+xml,<svg/>",
+    ):
+        assert sanitize_html(f'<a href="{url}">x</a>') == "<a>x</a>", url
+
+    assert sanitize_html('<img src="data:image/png;base64,AAAA">') == '<img src="data:image/png;base64,AAAA">'
+    assert sanitize_html('<img srcset="/a.png 1x, javascript:x() 2x">') == "<img>"
+    assert sanitize_html('<p style="width: expression(alert(1))">x</p>') == "<p>x</p>"
+    assert sanitize_html('<p style="color: red">x</p>') == '<p style="color: red">x</p>'
+
+
+def test_comments_and_stray_brackets_cannot_smuggle_markup():
+    assert sanitize_html("<!--[if IE]><script>x()</script><![endif]--><p>Hi</p>") == "<p>Hi</p>"
+    assert sanitize_html("<p>1 < 2</p>") == "<p>1 &lt; 2</p>"
+    assert sanitize_html('<a title="&quot;><script>">x</a>') == '<a title="&quot;&gt;&lt;script&gt;">x</a>'
+    assert sanitize_html(None) == ""
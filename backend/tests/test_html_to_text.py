@@ -0,0 +1,34 @@
+# tests/test_html_to_text.py
+
+from app.services.html_to_text import html_to_text
+
+
+def test_blocks_and_whitespace():
+    html = "<h1>Title</h1><p>First   line<br>second</p><div>after</div>"
+    assert html_to_text(html) == "Title\n=====\n\nFirst line\nsecond\n\nafter"
+
+
+def test_lists():
+    html = "<ul><li>one</li><li>two<ol><li>nested</li></ol></li></ul>"
+    assert html_to_text(html) == "* one\n* two\n  1. nested"
+
+
+def test_links_become_footnotes():
+    html = '<p><a href="https://x.org">site</a> and <a href="https://x.org">https://x.org</a></p>'
+    assert html_to_text(html) == "site [1] and https://x.org\n\n[1] https://x.org"
+    assert html_to_text(html, footnotes=False) == "site and https://x.org"
+
+
+def test_skipped_content():
+    html = "<head><title>t</title><style>p{}</style></head><p>body</p><script>x()</script>"
+    assert html_to_text(html) == "body"
+
+
+def test_no_stray_marker_before_blockquote():
+    html = "<p>before</p><blockquote><p>quoted</p></blockquote><p>after</p>"
+    assert html_to_text(html) == "before\n\n> quoted\n\nafter"
+
+
+def test_blank_lines_inside_blockquote_keep_marker():
+    html = "<blockquote><p>one</p><p>two</p><blockquote><p>inner</p></blockquote></blockquote>"
+    assert html_to_text(html) == "> one\n>\n> two\n>\n> > inner"
@@ -0,0 +1,125 @@
+# tests/test_keyword_tagger.py
+
+import numpy as np
+from app.services.keyword_tagger import DOCUMENTS_KEY, DocumentFrequencies, KeywordTagger, analyze, pick_keywords, term_hash
+
+BODY = (
+    "<p>Hospitals in Norway are experimenting with machine learning. For doctors, "
+    "machine learning is a second reader of each scan, and the early results of "
+    "machine learning are promising.</p>"
+)
+
+
+def test_phrases_break_at_stopwords_and_punctuation():
+    analysis = analyze("Machine Learning in Hospitals", BODY)
+    phrases = {candidate.words: candidate for candidate in analysis.candidates}
+    
+    assert phrases[("machine", "learning")].count == 4
+    assert phrases[("machine", "learning")].in_title
+    # The usual spelling, title-cased when it is all lowercase
+    assert phrases[("machine", "learning")].surface == "Machine Learning"
+    assert phrases[("second", "reader")].count == 1
+    assert phrases[("norway",)].surface == "Norway"
+    assert not any(word in ("in", "the", "of", "is") for words in phrases for word in words)
+
+
+def test_long_runs_fall_back_to_single_words():
+    analysis = analyze("", "Quarterly regional solar panel installation figures rose")
+    
+    assert sorted(candidate.words for candidate in analysis.candidates) == [
+        ("figures",), ("installation",), ("panel",), ("quarterly",), ("regional",), ("rose",), ("solar",)
+    ]
+
+
+def test_keywords_prefer_repeated_phrases_without_overlap():
+    analysis = analyze("Machine Learning in Hospitals", BODY)
+    idf = {value: 1.0 for value in analysis.terms.tolist()}
+    
+    keywords = pick_keywords(analysis, idf, 3)
+    
+    assert keywords[0] == "Machine Learning"
+    assert len(keywords) == 3
+    assert not any("Machine" in keyword for keyword in keywords[1:])
+
+
+def test_rare_terms_outscore_common_ones():
+    analysis = analyze("", "Budget talks. Budget talks. Quantum sensors. Quantum sensors.")
+    common = {term_hash("budget"), term_hash("talks")}
+    idf = {value: (1.0 if value in common else 5.0) for value in analysis.terms.tolist()}
+    
+    assert pick_keywords(analysis, idf, 1) == ["Quantum sensors"]
+
+
+def test_frequencies_merge_pending_increments():
+    frequencies = DocumentFrequencies()
+    frequencies.loaded = True
+    a, b, c = (np.array([term_hash(term)], dtype=np.uint64) for term in ("alpha", "beta", "gamma"))
+    
+    frequencies.apply(np.concatenate((a, b)), np.array([2, 1]), documents=2)
+    frequencies.apply(a, np.array([1]), documents=1)
+    
+    assert frequencies.lookup(np.concatenate((a, b, c))).tolist() == [3, 1, 0]
+    assert len(frequencies) == 2  # merges the pending dict into the arrays
+    assert frequencies.lookup(np.concatenate((a, b, c))).tolist() == [3, 1, 0]
+    idf = frequencies.idf(np.concatenate((a, c)))
+    assert idf[int(c[0])] > idf[int(a[0])]
+
+
+def test_counts_apply_on_commit_only(database):
+    from app.database import AsyncSessionLocal
+    tagger = KeywordTagger()
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await tagger.frequencies.ensure_loaded(db)
+            analysis, _ = await tagger.extract(db, "Rolled back", "Quantum sensors")
+            await tagger.frequencies.store(db, analysis.terms, np.ones(len(analysis.terms), dtype=np.int64), 1)
+            await db.rollback()
+            after_rollback = tagger.frequencies.documents
+            
+            analysis, keywords = await tagger.extract(db, "Kept", "Quantum sensors")
+            await tagger.record(db, 1, analysis, keywords)
+            uncommitted = tagger.frequencies.documents
+            await db.commit()
+            quantum = tagger.frequencies.lookup(np.array([term_hash("quantum")], dtype=np.uint64))
+            
+            # A fresh process reads the same counts back
+            fresh = DocumentFrequencies()
+            await fresh.ensure_loaded(db)
+        return after_rollback, uncommitted, tagger.frequencies.documents, int(quantum[0]), fresh.documents
+    
+    assert database(scenario()) == (0, 0, 1, 1, 1)
+
+
+def test_backfill_tags_each_article_once(database):
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    from app.models.keyword import KeywordTerm
+    from app.models.user import User
+    tagger = KeywordTagger(count=2)
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="editor@example.com", password_hash="x", full_name="Editor"))
+            db.add_all([
+                Article(id=1, title="Machine Learning in Hospitals", body=BODY, author_id=1, tags=[]),
+                Article(id=2, title="Quantum sensors", body="Quantum sensors map caves.", author_id=1, tags=["Science"]),
+            ])
+            await db.commit()
+            first = await tagger.backfill(db, batch_size=1)
+            again = await tagger.backfill(db)
+            kept = await db.scalar(select(Article.tags).where(Article.id == 2))
+            redone = await tagger.backfill(db, overwrite=True)
+            tags = dict((await db.execute(select(Article.id, Article.tags))).all())
+            documents = await db.scalar(select(KeywordTerm.documents).where(KeywordTerm.term_hash == DOCUMENTS_KEY))
+            untagged = await tagger.untagged_count(db)
+        return first, again, kept, redone, tags, documents, untagged
+    
+    first, again, kept, redone, tags, documents, untagged = database(scenario())
+    assert (first, again, redone) == (2, 0, 2)
+    assert tags[1][0] == "Machine Learning"
+    assert kept == ["Science"]  # hand-set tags survive a plain backfill
+    assert tags[2][0] == "Quantum sensors"  # replaced only with overwrite
+    assert documents == 2  # re-tagging does not count an article twice
+    assert untagged == 0
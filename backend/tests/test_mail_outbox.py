@@ -0,0 +1,108 @@
+# tests/test_mail_outbox.py
+
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.models.delivery import DeliveryStatus, OutboxEmail
+from app.services import mail_outbox as outbox_module
+from app.services.email_service import DeliveryFailure
+from app.services.mail_outbox import MailOutbox
+
+GREYLISTED = DeliveryFailure(450, "Greylisted", transient=True)
+NO_SUCH_USER = DeliveryFailure(550, "No such user", transient=False)
+
+
+class FakeOutbox(MailOutbox):
+    """Sends nowhere; `failures` maps an address to the replies of its successive attempts"""
+    
+    def __init__(self, failures=None, **options):
+        super().__init__(**options)
+        self.failures = {address: list(replies) for address, replies in (failures or {}).items()}
+        self.attempted = []
+    
+    async def _send(self, email):
+        self.attempted.append(email.to_email)
+        replies = self.failures.get(email.to_email)
+        return replies.pop(0) if replies else None
+
+
+async def outbox_rows():
+    from app.database import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(OutboxEmail).order_by(OutboxEmail.id))).scalars().all()
+
+
+def test_sends_inline_until_started():
+    outbox = FakeOutbox()
+    
+    asyncio.run(outbox.enqueue("a@example.com", "Subject", "<p>Hi</p>"))
+    
+    assert outbox.attempted == ["a@example.com"]
+    assert outbox.metrics()["sent"] == 1
+
+
+def test_persisted_emails_are_retried_then_deleted_or_dead_lettered(database, monkeypatch):
+    monkeypatch.setattr(outbox_module, "retry_delay", lambda attempts: 0.01)
+    outbox = FakeOutbox(
+        {"retry@example.com": [GREYLISTED], "bounce@example.com": [NO_SUCH_USER]},
+        persist=True
+    )
+    
+    async def scenario():
+        await outbox.start()
+        for address in ("ok@example.com", "retry@example.com", "bounce@example.com"):
+            await outbox.enqueue(address, "Reset your password", "<p>token=secret</p>")
+        while outbox.metrics()["depth"]:
+            await asyncio.sleep(0.01)
+        await outbox.close()
+        return await outbox_rows()
+    
+    [dead] = database(scenario())
+    assert sorted(outbox.attempted) == ["bounce@example.com", "ok@example.com", "retry@example.com", "retry@example.com"]
+    assert (outbox.sent, outbox.failed, outbox.retried) == (2, 1, 1)
+    assert (dead.to_email, dead.status, dead.smtp_code) == ("bounce@example.com", DeliveryStatus.FAILED, 550)
+    # A dead letter keeps no body (it may hold a token) and no claim
+    assert dead.html_content == ""
+    assert dead.claimed_by is None
+
+
+def test_only_expired_claims_are_taken_over(database):
+    from app.database import AsyncSessionLocal
+    outbox = FakeOutbox(persist=True)
+    
+    async def scenario():
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                OutboxEmail(to_email="live@example.com", subject="s", html_content="h",
+                            claimed_by="other", claimed_until=now + timedelta(minutes=5)),
+                OutboxEmail(to_email="dead@example.com", subject="s", html_content="h",
+                            claimed_by="other", claimed_until=now - timedelta(seconds=1)),
+                OutboxEmail(to_email="released@example.com", subject="s", html_content="h"),
+            ])
+            await db.commit()
+        await outbox.start()
+        await outbox.close()
+        return await outbox_rows()
+    
+    [live] = database(scenario())
+    assert sorted(outbox.attempted) == ["dead@example.com", "released@example.com"]
+    assert (live.to_email, live.claimed_by) == ("live@example.com", "other")
+
+
+def test_a_taken_over_email_is_not_sent_by_its_old_owner(database):
+    first = FakeOutbox(persist=True)
+    second = FakeOutbox(persist=True)
+    
+    async def scenario():
+        email = outbox_module.QueuedEmail("a@example.com", "s", "h")
+        email.outbox_id = await first._store(email)
+        assert await first._renew_claim(email)
+        # The claim lapses and another process takes the email over
+        first.claim_timeout = -1
+        await first._renew_claim(email)
+        second._queue = asyncio.Queue()
+        assert await second._take_over() == 1
+        return await first._renew_claim(email), await second._renew_claim(second._pending[0])
+    
+    assert database(scenario()) == (False, True)
@@ -0,0 +1,71 @@
+# tests/test_mime_cache.py
+
+from email import message_from_bytes, policy
+from app.services.mime_cache import PreparedMessage, PreparedMessageCache
+
+
+def parse(raw: bytes):
+    return message_from_bytes(raw, policy=policy.default)
+
+
+def test_render_splices_recipient_headers_onto_shared_body():
+    prepared = PreparedMessage("Weekly digest", "<p>Hello</p>", "Hello")
+
+    first = parse(prepared.render("a@example.com", "https://example.com/u?t=1", "<1@example.com>"))
+    second = parse(prepared.render("b@example.com"))
+
+    assert first["To"] == "a@example.com"
+    assert first["Message-ID"] == "<1@example.com>"
+    assert first["List-Unsubscribe"] == "<https://example.com/u?t=1>"
+    assert first["Subject"] == "Weekly digest"
+    assert second["To"] == "b@example.com"
+    assert second["List-Unsubscribe"] is None
+    assert second["Message-ID"] != first["Message-ID"]
+
+    # Both carry the same encoded parts
+    for message in (first, second):
+        assert message.get_body(("plain",)).get_content().strip() == "Hello"
+        assert message.get_body(("html",)).get_content().strip() == "<p>Hello</p>"
+
+
+def test_long_unsubscribe_url_is_not_folded():
+    url = "https://example.com/unsubscribe?token=" + "x" * 300
+    raw = PreparedMessage("Subject", "<p>Hi</p>").render("a@example.com", url)
+
+    assert f"List-Unsubscribe: <{url}>\r\n".encode() in raw
+
+
+def test_non_ascii_headers_and_long_lines_are_encoded():
+    html = "<p>" + "word " * 400 + "</p>"
+    prepared = PreparedMessage("Résumé de la semaine", html, "Été")
+    raw = prepared.render("Zoë <zoe@example.com>")
+
+    assert all(len(line) <= 998 for line in raw.split(b"\r\n"))
+    message = parse(raw)
+    assert message["Subject"] == "Résumé de la semaine"
+    assert message["To"] == "Zoë <zoe@example.com>"
+    assert message.get_body(("plain",)).get_content().strip() == "Été"
+    assert message.get_body(("html",)).get_content().strip() == html
+
+
+def test_from_payload_round_trips():
+    prepared = PreparedMessage("Subject", "<p>Hi</p>", "Hi")
+    restored = PreparedMessage.from_payload(prepared.payload)
+
+    assert len(restored) == len(prepared)
+    assert parse(restored.render("a@example.com")).get_body(("html",)).get_content().strip() == "<p>Hi</p>"
+
+
+def test_cache_reuses_and_evicts_least_recently_used():
+    cache = PreparedMessageCache(max_entries=2)
+
+    first = cache.get_or_create(("newsletter", 1), "One", "<p>1</p>")
+    assert cache.get_or_create(("newsletter", 1), "One", "<p>1</p>") is first
+
+    cache.get_or_create(("newsletter", 2), "Two", "<p>2</p>")
+    cache.get(("newsletter", 1))
+    cache.get_or_create(("newsletter", 3), "Three", "<p>3</p>")
+
+    assert cache.get(("newsletter", 1)) is first
+    assert cache.get(("newsletter", 2)) is None
+    assert cache.get(("newsletter", 3)) is not None
@@ -0,0 +1,40 @@
+# tests/test_newsletter_service.py
+
+import asyncio
+from app.models.newsletter import Newsletter
+from app.services.artifact_store import artifact_store
+from app.services.newsletter_service import compile_newsletter
+from app.services.template_engine import compiled_templates
+
+
+def braced_newsletter(newsletter_id: int) -> Newsletter:
+    return Newsletter(
+        id=newsletter_id,
+        title="Learn {{#x}} syntax, not {{ unsubscribe_url }}",
+        subject="Hello",
+        content_html=(
+            "<style>h1{color:red}</style><h1>{{ newsletter.title }}</h1>"
+            '<p><a href="{{ unsubscribe_url }}">Unsubscribe</a></p>'
+        ),
+    )
+
+
+def check_rendered(compiled):
+    html, _ = compiled.render({"unsubscribe_url": "https://x.org/u?token=secret"})
+    assert '<h1 style="color:red">Learn {{#x}} syntax, not {{ unsubscribe_url }}</h1>' in html
+    assert html.count("secret") == 1
+    assert compiled.variables == {"unsubscribe_url"}
+
+
+def test_title_with_template_syntax_stays_literal():
+    check_rendered(asyncio.run(compile_newsletter(braced_newsletter(1001))))
+
+
+def test_stored_artifact_keeps_title_literal():
+    newsletter = braced_newsletter(1002)
+    asyncio.run(compile_newsletter(newsletter))
+    # Drop the in-memory copy so the merged HTML comes back from the artifact store
+    compiled_templates._entries.clear()
+    hits = artifact_store.hits
+    check_rendered(asyncio.run(compile_newsletter(newsletter)))
+    assert artifact_store.hits == hits + 1
@@ -0,0 +1,68 @@
+# tests/test_newsletters.py
+
+import httpx
+from app.core.security import get_current_user_email
+
+
+def editor_client():
+    from app.main import app
+    app.dependency_overrides[get_current_user_email] = lambda: "editor@example.com"
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def add_editor():
+    from app.database import AsyncSessionLocal
+    from app.models.user import User
+    
+    async def run():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="editor@example.com", password_hash="x", full_name="Editor"))
+            await db.commit()
+    return run()
+
+
+def test_plain_text_part_follows_the_html_until_edited(database):
+    from app.main import app
+    database(add_editor())
+    
+    async def scenario():
+        steps = []
+        async with editor_client() as client:
+            created = await client.post("/api/newsletters/", json={"title": "t", "subject": "s", "content_html": "<p>First</p>"})
+            newsletter_id = created.json()["id"]
+            steps.append(created.json())
+            for change in (
+                {"content_html": "<p>Second</p>"},
+                {"content_text": "Written by hand"},
+                {"content_html": "<p>Third</p>"},
+                {"content_text": ""},
+            ):
+                response = await client.put(f"/api/newsletters/{newsletter_id}", json=change)
+                steps.append(response.json())
+        app.dependency_overrides.clear()
+        return [(step["content_text"], step["content_text_generated"]) for step in steps]
+    
+    assert database(scenario()) == [
+        ("First", True),
+        ("Second", True),  # regenerated with the HTML
+        ("Written by hand", False),
+        ("Written by hand", False),  # a hand-written part is never overwritten
+        ("Third", True),  # clearing it asks for a generated one again
+    ]
+
+
+def test_hand_written_text_on_create_is_kept(database):
+    from app.main import app
+    database(add_editor())
+    
+    async def scenario():
+        async with editor_client() as client:
+            response = await client.post(
+                "/api/newsletters/",
+                json={"title": "t", "subject": "s", "content_html": "<p>html</p>", "content_text": "text"}
+            )
+        app.dependency_overrides.clear()
+        return response.json()
+    
+    body = database(scenario())
+    assert (body["content_text"], body["content_text_generated"]) == ("text", False)
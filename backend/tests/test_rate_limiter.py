@@ -0,0 +1,102 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import pytest
+from app.services import rate_limiter
+from app.services.rate_limiter import DeliveryRateLimiter, TokenBucket, email_domain
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.monotonic for the limiter module"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_starts_full_and_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    for _ in range(2):
+        assert bucket.delay(clock[0]) == 0
+        bucket.take()
+    assert bucket.delay(clock[0]) == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert bucket.delay(clock[0]) == 0
+
+    # Never refills beyond capacity
+    clock[0] += 60
+    bucket.delay(clock[0])
+    assert bucket.tokens == 2
+    assert bucket.is_full
+
+
+def test_domain_limit_applies_per_domain(clock):
+    limiter = DeliveryRateLimiter(domain_rate=1, domain_rates={"Slow.example": 0.5})
+
+    assert limiter.reserve("a.example") == 0
+    assert limiter.reserve("a.example") == pytest.approx(1.0)
+    # Another domain has its own bucket
+    assert limiter.reserve("b.example") == 0
+    # Overrides are matched case-insensitively
+    assert limiter.reserve("SLOW.example") == 0
+    assert limiter.reserve("slow.example") == pytest.approx(2.0)
+
+
+def test_first_message_to_a_new_domain_goes_straight_out():
+    # Real clock: the bucket is created after reserve() reads the time
+    limiter = DeliveryRateLimiter(domain_rate=0.01)
+
+    assert all(limiter.reserve(f"d{i}.example") == 0 for i in range(100))
+
+
+def test_global_limit_caps_every_domain(clock):
+    limiter = DeliveryRateLimiter(global_rate=2, domain_rate=10)
+
+    assert limiter.reserve("a.example") == 0
+    assert limiter.reserve("b.example") == 0
+    assert limiter.reserve("c.example") == pytest.approx(0.5)
+
+    # A refused reservation takes no token from either bucket
+    domain_bucket = limiter._domain_buckets["c.example"]
+    assert domain_bucket.tokens == domain_bucket.capacity
+
+
+def test_zero_rates_disable_limits(clock):
+    limiter = DeliveryRateLimiter()
+
+    assert all(limiter.reserve("a.example") == 0 for _ in range(1000))
+    assert limiter._domain_buckets == {}
+
+
+def test_acquire_waits_or_returns_remaining_wait():
+    limiter = DeliveryRateLimiter(domain_rate=20, domain_rates={"slow.example": 0.01})
+
+    async def scenario():
+        limiter.reserve("fast.example")
+        limiter.reserve("slow.example")
+        # A short wait is slept through, a long one is handed back
+        fast = await limiter.acquire("fast.example", max_wait=1.0)
+        slow = await limiter.acquire("slow.example", max_wait=1.0)
+        return fast, slow
+
+    fast, slow = asyncio.run(scenario())
+    assert fast is None
+    assert slow == pytest.approx(100, rel=0.01)
+
+
+def test_idle_domain_buckets_are_pruned(clock, monkeypatch):
+    monkeypatch.setattr(DeliveryRateLimiter, "MAX_TRACKED_DOMAINS", 3)
+    limiter = DeliveryRateLimiter(domain_rate=1)
+
+    for name in ("a", "b", "c"):
+        limiter.reserve(f"{name}.example")
+    clock[0] += 10
+    limiter.reserve("d.example")
+
+    assert list(limiter._domain_buckets) == ["d.example"]
+
+
+def test_email_domain():
+    assert email_domain("Reader@Mail.Example") == "mail.example"
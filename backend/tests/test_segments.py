@@ -0,0 +1,47 @@
+# tests/test_segments.py
+
+import asyncio
+from app.models.newsletter import Newsletter
+from app.services import newsletter_service
+from app.services.newsletter_service import build_newsletter_sender
+from tests.test_email_service import recipient
+
+
+def follower(number: int, *topics: str):
+    return recipient(number)._replace(full_name=f"Reader {number}", preferences={"topics": list(topics)})
+
+
+def test_each_segment_is_rendered_once(relay, monkeypatch):
+    fake = relay()
+    rendered = []
+    render_segment = newsletter_service.render_segment
+    
+    async def counting(newsletter, compiled, signature, context=None):
+        rendered.append(signature)
+        return await render_segment(newsletter, compiled, signature, context)
+    
+    monkeypatch.setattr(newsletter_service, "render_segment", counting)
+    newsletter = Newsletter(
+        id=4001, title="Topics", subject="Topics",
+        content_html="{{#subscriber.topics.AI}}<p>AI news</p>{{/subscriber.topics.AI}}<p>Everyone</p>"
+    )
+    readers = [follower(1, "AI"), follower(2), follower(3, "AI", "Space"), follower(4, "Space")]
+    
+    async def scenario():
+        send, _ = await build_newsletter_sender(newsletter)
+        for reader in readers:
+            assert await send([reader]) == {}
+        await send(readers)
+    
+    asyncio.run(scenario())
+    # Only the slot the template uses splits segments: followers of AI and everyone else
+    assert len(rendered) == 2
+    assert set(rendered) == {(None,), (True,)}
+    bodies = {tuple(recipients): message.as_string() for recipients, message in fake.transactions}
+    assert "AI news" in bodies[("reader1@example.com",)]
+    assert "AI news" not in bodies[("reader4@example.com",)]
+    # A mixed batch goes out as one transaction per segment
+    assert sorted(key for key in bodies if len(key) > 1) == [
+        ("reader1@example.com", "reader3@example.com"),
+        ("reader2@example.com", "reader4@example.com"),
+    ]
@@ -0,0 +1,103 @@
+# tests/test_smtp_pool.py
+
+import asyncio
+import pytest
+from aiosmtplib.errors import SMTPResponseException, SMTPServerDisconnected
+from app.services.smtp_pool import PooledConnection, SMTPConnectionPool
+
+
+class FakeSMTP:
+    """Stands in for aiosmtplib.SMTP; `failures` are raised by successive sendmail calls"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.failures = pool.failures
+        self.is_connected = True
+        self.sent = 0
+
+    async def sendmail(self, sender, recipients, message):
+        self.pool.active += 1
+        self.pool.peak = max(self.pool.peak, self.pool.active)
+        try:
+            await asyncio.sleep(0.001)
+            if self.failures:
+                failure = self.failures.pop(0)
+                if failure is not None:
+                    if isinstance(failure, SMTPServerDisconnected):
+                        self.is_connected = False
+                    raise failure
+            self.sent += 1
+            return {}, "250 OK"
+        finally:
+            self.pool.active -= 1
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+class FakePool(SMTPConnectionPool):
+    def __init__(self, failures=(), **options):
+        super().__init__("localhost", 25, **options)
+        self.failures = list(failures)
+        self.active = 0
+        self.peak = 0
+        self.sessions = []
+
+    async def _connect(self):
+        smtp = FakeSMTP(self)
+        self.sessions.append(smtp)
+        self.connections_opened += 1
+        return PooledConnection(smtp)
+
+
+def send(pool, count=1):
+    async def run():
+        for _ in range(count):
+            await pool.sendmail("from@example.com", ["to@example.com"], b"message")
+    asyncio.run(run())
+
+
+def test_sessions_are_reused_and_recycled():
+    pool = FakePool(max_messages=2)
+    send(pool, 5)
+    assert pool.messages_sent == 5
+    assert pool.connections_opened == 3  # 2 + 2 + 1
+    assert [smtp.sent for smtp in pool.sessions] == [2, 2, 1]
+
+
+def test_disconnect_is_retried_once_on_a_new_session():
+    pool = FakePool(failures=[SMTPServerDisconnected("gone")])
+    send(pool)
+    assert pool.connections_opened == 2
+    assert pool.messages_sent == 1
+
+
+def test_421_reconnects_but_other_rejections_keep_the_session():
+    pool = FakePool(failures=[SMTPResponseException(550, "no such user")])
+    with pytest.raises(SMTPResponseException):
+        send(pool)
+    send(pool)
+    assert pool.connections_opened == 1
+
+    pool = FakePool(failures=[SMTPResponseException(421, "try later")])
+    send(pool)
+    assert pool.connections_opened == 2
+    assert not pool.sessions[0].is_connected
+
+
+def test_pool_size_bounds_concurrent_sessions():
+    pool = FakePool(size=2)
+
+    async def run():
+        await asyncio.gather(*(
+            pool.sendmail("from@example.com", ["to@example.com"], b"message") for _ in range(10)
+        ))
+        await pool.close()
+
+    asyncio.run(run())
+    assert pool.messages_sent == 10
+    assert pool.peak == 2 and pool.connections_opened == 2
+    assert not any(smtp.is_connected for smtp in pool.sessions)
@@ -0,0 +1,91 @@
+# tests/test_summarizer.py
+
+import numpy as np
+from app.services.summarizer import MAX_SUMMARY_CHARS, _rank_group, backfill_summaries, split_sentences, summarize, summarize_batch
+
+ARTICLE = (
+    "The city council approved a new budget for public transport on Monday. "
+    "The budget adds electric buses to every public transport route in the city. "
+    "Council members said electric buses will cut transport emissions sharply. "
+    "Lunch was served afterwards. "
+    "Critics argued the transport budget ignores cyclists and pedestrians entirely. "
+    "The weather was mild."
+)
+
+
+def test_sentences_split_on_punctuation_but_not_abbreviations():
+    text = "Dr. Smith met Mr. Jones at 5 p.m. in the U.S. office. They talked!\nA new line starts here"
+    
+    assert split_sentences(text) == [
+        "Dr. Smith met Mr. Jones at 5 p.m. in the U.S. office.",
+        "They talked!",
+        "A new line starts here",
+    ]
+
+
+def test_summary_keeps_central_sentences_in_reading_order():
+    summary = summarize(ARTICLE, sentences=2)
+    
+    assert "Lunch" not in summary and "weather" not in summary
+    picked = split_sentences(summary)
+    assert len(picked) == 2
+    assert [ARTICLE.index(sentence) for sentence in picked] == sorted(ARTICLE.index(sentence) for sentence in picked)
+
+
+def test_short_articles_and_html_bodies():
+    html = "<h1>Title here</h1><p>Only one real sentence in this short body.</p>"
+    
+    assert summarize_batch(["", html]) == ["", "Title here Only one real sentence in this short body."]
+
+
+def test_summaries_are_capped():
+    sentence = "Transport " + "budget electric buses council " * 20 + "end."
+    long_text = " ".join([sentence] * 8)
+    
+    summary = summarize(long_text)
+    
+    assert len(summary) <= MAX_SUMMARY_CHARS + 3
+    assert summary.endswith("...")
+
+
+def test_batched_power_iteration_matches_one_graph_at_a_time():
+    rng = np.random.default_rng(7)
+    graphs = []
+    for n in (3, 5, 8):
+        matrix = rng.random((n, n))
+        matrix = (matrix + matrix.T) / 2
+        np.fill_diagonal(matrix, 0.0)
+        graphs.append(matrix)
+    
+    together = _rank_group(graphs)
+    alone = [_rank_group([matrix])[0] for matrix in graphs]
+    
+    for batched, single in zip(together, alone):
+        np.testing.assert_allclose(batched, single, atol=1e-5)
+        assert abs(batched.sum() - 1.0) < 1e-3
+
+
+def test_backfill_fills_missing_summaries(database):
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    from app.models.user import User
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="editor@example.com", password_hash="x", full_name="Editor"))
+            db.add_all([
+                Article(id=1, title="a", body=ARTICLE, author_id=1),
+                Article(id=2, title="b", body=ARTICLE, author_id=1, summary="Written by hand"),
+                Article(id=3, title="c", body="<p>Short body sentence for the third article.</p>", author_id=1),
+            ])
+            await db.commit()
+            done = await backfill_summaries(db, batch_size=1)
+            summaries = dict((await db.execute(select(Article.id, Article.summary).order_by(Article.id))).all())
+        return done, summaries
+    
+    done, summaries = database(scenario())
+    assert done == 2
+    assert summaries[1] == summarize(ARTICLE)
+    assert summaries[2] == "Written by hand"
+    assert summaries[3] == "Short body sentence for the third article."
@@ -0,0 +1,127 @@
+# tests/test_template_engine.py
+
+import asyncio
+import httpx
+import pytest
+from datetime import datetime
+from app.core.security import get_current_user_email
+from app.models.newsletter import Newsletter
+from app.models.template import Template
+from app.services.newsletter_service import compile_newsletter
+from app.services.template_engine import TemplateCache, TemplateError, compile_template
+
+
+def test_variables_are_escaped_unless_raw():
+    compiled = compile_template("<p>{{ name }}</p>{{{ body }}}{{ missing }}")
+    
+    html = compiled.render({"name": "<Ann & Bob>", "body": "<b>bold</b>"})
+    
+    assert html == "<p>&lt;Ann &amp; Bob&gt;</p><b>bold</b>"
+    assert compiled.variables == {"name", "body", "missing"}
+
+
+def test_plain_text_templates_are_not_escaped():
+    compiled = compile_template("Hi {{ name }}", autoescape=False)
+    
+    assert compiled.render({"name": "Ann & Bob"}) == "Hi Ann & Bob"
+
+
+def test_sections_and_inverted_sections():
+    compiled = compile_template("{{#vip}}Welcome back{{/vip}}{{^vip}}Hello{{/vip}}, {{ name }}")
+    
+    assert compiled.render({"vip": True, "name": "Ann"}) == "Welcome back, Ann"
+    assert compiled.render({"name": "Bob"}) == "Hello, Bob"
+
+
+def test_static_templates_render_without_a_context():
+    compiled = compile_template("<p>No slots here</p>")
+    
+    assert compiled.is_static
+    assert compiled.render() == "<p>No slots here</p>"
+
+
+@pytest.mark.parametrize("source", ["{{#a}}never closed", "{{/a}}", "{{#a}}{{#b}}{{/a}}{{/b}}"])
+def test_unbalanced_sections_are_rejected(source):
+    with pytest.raises(TemplateError):
+        compile_template(source)
+
+
+def test_source_round_trips():
+    source = "<h1>{{ title }}</h1>{{{ content }}}{{#vip}}<b>{{ name }}</b>{{/vip}}{{^vip}}-{{/vip}}"
+    compiled = compile_template(source)
+    again = compile_template(compiled.source())
+    context = {"title": "T", "content": "<i>c</i>", "vip": True, "name": "N"}
+    
+    assert again.render(context) == compiled.render(context)
+    assert again.variables == compiled.variables
+
+
+def test_cache_compiles_each_version_once():
+    cache = TemplateCache(max_entries=2)
+    
+    first = cache.get_or_compile(("template", 1, "v1"), "{{ a }}")
+    assert cache.get_or_compile(("template", 1, "v1"), "ignored") is first
+    cache.get_or_compile(("template", 2, "v1"), "{{ b }}")
+    cache.get_or_compile(("template", 3, "v1"), "{{ c }}")
+    
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.get(("template", 1, "v1")) is None
+
+
+def test_newsletter_is_merged_into_its_template():
+    template = Template(
+        id=3001, name="Layout", updated_at=datetime(2026, 1, 1),
+        html_content="<html><body><h1>{{ newsletter.title }}</h1>{{{ content }}}<p>{{ subscriber.full_name }}</p></body></html>"
+    )
+    newsletter = Newsletter(id=3001, title="Issue 1", subject="s", content_html="<p>Body for {{ subscriber.first_name }}</p>")
+    
+    compiled = asyncio.run(compile_newsletter(newsletter, template))
+    html, _ = compiled.render({"subscriber.full_name": "Ann Lee", "subscriber.first_name": "Ann"})
+    
+    assert "<h1>Issue 1</h1><p>Body for Ann</p><p>Ann Lee</p>" in html
+    # Newsletter values are bound once; only recipient slots stay open
+    assert compiled.variables == {"subscriber.full_name", "subscriber.first_name"}
+
+
+def test_template_route_rejects_sources_that_do_not_compile(database):
+    from app.main import app
+    
+    async def scenario():
+        app.dependency_overrides[get_current_user_email] = lambda: "editor@example.com"
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            responses = [
+                await client.post("/api/templates/", json={"name": name, "html_content": source})
+                for name, source in (("broken", "{{#a}}open"), ("fine", "{{{ content }}}"))
+            ]
+        app.dependency_overrides.clear()
+        return responses
+    
+    broken, fine = database(scenario())
+    assert broken.status_code == 400
+    assert "Unclosed section" in broken.json()["detail"]
+    assert fine.status_code == 201
+
+
+def test_bind_substitutes_known_values_and_keeps_recipient_slots():
+    compiled = compile_template(
+        "<h1>{{ title }}</h1>{{#draft}}DRAFT{{/draft}}{{#subscriber.vip}}VIP{{/subscriber.vip}}"
+        "<p>{{ subscriber.name }}</p>{{ unused }}"
+    )
+    
+    bound = compiled.bind({"title": "A & B", "draft": False}, keep=lambda name: name.startswith("subscriber."))
+    
+    assert bound.variables == {"subscriber.vip", "subscriber.name"}
+    assert bound.render({"subscriber.vip": True, "subscriber.name": "Ann"}) == "<h1>A &amp; B</h1>VIP<p>Ann</p>"
+    assert bound.render({"subscriber.name": "Bob"}) == "<h1>A &amp; B</h1><p>Bob</p>"
+
+
+def test_bind_splices_a_compiled_body_into_a_layout():
+    layout = compile_template("<main>{{{ content }}}</main><footer>{{ unsubscribe_url }}</footer>")
+    body = compile_template("<p>{{ title }} for {{ subscriber.name }}</p>")
+    
+    merged = layout.bind({"content": body, "title": "Issue 7"}, keep=lambda name: name != "title")
+    
+    assert merged.variables == {"subscriber.name", "unsubscribe_url"}
+    assert merged.render({"subscriber.name": "Ann", "unsubscribe_url": "u"}) == (
+        "<main><p>Issue 7 for Ann</p></main><footer>u</footer>"
+    )
@@ -0,0 +1,95 @@
+# tests/test_topic_clustering.py
+
+import random
+import numpy as np
+from app.core.config import settings
+from app.services.topic_clustering import SparseRows, build_matrix, count_terms, fit_vocabulary, minibatch_kmeans, recluster
+
+THEMES = {
+    "space": "rocket orbit launch satellite astronaut lunar mission telescope galaxy",
+    "football": "goal striker league match referee penalty stadium keeper midfield",
+    "cooking": "recipe oven garlic butter simmer pasta sauce kitchen flavour",
+}
+
+
+def themed_texts(theme: str, count: int, seed: int):
+    rng = random.Random(seed)
+    words = THEMES[theme].split()
+    return [" ".join(rng.choice(words) for _ in range(30)) for _ in range(count)]
+
+
+def test_take_selects_rows():
+    matrix = SparseRows(np.array([0, 2, 3, 5]), np.array([0, 1, 2, 0, 3]), np.array([1.0, 2.0, 3.0, 4.0, 5.0]))
+    
+    picked = matrix.take(np.array([2, 0]))
+    
+    assert picked.indptr.tolist() == [0, 2, 4]
+    assert picked.indices.tolist() == [0, 3, 0, 1]
+    assert picked.data.tolist() == [4.0, 5.0, 1.0, 2.0]
+
+
+def test_rows_are_unit_length_and_empty_documents_skipped():
+    vocabulary = {}
+    documents = count_terms(["rocket orbit rocket", "", "goal keeper"], vocabulary, grow=True)
+    kept, remap, idf = fit_vocabulary(documents, len(vocabulary), max_terms=100)
+    
+    matrix, positions = build_matrix(documents, idf, remap)
+    
+    assert positions == [0, 2]
+    norms = np.sqrt(np.add.reduceat(matrix.data ** 2, matrix.indptr[:-1]))
+    np.testing.assert_allclose(norms, 1.0, rtol=1e-5)
+
+
+def test_kmeans_separates_distinct_themes():
+    texts = themed_texts("space", 40, 1) + themed_texts("football", 40, 2) + themed_texts("cooking", 40, 3)
+    vocabulary = {}
+    documents = count_terms(texts, vocabulary, grow=True)
+    kept, remap, idf = fit_vocabulary(documents, len(vocabulary), max_terms=100)
+    matrix, _ = build_matrix(documents, idf, remap)
+    
+    _, labels = minibatch_kmeans(matrix, 3, len(kept))
+    
+    groups = [set(labels[start:start + 40].tolist()) for start in (0, 40, 80)]
+    assert all(len(group) == 1 for group in groups)
+    assert len(set.union(*groups)) == 3
+
+
+def test_recluster_fits_then_assigns_new_articles_incrementally(database, monkeypatch):
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    from app.models.topic import ArticleTopic, TopicCluster
+    from app.models.user import User
+    from app.services.analytics_service import AnalyticsService
+    monkeypatch.setattr(settings, "TOPIC_CLUSTERS", 3)
+    monkeypatch.setattr(settings, "TOPIC_REBUILD_RATIO", 0.5)
+    
+    def articles(theme, count, seed, first_id):
+        return [
+            Article(id=first_id + i, title=theme, body=text, author_id=1, is_published=True)
+            for i, text in enumerate(themed_texts(theme, count, seed))
+        ]
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add(User(id=1, email="editor@example.com", password_hash="x", full_name="Editor"))
+            db.add_all(articles("space", 10, 1, 100) + articles("football", 10, 2, 200) + articles("cooking", 10, 3, 300))
+            await db.commit()
+            first = await recluster(db)
+            
+            db.add_all(articles("football", 2, 4, 400))
+            await db.commit()
+            second = await recluster(db)
+            
+            assigned = dict((await db.execute(select(ArticleTopic.article_id, ArticleTopic.cluster_id))).all())
+            labels = dict((await db.execute(select(TopicCluster.id, TopicCluster.label))).all())
+            topics = await AnalyticsService.get_topics(db)
+        return first, second, assigned, labels, topics
+    
+    first, second, assigned, labels, topics = database(scenario())
+    assert (first["mode"], first["articles"]) == ("full", 30)
+    assert (second["mode"], second["articles"]) == ("incremental", 2)
+    assert assigned[400] == assigned[401] == assigned[200]
+    assert len({assigned[100], assigned[200], assigned[300]}) == 3
+    assert any(word in labels[assigned[200]].lower() for word in THEMES["football"].split())
+    assert sorted(topic["value"] for topic in topics) == [10, 10, 12]
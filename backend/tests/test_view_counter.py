@@ -0,0 +1,50 @@
+# tests/test_view_counter.py
+
+import httpx
+from sqlalchemy import select
+from app.services.view_counter import ViewCounter, view_counter
+
+
+def test_views_are_buffered_and_only_published_articles_count(database):
+    from app.main import app
+    from app.database import AsyncSessionLocal
+    from app.models.article import Article
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                Article(id=1, title="live", body="b", author_id=1, is_published=True),
+                Article(id=2, title="draft", body="b", author_id=1),
+            ])
+            await db.commit()
+        
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for article_id in (1, 1, 1, 2, 3):
+                await client.get(f"/api/articles/{article_id}")
+        
+        async with AsyncSessionLocal() as db:
+            before = (await db.execute(select(Article.view_count).order_by(Article.id))).scalars().all()
+        written = await view_counter.flush()
+        async with AsyncSessionLocal() as db:
+            after = (await db.execute(select(Article.view_count).order_by(Article.id))).scalars().all()
+        return before, written, after
+    
+    before, written, after = database(scenario())
+    assert before == [0, 0]  # the GETs themselves wrote nothing
+    assert written == 3
+    assert after == [3, 0]
+
+
+def test_failed_flush_keeps_the_views(database):
+    counter = ViewCounter()
+    counter.record(1)
+    counter.record(1)
+    
+    async def scenario():
+        from app.database import engine
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("DROP TABLE articles")
+        return await counter.flush()
+    
+    assert database(scenario()) == 0
+    assert counter._pending[1] == 2